@@ -1,108 +1,100 @@
+"""
+POD (QuickBooks open purchase orders) + NAV (Sales Date return platform)
+-> Final.csv
+
+Each step is a function frame -> frame; everything stays in memory and the
+CSVs are only written at the end (sinks), each one atomically, so a crash
+mid-run leaves the previous outputs untouched.
+"""
+import os
+
 import pandas as pd
-import csv
 
-replace = pd.read_csv("C:\\Users\\E00279\\OneDrive - neousys-tech\\桌面\\09_LT check\\item name replace.csv")
+from item_names import ITEM_MAP_PATH, ItemNameMap, load_item_map
+from preinstalled import expand_preinstalled
+from qb_report import PURCHASE_ORDERS, read_report
 
-#"POD"
-pod = pd.read_csv("open purchase orders.csv", encoding='utf-8')
-pod.drop(columns=['Name', 'Amount', 'Open Balance', "Rcv'd", "Qty", "Memo"], inplace=True)
-pod.rename(columns={"Date": "Order Date", "Num": "QB Num", "Source Name": "Name", "Backordered": "Qty(+)"}, inplace=True)
-pod.drop(pod.columns[0], axis=1, inplace=True)
-pod.dropna(how='all', inplace=True)
-pod.dropna(thresh=5, inplace=True) #刪除有效值少於5個的行
-pod['Item'] = pod['Item'].str.split(':').str[1]
-pod['QB Num'] = pod['QB Num'].str.split('(').str[0]
-for col in ['Order Date', 'Deliv Date']:
-    pod[col] = pd.to_datetime(pod[col]).dt.strftime('%Y/%m/%d')
-pod.to_csv('open purchase2.csv', index=False)
+POD_PATH = "open purchase orders.csv"
+NAV_PATH = "Sales Date return platform.csv"
 
+NAV_COLS = ['Remark', 'QB Num', 'Item', 'Qty(+)', 'Ship Date']
+NAV_DROP_ITEMS = ['Engineer Service- COS', 'CUSTOMER SERVICES', 'FORWARDING CHARGE, EXCLUDING IMPORT DUTY.']
+FINAL_COLS = ['Order Date', 'Ship Date', 'QB Num', "P. O. #", "Name", 'Qty(-)', 'Qty(+)', 'Item', 'Inventory Site', 'Remark']
 
-#"NAV"
-NAV = pd.read_csv("Sales Date return platform.csv", usecols=['Document No.', "Customer PO No.", "Customer Ordering Model",
-                                                             "OP Estimated Shipping Date", "Quantity", "No.",
-                                                             "Customer Ordering Desc."], encoding='utf-8')
-NAV.rename(columns={"Customer PO No.": "QB Num", "Customer Ordering Model": "Item", 'Document No.': "Remark",
-                    "OP Estimated Shipping Date": "Ship Date", "Quantity": "Qty(+)"}, inplace=True)
-NAV = NAV[NAV['Item'] != 'Engineer Service- COS']
-NAV = NAV[NAV['Item'] != 'CUSTOMER SERVICES']
-NAV = NAV[NAV['Item'] != 'FORWARDING CHARGE, EXCLUDING IMPORT DUTY.']
-NAV['QB Num'] = NAV['QB Num'].str.split('(').str[0]
-
-NAV.to_csv('NAV1.csv', index=False)
-
-# 讀取 NAV1 並篩選符合條件的數據
-s50 = []
-with open('NAV1.csv', 'r', encoding='utf-8') as file:
-    csv_reader = csv.reader(file)
-    data_list = list(csv_reader)
-
-for row in data_list:
-    if row[2].startswith("S"):  # 檢查 Item 是否以 "S" 開頭
-        s50.append(row)
-
-result_lists = []
-for original_list in s50:
-    # 分割字串
-    product_str = original_list[-1]
-    product_str = product_str.replace('\u00A0', ' ').replace('\u3000', ' ')
-    product_info = product_str.split(', including ')
-    #product_info = original_list[-1].split(', including ')
-    product_info[0] = product_info[0].split(',')[0]  # 產品代碼
-    components = product_info[1].split(', ') if len(product_info) > 1 else []
-
-    # 建立各組件的新 list
-    for component in components:
-        new_list = original_list.copy()
-        new_list[-1] = component.strip()
-        result_lists.append(new_list)
-
-    # 加入產品代碼
-    new_list_with_product_code = original_list.copy()
-    new_list_with_product_code[-1] = product_info[0]
-    result_lists.append(new_list_with_product_code)
-
-for i in range(0,len(result_lists)):
-    result_lists[i][3] = result_lists[i][6]
-    
-# 調整數據格式
-transformed_lists = []
-for result_list in result_lists:
-    transformed_list = result_list.copy()
-    transformed_list[3] = transformed_list[3].replace(" ", "")
-    
-    if len(transformed_list[3]) > 1 and transformed_list[3][1] == 'x' and transformed_list[3][0].isdigit():
-        quantity = int(transformed_list[3].split('x')[0])
-        name = transformed_list[3].split('x')[-1]
-        transformed_list[3] = name
-        transformed_list[4] = str(quantity * float(transformed_list[4]))  # 更新數量
-
-    transformed_lists.append(transformed_list)
-
-# 追加寫入 NAV1
-with open('NAV1.csv', 'a+', encoding='utf-8', newline="") as csvfile:
-    write = csv.writer(csvfile)
-    write.writerows(transformed_lists)
-
-# NAV 加上倉別和日期
-NAV = pd.read_csv("NAV1.csv", usecols=['Remark', 'QB Num', 'Item', 'Qty(+)', 'Ship Date'], encoding='utf-8')
-replace_dict = dict(zip(replace['NAV'], replace['QB']))
-NAV['Item'] = NAV['Item'].replace(replace_dict)
-
-NAV.to_csv('NAV1.csv', index=False)
-
-# 讀取 open purchase2.csv 並處理數據
-a = pd.read_csv('open purchase2.csv', usecols=['QB Num', "Order Date", "Inventory Site", "P. O. #", "Name", "Item"])
-a.drop_duplicates(inplace=True)
-a['Qty(-)'] = "0"
-
-fil = set(a['Item'])
-NAV = NAV[NAV['Item'].isin(fil)]
-a = a.drop(columns=["Item"])
-a.drop_duplicates(inplace=True)
-
-# 合併 NAV 和 open purchase2.csv
-Final = pd.merge(left=NAV, right=a, on=["QB Num"], how="left")
-columns = ['Order Date', 'Ship Date', 'QB Num', "P. O. #", "Name", 'Qty(-)', 'Qty(+)', 'Item', 'Inventory Site', 'Remark']
-Final.to_csv('Final.csv', index=False, columns=columns)
+
+#"POD"
+def load_pod(path: str = POD_PATH) -> pd.DataFrame:
+    # QuickBooks 報表分塊讀取, 跳過分組/小計行
+    return read_report(path, PURCHASE_ORDERS)
 
 
+#"NAV"
+def load_nav(path: str = NAV_PATH) -> pd.DataFrame:
+    NAV = pd.read_csv(path, usecols=['Document No.', "Customer PO No.", "Customer Ordering Model",
+                                     "OP Estimated Shipping Date", "Quantity", "No.",
+                                     "Customer Ordering Desc."], encoding='utf-8')
+    NAV = NAV.rename(columns={"Customer PO No.": "QB Num", "Customer Ordering Model": "Item", 'Document No.': "Remark",
+                              "OP Estimated Shipping Date": "Ship Date", "Quantity": "Qty(+)"})
+    NAV = NAV[~NAV['Item'].isin(NAV_DROP_ITEMS)].copy()
+    NAV['QB Num'] = NAV['QB Num'].str.split('(').str[0]
+    return NAV
+
+
+def add_preinstalled(NAV: pd.DataFrame) -> pd.DataFrame:
+    # 展開 Pre-installed 組件 (No. 以 "S" 開頭), 接在原 NAV 行之後
+    s50 = NAV[NAV['No.'].astype(str).str.startswith("S")]
+    expanded = expand_preinstalled(s50, desc_col="Customer Ordering Desc.", squeeze_spaces=True, comp_sep=", ")
+    return pd.concat([NAV, expanded[NAV.columns]], ignore_index=True)[NAV_COLS]
+
+
+def rename_items(NAV: pd.DataFrame, item_map: ItemNameMap) -> pd.DataFrame:
+    # NAV 料號 -> QB 料號 (item name replace.csv)
+    return NAV.assign(Item=item_map.translate(NAV['Item']))
+
+
+def merge_nav_pod(NAV: pd.DataFrame, pod: pd.DataFrame) -> pd.DataFrame:
+    # POD 的 QB Num 資訊 (Order Date / Site / P. O. # / Name) 併到 NAV 行
+    a = pod[['Order Date', 'QB Num', "P. O. #", "Name", "Item", "Inventory Site"]].drop_duplicates()
+    a = a.assign(**{'Qty(-)': "0"})
+
+    NAV = NAV[NAV['Item'].isin(set(a['Item']))]
+    a = a.drop(columns=["Item"]).drop_duplicates()
+
+    Final = pd.merge(left=NAV, right=a, on=["QB Num"], how="left")
+    return Final[FINAL_COLS]
+
+
+def build(pod_path: str = POD_PATH, nav_path: str = NAV_PATH, item_map_path: str = ITEM_MAP_PATH) -> dict:
+    """Run every stage in memory; returns the intermediate + final frames."""
+    item_map = load_item_map(item_map_path)
+    pod = load_pod(pod_path)
+    NAV = rename_items(add_preinstalled(load_nav(nav_path)), item_map)
+    return {
+        "pod": pod, "nav": NAV, "final": merge_nav_pod(NAV, pod),
+        # NAV 料號不在對照表、也不是 POD 上的 QB 料號 -> 待補進 item name replace.csv
+        "unmapped": item_map.unmapped(NAV['Item'], known=pod['Item'].dropna()),
+    }
+
+
+def write_csv(df: pd.DataFrame, path: str, **kwargs):
+    tmp = f"{path}.tmp"
+    df.to_csv(tmp, index=False, **kwargs)
+    os.replace(tmp, path)
+
+
+def write_excel(df: pd.DataFrame, path: str, **kwargs):
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:        # a handle: pandas picks the engine by extension otherwise
+        df.to_excel(f, engine="openpyxl", **kwargs)
+    os.replace(tmp, path)
+
+
+if __name__ == "__main__":
+    out = build()
+    # sinks
+    write_csv(out["pod"], 'open purchase2.csv')
+    write_csv(out["nav"], 'NAV1.csv')
+    write_csv(out["final"], 'Final.csv')
+    write_csv(out["unmapped"], 'item name unmapped.csv')
+    if len(out["unmapped"]):
+        print(f"{len(out['unmapped'])} NAV item names not in the map -> item name unmapped.csv")
@@ -1,78 +1,243 @@
 # webpage.py
+import functools
 import os
 from datetime import datetime
-from flask import Flask, request, render_template_string, jsonify, Response, abort
+from itertools import repeat
+from types import SimpleNamespace
+from urllib.parse import quote
+from flask import Flask, request, render_template, jsonify, Response, abort, url_for
+import numpy as np
 import pandas as pd
-from sqlalchemy import create_engine, text
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import SQLAlchemyError
+
+import data_access
+import date_render
+import metrics
+import paging
+import schema
+import shared_snapshot
+from delta_refresh import TableMirror
+from lookup_index import FrameIndex
+from response_cache import ResponseCache
+from snapshot import SnapshotStore
 
 app = Flask(__name__)
+METRICS = metrics.Metrics("wo_structured")
 
 # =========================
 # DB ENGINE (your DSN)
 # =========================
-DATABASE_DSN = (
+DATABASE_DSN = os.environ.get("LT_DATABASE_DSN") or (
     "postgresql+psycopg://postgres.avcznjglmqhmzqtsrlfg:Czheyuan0227@"
     "aws-0-us-east-2.pooler.supabase.com:6543/postgres?sslmode=require"
 )
 
-engine = create_engine(DATABASE_DSN, pool_pre_ping=True)
+# no server-side prepared statements through the transaction pooler (:6543), see data_access.connect_args
+engine = data_access.make_engine(DATABASE_DSN)
 
 # =========================
 # Data cache
 # =========================
-SO_INV: pd.DataFrame | None = None   # from public.wo_structured
-NAV: pd.DataFrame | None = None      # from public."NT Shipping Schedule"
-_LAST_LOAD_ERR: str | None = None
-_LAST_LOADED_AT: datetime | None = None
-
 def _safe_date_col(df: pd.DataFrame, col: str):
     if col in df.columns:
-        df[col] = pd.to_datetime(df[col], errors="coerce")
+        df[col] = date_render.parse_dates(df[col])   # "2026/4/1" and "2025/09/18" alike
+
+def _normalize(df: pd.DataFrame) -> pd.DataFrame:
+    # Light coercions
+    for c in ("Ship Date", "Order Date"):
+        _safe_date_col(df, c)
+    return df
+
+# Row-hash mirrors: after the first full read only changed rows are pulled.
+# Both are persisted to the local Arrow cache, so a restart only pulls the delta.
+# Merged frames are kept in the compact schema (categoricals / float32), see schema.py.
+SO_MIRROR = TableMirror(engine, "public", "wo_structured", normalize=_normalize, cache_name="wo_structured",
+                        spec=schema.SO_INV)
+NAV_MIRROR = TableMirror(engine, "public", "NT Shipping Schedule", normalize=_normalize,
+                         cache_name="nt_shipping_schedule", spec=schema.NAV)
+
+# Background delta refresh period (seconds); 0 disables the periodic tick
+REFRESH_SECONDS = float(os.environ.get("LT_REFRESH_SECONDS", "60"))
+
+def _build_snapshot(so: pd.DataFrame, nav: pd.DataFrame, generation: int | None = None,
+                    version: str | None = None) -> SimpleNamespace:
+    with METRICS.timer("load", "index"):
+        so_idx = FrameIndex(so, "QB Num", "Item", ("Item", "Inventory Site"))
+        nav_idx = FrameIndex(nav, "Item")
+    return SimpleNamespace(
+        so=so,
+        nav=nav,
+        so_idx=so_idx,
+        nav_idx=nav_idx,
+        so_dates=date_render.DateColumns(so),
+        nav_dates=date_render.DateColumns(nav),
+        generation=generation,
+        version=version,   # row-hash digest of both tables: same in every worker and after a restart
+    )
 
-def _read_table(schema: str, table: str) -> pd.DataFrame:
-    """
-    Read with explicit quoting so names with spaces work.
-    """
-    sql = f'SELECT * FROM "{schema}"."{table}"'
-    return pd.read_sql_query(text(sql), con=engine)
+# Several gunicorn workers: one of them loads and publishes, the others map it (shared_snapshot.py)
+SHARED = shared_snapshot.SharedSnapshot("wo-structured") if shared_snapshot.enabled() else None
 
-def _load_from_db(force: bool = False):
+def _load_from_db(force: bool = False, prev: SimpleNamespace | None = None) -> SimpleNamespace:
     """
-    Load SO_INV and NAV from Postgres into memory.
+    Build a snapshot of SO_INV (public.wo_structured) and NAV
+    (public."NT Shipping Schedule") plus their lookups.
+    force=True re-reads both tables in full; otherwise only rows whose hash
+    changed since the last load are fetched and merged into the cache.
+    Returns `prev` as-is when neither table changed.
+
+    With SHARED, only the loader worker queries the database; every other
+    worker attaches to the newest published generation (None until the
+    first one exists).
     """
-    global SO_INV, NAV, _LAST_LOAD_ERR, _LAST_LOADED_AT
+    if SHARED is not None and not SHARED.try_lead():
+        if force and prev is not None:
+            SHARED.request_reload(full=True)
+        with METRICS.timer("load", "attach"):
+            got = SHARED.attach(since=prev.generation if prev is not None else 0)
+        if got is None:
+            return prev
+        gen, frames, version = got
+        return _build_snapshot(frames["so"], frames["nav"], gen, version)
+
+    if SHARED is not None:
+        force = bool(SHARED.take_request()) or force
+    # both tables at once, one pooled connection each
+    with METRICS.timer("load", "tables"):
+        got = data_access.gather({"so": lambda: SO_MIRROR.load(full=force), "nav": lambda: NAV_MIRROR.load(full=force)})
+    so, nav = got["so"], got["nav"]
+    if prev is not None and so is prev.so and nav is prev.nav:
+        return prev
+    METRICS.rows("load_so", len(so))
+    METRICS.rows("load_nav", len(nav))
+
+    version = f"{SO_MIRROR.fingerprint}{NAV_MIRROR.fingerprint}"
+    with METRICS.timer("load", "publish"):
+        gen = SHARED.publish({"so": so, "nav": nav}, version=version) if SHARED is not None else None
+    return _build_snapshot(so, nav, gen, version)
+
+STORE = SnapshotStore(_load_from_db, name="wo-structured")
+
+# Direct mode: the tables are not loaded into RAM; drill-downs query Postgres per
+# request (see _direct_rows).  A snapshot loaded later (?reload=1 / /api/reload)
+# is used instead once it exists.  Without direct mode the same queries serve
+# requests while the first snapshot is still loading.
+DIRECT_MODE = os.environ.get("LT_DIRECT_MODE", "0") == "1"
+
+if not DIRECT_MODE:
+    # initial load (synchronous), then keep refreshing in the background
     try:
-        so = _read_table("public", "wo_structured")
-        nav = _read_table("public", "NT Shipping Schedule")
-
-        # Light coercions
-        for c in ("Ship Date", "Order Date"):
-            _safe_date_col(so, c)
-            _safe_date_col(nav, c)
-
-        SO_INV = so
-        NAV = nav
-        _LAST_LOAD_ERR = None
-        _LAST_LOADED_AT = datetime.now()
-    except Exception as e:
-        SO_INV = None
-        NAV = None
-        _LAST_LOAD_ERR = f"DB load error: {e}"
-
-# initial load
-_load_from_db(force=True)
-
-def _ensure_loaded():
-    if SO_INV is None or NAV is None:
-        _load_from_db(force=True)
+        STORE.refresh(force=False)   # cached copy + delta when a local cache exists
+    except Exception:
+        pass
+    STORE.start(interval=REFRESH_SECONDS or None)
+# rendered pages per (route, args, snapshot version); ETag + 304 for refreshes
+CACHE = ResponseCache(STORE)
+# per-stage timings + snapshot gauges on /metrics, Server-Timing on every response, ?profile=1 with LT_PROFILE=1
+METRICS.init_app(app, STORE, rows=lambda snap: {"so": len(snap.so), "nav": len(snap.nav)})
+
+def _snapshot() -> SimpleNamespace | None:
+    """Snapshot to serve this request; None until the first load succeeded (-> direct queries)."""
+    snap = STORE.current
+    if snap is None and not DIRECT_MODE:
+        STORE.trigger(force=True)
+    return snap
+
+SO_TABLE = "wo_structured"
+NAV_TABLE = "NT Shipping Schedule"
+
+@functools.lru_cache(maxsize=None)
+def _table_columns(table: str) -> tuple:
+    return tuple(c["name"] for c in inspect(engine).get_columns(table, schema="public"))
+
+def _direct_rows(table: str, key_col: str, value: str, columns: list | None = None) -> pd.DataFrame:
+    """
+    Rows of public.<table> with key_col = value, only `columns` (those that exist).
+    Same SQL text for every value with a bound parameter, so SQLAlchemy reuses the
+    compiled statement.  Postgres only keeps a prepared plan when connected through the
+    session pooler (:5432); through the transaction pooler (:6543, the default DSN)
+    auto-prepare is off and every query is planned on its backend.
+    """
+    have = _table_columns(table)
+    cols = list(have) if columns is None else [c for c in dict.fromkeys(columns) if c in have]
+    where = f"WHERE {data_access.quote_ident(key_col)} = :value"
+    with METRICS.timer("filter", "direct_query"):
+        return data_access.read_query(engine, data_access.table_sql(table, columns=cols, where=where),
+                                      params={"value": value}, normalize=_normalize)
+
+def _requested_cols() -> list:
+    return [c.strip() for c in (request.args.get("cols") or "").split(",") if c.strip()]
+
+def _load_error_page(query_error: Exception | None = None):
+    if query_error is not None:
+        msg = f"DB query error: {query_error}"
+    else:
+        msg = f"DB load error: {STORE.error}" if STORE.error else "Data is still loading, please retry shortly."
+    return render_template(ERR_PAGE, error=msg), 503
 
 def _to_date_str(s: pd.Series, fmt="%Y-%m-%d") -> pd.Series:
-    s = pd.to_datetime(s, errors="coerce")
-    return s.apply(lambda x: x.strftime(fmt) if pd.notnull(x) else "")
+    return date_render.format_dates(s, fmt)
 
-def lookup_on_po_by_item(item: str) -> int | None:
-    """Return first non-null numeric 'On PO' value from SO_INV filtered by Item."""
-    df = SO_INV[SO_INV["Item"] == item]
+# SO result table on "/": columns in display order and their cell styles
+SO_HEADERS = [
+    "Order Date","Name","P. O. #","QB Num","Item","Qty(-)","Available",
+    "Available + Pre-installed PO","On Hand","On Sales Order","On PO",
+    "Assigned Q'ty","On Hand - WIP","Available + On PO","Sales/Week",
+    "Recommended Restock Qty","Component_Status","Ship Date"
+]
+NUMERIC_COLS = {
+    "Qty(-)","Available","Available + Pre-installed PO","On Hand",
+    "On Sales Order","On PO","Assigned Q'ty","On Hand - WIP",
+    "Available + On PO","Sales/Week","Recommended Restock Qty"
+}
+NOWRAP_COLS = {"Order Date", "Ship Date", "QB Num", "P. O. #"}
+DRILL_LINKS = {"On Sales Order": "/so_lines?item=", "On PO": "/po_lines?item="}
+
+def _so_table(rows: pd.DataFrame) -> SimpleNamespace:
+    """
+    rows -> INDEX_TPL table.  Built column by column (texts, cell classes, links),
+    then zipped into one (kind, class, text, href) tuple per cell, so the template
+    only prints.  Numeric cells get "neg" / "zero" from their values, the
+    drill-down links carry the URL-quoted Item of their row.
+    """
+    blank = [""] * len(rows)
+
+    def texts(h):
+        return schema.fill_blank(rows[[h]])[h].astype(str).tolist() if h in rows.columns else blank
+
+    items = texts("Item")
+    quoted = {i: quote(i, safe="/") for i in set(items)}
+    item_q = [quoted[i] for i in items]
+    cells = []
+    for h in SO_HEADERS:
+        v = rows[h] if h in rows.columns else None
+        text = items if h == "Item" else texts(h)
+        kind, cls, href = "cell", repeat(""), repeat(None)
+        if h in DRILL_LINKS:
+            kind, cls, href = "link", repeat("num clicky"), [DRILL_LINKS[h] + q for q in item_q]
+        elif h == "Component_Status":
+            kind, cls = "badge", ["badge-pill badge-ok" if t == "Available" else "badge-pill badge-warn" for t in text]
+        elif h == "On Hand - WIP":
+            cls = repeat("num blue-cell")
+        elif h in NUMERIC_COLS:
+            if v is None:
+                cls = repeat("num")
+            else:
+                num = pd.to_numeric(v, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+                cls = np.where(num < 0, "num neg", np.where(num == 0, "num zero", "num")).tolist()
+        elif h in NOWRAP_COLS:
+            cls = repeat("nowrap")
+        cells.append(zip(repeat(kind), cls, text, href))
+    headers = [(h, "text-end" if h in NUMERIC_COLS else "") for h in SO_HEADERS]
+    return SimpleNamespace(headers=headers, rows=list(zip(*cells)))
+
+def lookup_on_po_by_item(so_idx: FrameIndex | None, item: str) -> int | None:
+    """Return first non-null numeric 'On PO' value from SO_INV filtered by Item (so_idx None: query it)."""
+    df = so_idx.rows("Item", item) if so_idx is not None else _direct_rows(SO_TABLE, "Item", item, ["On PO"])
+    return _first_on_po(df)
+
+def _first_on_po(df: pd.DataFrame) -> int | None:
     if "On PO" not in df.columns:
         return None
     s = pd.to_numeric(df["On PO"], errors="coerce").dropna()
@@ -83,128 +248,191 @@ def lookup_on_po_by_item(item: str) -> int | None:
 # Routes
 # =========================
 @app.route("/", methods=["GET"])
+@CACHE.cached
 def index():
     if request.args.get("reload") == "1":
-        _load_from_db(force=True)
+        STORE.trigger(force=request.args.get("full") == "1")
 
-    _ensure_loaded()
-    if _LAST_LOAD_ERR:
-        return render_template_string(ERR_TPL, error=_LAST_LOAD_ERR), 503
+    snap = _snapshot()
 
     so_num = (request.args.get("so") or request.args.get("qb") or "").strip()
-    rows = None
-    all_cols = []
+    table = None
     count = 0
 
-    # The exact headers you render in the template
-    required_headers = [
-        "Order Date","Name","P. O. #","QB Num","Item","Qty(-)","Available",
-        "Available + Pre-installed PO","On Hand","On Sales Order","On PO",
-        "Assigned Q'ty","On Hand - WIP","Available + On PO","Sales/Week",
-        "Recommended Restock Qty","Component_Status","Ship Date"
-    ]
-
     if so_num:
-        mask = SO_INV["QB Num"].astype(str) == so_num
-        rows = SO_INV.loc[mask].copy()
+        if snap is not None:
+            with METRICS.timer("filter", "so"):
+                rows = snap.so_idx.rows("QB Num", so_num)
+        else:
+            try:
+                rows = _direct_rows(SO_TABLE, "QB Num", so_num, SO_HEADERS + ["Item", "In Stock(Inventory)"])
+            except SQLAlchemyError as e:
+                return _load_error_page(e)
         count = len(rows)
+        METRICS.rows("so", count)
+        with METRICS.timer("serialize", "so"):
+            # Derive "On Hand - WIP" from "In Stock(Inventory)" if needed
+            if "On Hand - WIP" not in rows.columns and "In Stock(Inventory)" in rows.columns:
+                rows["On Hand - WIP"] = rows["In Stock(Inventory)"]
 
-        # Derive "On Hand - WIP" from "In Stock(Inventory)" if needed
-        if "On Hand - WIP" not in rows.columns and "In Stock(Inventory)" in rows.columns:
-            rows["On Hand - WIP"] = rows["In Stock(Inventory)"]
-
-        # Ensure all headers exist to avoid KeyError in Jinja
-        for h in required_headers:
-            if h not in rows.columns:
-                rows[h] = ""
+            # Format dates to strings
+            for c in ("Ship Date", "Order Date"):
+                if c in rows.columns:
+                    rows[c] = snap.so_dates.render(rows, c) if snap is not None else _to_date_str(rows[c])
 
-        # Format dates to strings
-        for c in ("Ship Date", "Order Date"):
-            if c in rows.columns:
-                rows[c] = _to_date_str(rows[c])
+            table = _so_table(rows)
 
-        # Keep a copy of all original cols if you still need them elsewhere
-        all_cols = list(rows.columns)
-
-        # Make strings for safe rendering
-        rows = rows.fillna("").astype(str)
-
-    return render_template_string(
-        INDEX_TPL,
+    return render_template(
+        INDEX_PAGE,
         so_num=so_num,
-        rows=None if rows is None else rows.to_dict(orient="records"),
-        columns=all_cols,
+        table=table,
         count=count,
-        loaded_at=_LAST_LOADED_AT.strftime("%Y-%m-%d %H:%M:%S") if _LAST_LOADED_AT else "—",
+        loaded_at=(snap.loaded_at if snap is not None else datetime.now()).strftime("%Y-%m-%d %H:%M:%S"),
         summary=None,  # set/keep this until you wire qb_summary()
     )
 
 
 @app.route("/api/reload", methods=["POST"])
 def api_reload():
-    _load_from_db(force=True)
-    if _LAST_LOAD_ERR:
-        return jsonify({"ok": False, "error": _LAST_LOAD_ERR}), 500
-    return jsonify({"ok": True, "loaded_at": _LAST_LOADED_AT.isoformat()})
+    # Queue a background refresh and return at once; poll the status URL.
+    # ?mode=full forces SELECT *; default is an incremental (delta) refresh
+    job = STORE.trigger(force=request.args.get("mode") == "full")
+    return jsonify({
+        "ok": True,
+        "job": job,
+        "status_url": url_for("api_reload_status", job_id=job["id"]),
+    }), 202
+
+@app.route("/api/reload/<job_id>", methods=["GET"])
+def api_reload_status(job_id):
+    job = STORE.job(job_id)
+    if job is None:
+        return jsonify({"ok": False, "error": "Unknown job"}), 404
+    return jsonify({
+        "ok": job["state"] != "failed",
+        "job": job,
+        "snapshot": STORE.status(),
+        "shared": None if SHARED is None else SHARED.status(),
+        "response_cache": CACHE.stats(),
+        "wo_structured": SO_MIRROR.last_stats,
+        "nt_shipping_schedule": NAV_MIRROR.last_stats,
+    })
+
+def _lines_formatter(cols: list, date_cols: tuple, dates: date_render.DateColumns | None = None):
+    def fmt(g: pd.DataFrame) -> pd.DataFrame:
+        g = g.reindex(columns=cols, fill_value="")
+        for dc in date_cols:
+            if dc in g.columns:
+                g[dc] = dates.render(g, dc) if dates is not None else _to_date_str(g[dc])
+        return schema.fill_blank(g).astype(str)
+    return fmt
+
+def _paged_lines(version: str | int, frame: pd.DataFrame, pos, default_cols: list,
+                 date_cols: tuple, dates: date_render.DateColumns | None = None, **tpl):
+    """
+    Render one page of `frame` rows at `pos` (?cursor= / ?limit= / ?cols=),
+    or stream all of them as NDJSON with ?format=ndjson.
+    `version` is the snapshot version the cursors are tied to (0 for direct queries);
+    `dates` the snapshot's DateColumns for `frame` (None: format each page).
+    """
+    stream = request.args.get("format") == "ndjson"
+    try:
+        offset = paging.decode_cursor(request.args.get("cursor"), version)
+        limit = paging.parse_limit(request.args.get("limit"), default=None if stream else paging.DEFAULT_LIMIT)
+        available = list(default_cols) + [c for c in frame.columns if c not in default_cols]
+        cols = paging.select_columns(available, request.args.get("cols")) if request.args.get("cols") else default_cols
+    except paging.StaleCursor as e:
+        abort(409, str(e))
+    except paging.PageError as e:
+        abort(400, str(e))
+
+    sl, next_off = paging.page_slice(len(pos), offset, limit)
+    METRICS.rows(request.endpoint, sl.stop - sl.start)
+    fmt = _lines_formatter(cols, date_cols, dates)
+    next_cursor = None if next_off is None else paging.encode_cursor(version, next_off)
+    if stream:
+        meta = {"title": tpl["title"], "count": int(len(pos)), "columns": cols, "version": version,
+                "offset": sl.start, "next_cursor": next_cursor}
+        return paging.ndjson_response(meta, paging.iter_chunks(frame, pos[sl], fmt))
+
+    args = request.args.to_dict()
+    args.pop("cursor", None)
+    with METRICS.timer("serialize", request.endpoint):
+        rows = list(fmt(frame.iloc[pos[sl]]).itertuples(index=False, name=None))
+    return render_template(
+        SUBPAGE_PAGE,
+        columns=cols,
+        rows=rows,
+        total=int(len(pos)),
+        first=sl.start + 1,
+        last=sl.stop,
+        first_url=url_for(request.endpoint, **args) if sl.start > 0 else None,
+        next_url=None if next_cursor is None else url_for(request.endpoint, cursor=next_cursor, **args),
+        **tpl,
+    )
 
 @app.route("/so_lines")
+@CACHE.cached
 def so_lines():
-    _ensure_loaded()
-    if _LAST_LOAD_ERR:
-        return render_template_string(ERR_TPL, error=_LAST_LOAD_ERR), 503
+    snap = _snapshot()
 
     item = (request.args.get("item") or "").strip()
     if not item:
         abort(400, "Missing item")
 
     need_cols = ["Name", "QB Num", "Item", "Qty(-)", "Ship Date", "Picked"]
-    g = SO_INV[SO_INV["Item"] == item].copy()
-    for c in need_cols:
-        if c not in g.columns:
-            g[c] = ""
-    if "Ship Date" in g.columns:
-        g["Ship Date"] = _to_date_str(g["Ship Date"])
-
-    on_po_val = lookup_on_po_by_item(item)
-
-    return render_template_string(
-        SUBPAGE_TPL,
+    if snap is not None:
+        with METRICS.timer("filter", "so_lines"):
+            frame, pos = snap.so_idx.frame, snap.so_idx.positions("Item", item)
+    else:
+        try:
+            frame = _direct_rows(SO_TABLE, "Item", item, need_cols + ["On PO"] + _requested_cols())
+        except SQLAlchemyError as e:
+            return _load_error_page(e)
+        pos = np.arange(len(frame))
+    on_po_val = (lookup_on_po_by_item(snap.so_idx, item) if snap is not None
+                 else _first_on_po(frame))
+
+    return _paged_lines(
+        snap.version if snap is not None else 0, frame, pos, need_cols, ("Ship Date",),
+        dates=snap.so_dates if snap is not None else None,
         title=f"On Sales Order — {item}",
-        columns=need_cols,
-        rows=g[need_cols].fillna("").astype(str).to_dict(orient="records"),
         extra_note="Source: public.wo_structured",
         on_po=on_po_val,
     )
 
 
 @app.route("/po_lines")
+@CACHE.cached
 def po_lines():
-    _ensure_loaded()
-    if _LAST_LOAD_ERR:
-        return render_template_string(ERR_TPL, error=_LAST_LOAD_ERR), 503
+    snap = _snapshot()
 
     item = (request.args.get("item") or "").strip()
     if not item:
         abort(400, "Missing item")
 
-    if "Item" not in NAV.columns:
-        return render_template_string(ERR_TPL, error="NAV table missing 'Item' column."), 500
-
-    g = NAV[NAV["Item"] == item].copy()
-    for dc in ("Ship Date", "Order Date", "ETA"):
-        if dc in g.columns:
-            g[dc] = _to_date_str(g[dc])
-
-    cols = list(g.columns) if not g.empty else list(NAV.columns)
-    g = g.fillna("").astype(str)
-
-    on_po_val = lookup_on_po_by_item(item)
-
-    return render_template_string(
-        SUBPAGE_TPL,
+    if snap is not None:
+        nav_idx = snap.nav_idx
+        if "Item" not in nav_idx:
+            return render_template(ERR_PAGE, error="NAV table missing 'Item' column."), 500
+        with METRICS.timer("filter", "po_lines"):
+            frame, pos = nav_idx.frame, nav_idx.positions("Item", item)
+        on_po_val = lookup_on_po_by_item(snap.so_idx, item)
+    else:
+        try:
+            if "Item" not in _table_columns(NAV_TABLE):
+                return render_template(ERR_PAGE, error="NAV table missing 'Item' column."), 500
+            frame = _direct_rows(NAV_TABLE, "Item", item)
+            on_po_val = lookup_on_po_by_item(None, item)
+        except SQLAlchemyError as e:
+            return _load_error_page(e)
+        pos = np.arange(len(frame))
+
+    return _paged_lines(
+        snap.version if snap is not None else 0, frame, pos, list(frame.columns),
+        ("Ship Date", "Order Date", "ETA"),
+        dates=snap.nav_dates if snap is not None else None,
         title=f"On PO — {item}",
-        columns=cols,
-        rows=g[cols].to_dict(orient="records") if not g.empty else [],
         extra_note='Source: public."NT Shipping Schedule"',
         on_po=on_po_val,
     )
@@ -370,19 +598,7 @@ INDEX_TPL = """
   </div>
   {% endif %}
 
-  {% set headers = [
-    "Order Date","Name","P. O. #","QB Num","Item","Qty(-)","Available",
-    "Available + Pre-installed PO","On Hand","On Sales Order","On PO",
-    "Assigned Q'ty","On Hand - WIP","Available + On PO","Sales/Week",
-    "Recommended Restock Qty","Component_Status","Ship Date"
-  ] %}
-  {% set numeric_cols = [
-    "Qty(-)","Available","Available + Pre-installed PO","On Hand",
-    "On Sales Order","On PO","Assigned Q'ty","On Hand - WIP",
-    "Available + On PO","Sales/Week","Recommended Restock Qty"
-  ] %}
-
-  {% if so_num and rows %}
+  {% if so_num and table and table.rows %}
   <div class="card-lite bg-white">
     <div class="card-header fw-bold">
       SO / QB Num: {{ so_num }} &nbsp; <span class="text-muted">Rows: {{ count }}</span>
@@ -392,41 +608,18 @@ INDEX_TPL = """
         <table class="table table-sm table-bordered table-hover align-middle">
           <thead class="table-light text-uppercase small text-muted">
             <tr>
-              {% for h in headers %}
-                <th class="{{ 'text-end' if h in numeric_cols else '' }}">{{ h }}</th>
-              {% endfor %}
+              {% for h, th in table.headers %}<th class="{{ th }}">{{ h }}</th>{% endfor %}
             </tr>
           </thead>
           <tbody>
-            {% for r in rows %}
-              {% set status_badge = 'badge-ok' if r.get('Component_Status') == 'Available' else 'badge-warn' %}
+            {% for r in table.rows %}
               <tr>
-              {% for h in headers %}
-                {% if h == 'On Sales Order' %}
-                  <td class="num clicky">
-                    <a href="/so_lines?item={{ r.get('Item','') | urlencode }}">{{ r.get(h,'') }}</a>
-                  </td>
-                {% elif h == 'On PO' %}
-                  <td class="num clicky">
-                    <a href="/po_lines?item={{ r.get('Item','') | urlencode }}">{{ r.get(h,'') }}</a>
-                  </td>
-                {% elif h == 'On Hand - WIP' %}
-                  <td class="num blue-cell">{{ r.get('On Hand - WIP', '') }}</td>
-                {% elif h == 'Component_Status' %}
-                  <td>
-                    <span class="badge-pill {{ status_badge }}">{{ r.get(h,'') }}</span>
-                  </td>
-                {% elif h in numeric_cols %}
-                  {% set v = r.get(h,'') %}
-                  <td class="num {% if v is number and v < 0 %}neg{% elif v == 0 %}zero{% endif %}">
-                    {{ v }}
-                  </td>
-                {% else %}
-                  <td class="{{ 'nowrap' if h in ['Order Date','Ship Date','QB Num','P. O. #'] else '' }}">
-                    {{ r.get(h,'') }}
-                  </td>
-                {% endif %}
-              {% endfor %}
+              {%- for kind, cls, v, href in r %}
+                {%- if kind == 'link' %}<td class="{{ cls }}"><a href="{{ href }}">{{ v }}</a></td>
+                {%- elif kind == 'badge' %}<td><span class="{{ cls }}">{{ v }}</span></td>
+                {%- else %}<td class="{{ cls }}">{{ v }}</td>
+                {%- endif %}
+              {%- endfor %}
               </tr>
             {% endfor %}
           </tbody>
@@ -505,11 +698,7 @@ SUBPAGE_TPL = """
           <tbody>
             {% if rows %}
               {% for r in rows %}
-                <tr>
-                  {% for c in columns %}
-                    <td>{{ r[c] }}</td>
-                  {% endfor %}
-                </tr>
+                <tr>{% for v in r %}<td>{{ v }}</td>{% endfor %}</tr>
               {% endfor %}
             {% else %}
               <tr><td colspan="{{ columns|length }}" class="text-center text-muted">No data</td></tr>
@@ -517,6 +706,15 @@ SUBPAGE_TPL = """
           </tbody>
         </table>
       </div>
+      {% if total and (first_url or next_url) %}
+        <div class="d-flex justify-content-between align-items-center small mb-2">
+          <span class="text-muted">Rows {{ first }}–{{ last }} of {{ total }}</span>
+          <span>
+            {% if first_url %}<a class="btn btn-sm btn-outline-secondary" href="{{ first_url }}">« First</a>{% endif %}
+            {% if next_url %}<a class="btn btn-sm btn-outline-secondary" href="{{ next_url }}">Next »</a>{% endif %}
+          </span>
+        </div>
+      {% endif %}
       <div class="text-muted small">{{ extra_note }}</div>
     </div>
   </div>
@@ -524,6 +722,12 @@ SUBPAGE_TPL = """
 </html>
 """
 
+# Compiled once; render_template() takes the Template objects (and still fires the
+# template signals the render timings hang off)
+ERR_PAGE = app.jinja_env.from_string(ERR_TPL)
+INDEX_PAGE = app.jinja_env.from_string(INDEX_TPL)
+SUBPAGE_PAGE = app.jinja_env.from_string(SUBPAGE_TPL)
+
 
 if __name__ == "__main__":
     app.run(debug=True, host="0.0.0.0", port=5002)
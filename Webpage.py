@@ -1,23 +1,44 @@
 import pandas as pd
-from flask import Flask, request, render_template_string, jsonify
-from datetime import datetime
+from flask import Flask, request, render_template, jsonify, url_for
 import os
+from types import SimpleNamespace
+import numpy as np
 import pandas as pd
 
+import date_render
+import frame_cache
+import lt_report
+import metrics
+import paging
+import schema
+from lookup_index import FrameIndex
+from qb_summaries import build_qb_summaries
+from response_cache import ResponseCache
+from snapshot import SnapshotStore
+from timelines import AvailabilityTimelines
+
 def to_date_str(s: pd.Series, fmt="%m-%d-%Y") -> pd.Series:
     """Coerce to datetime, then format; leave blanks for NaT."""
-    s = pd.to_datetime(s, errors="coerce")
-    return s.apply(lambda x: x.strftime(fmt) if pd.notnull(x) else "")
+    return date_render.format_dates(s, fmt)
 
 EXCEL_PATH = r"20251002_LT.xlsx"  # adjust path as needed
 SHEET_NAME = "check"                        # sheet is lowercase
-
-APP_TITLE = f"LT Check — From {os.path.basename(EXCEL_PATH)}"
+RELOAD_SECONDS = float(os.environ.get("LT_RELOAD_SECONDS", "30"))  # mtime poll; 0 = off
 
 app = Flask(__name__)
+METRICS = metrics.Metrics("lt_check")
+
+def check_source() -> str:
+    """Newest generated report (lt_report.py, LT_REPORT_DIR) if there is one, else the hand-built workbook."""
+    return lt_report.latest_report() or EXCEL_PATH
+
+def load_check(path: str = EXCEL_PATH):
+    if path.endswith(".parquet"):
+        return normalize_check(pd.read_parquet(path))
+    return normalize_check(pd.read_excel(path, sheet_name=SHEET_NAME, engine="openpyxl"))
 
-def load_check():
-    df = pd.read_excel(EXCEL_PATH, sheet_name=SHEET_NAME, engine="openpyxl")
+def normalize_check(df: pd.DataFrame) -> pd.DataFrame:
+    """"check" sheet columns -> the names / types the lookups use (in place)."""
     # normalize columns (keep your original header casing if you prefer)
     rename = {
         "Ship Date": "ship_date",
@@ -50,128 +71,101 @@ def load_check():
     df["delta"] = df.get("qty_plus", 0) - df.get("qty_minus", 0)
     return df
 
-CHECK = load_check()
-
-def qb_summary(qb_num: str):
-    rows = CHECK[CHECK["qb_num"] == qb_num].copy()
-    if rows.empty:
-        return None
-
-    # sort for stable display
-    rows = rows.sort_values(["item", "ship_date"], na_position="last")
-
-    # Format a per-line view for the table
-    def _fmt_date(x):
-        try:
-            return "" if pd.isna(x) else str(pd.to_datetime(x).date())
-        except Exception:
-            return ""
-
-    line_cols = [
-        "item","site","ship_date","qty_minus","qty_plus",
-        "projected","on_hand","on_sale","available","on_po","po_num","remark","name"
-    ]
-    for c in line_cols:
-        if c not in rows.columns:
-            rows[c] = None
-
-    lines = []
-    for r in rows.itertuples(index=False):
-        lines.append({
-            "item": r.item,
-            "site": r.site,
-            "ship_date": _fmt_date(r.ship_date),
-            "qty_minus": float(r.qty_minus or 0),
-            "qty_plus": float(r.qty_plus or 0),
-            "projected": float(r.projected or 0),
-            "on_hand": float(r.on_hand or 0),
-            "on_sale": float(r.on_sale or 0),
-            "available": float(r.available or 0),
-            "on_po": float(r.on_po or 0),
-            "po_num": r.po_num,
-            "remark": r.remark,
-            "name": r.name,
-        })
-
-    # Totals across the QB
-    tot = {
-        "projected": float(rows["projected"].sum()),
-        "on_hand": float(rows["on_hand"].sum()),
-        "on_sale": float(rows["on_sale"].sum()),
-        "available": float(rows["available"].sum()),
-        "on_po": float(rows["on_po"].sum()),
-    }
-
-    # Use the first line as the "main" line for the assign-date helper
-    main = rows.sort_values("ship_date", na_position="first").iloc[0]
-    need_qty = float(main.get("qty_minus", 0))
-    return {
-        "qb_num": qb_num,
-        "item": main.get("item", ""),
-        "site": main.get("site", ""),
-        "ship_date": (None if pd.isna(main.get("ship_date")) else str(pd.to_datetime(main.get("ship_date")).date())),
-        "need_qty": need_qty,
-        **tot,
-        "lines": lines,  # <<< new: all items/rows under this SO
-    }
-
-
-def earliest_assign_date(item: str, need_qty: float, site: str | None):
-    df = CHECK[(CHECK["item"] == item)].copy()
-    if site:
-        df = df[df["site"] == site]
-
-    # starting on-hand (use latest nonzero snapshot if present; else 0)
-    start_on_hand = 0.0
-    snap = df.loc[df["on_hand"] > 0, "on_hand"]
-    if not snap.empty:
-        start_on_hand = float(snap.iloc[-1])
-
-    tl = (df.groupby("ship_date", dropna=False)["delta"]
-            .sum()
-            .sort_index()
-            .reset_index()
-            .rename(columns={"delta": "net_change"}))
-
-    today = pd.to_datetime(datetime.today().date())
-    tl["ship_date"] = tl["ship_date"].fillna(today)
-    tl["cum_available"] = start_on_hand + tl["net_change"].cumsum()
-
-    meet = tl[tl["cum_available"] >= need_qty]
-    date = None if meet.empty else meet.iloc[0]["ship_date"]
-    return {
-        "date": (None if date is None else str(pd.to_datetime(date).date())),
-        "start_on_hand": start_on_hand,
-        "timeline": tl
-    }
+def build_snapshot(force: bool = False, prev: SimpleNamespace | None = None) -> SimpleNamespace:
+    """Load the check book + lookups into a new snapshot; keep `prev` if the source is unchanged."""
+    path = check_source()
+    mtime = os.path.getmtime(path)
+    if prev is not None and not force and prev.source == path and prev.mtime == mtime:
+        return prev
+    with METRICS.timer("load", "workbook"):
+        if path.endswith(".parquet"):
+            raw = load_check(path)
+        else:
+            # Arrow cache keyed by workbook mtime/size: skips openpyxl on restarts and extra workers
+            raw = frame_cache.cached_frame("lt_check", frame_cache.file_fingerprint(path, SHEET_NAME),
+                                           lambda: load_check(path))
+    METRICS.rows("load_check", len(raw))
+    return snapshot_from_check(raw, mtime, path)
+
+def snapshot_from_check(raw: pd.DataFrame, mtime: float | None = None, source: str | None = None) -> SimpleNamespace:
+    """Snapshot (frame + lookups) from a normalize_check() frame; STORE.publish() serves it."""
+    # categoricals / float32: every worker holds its own copy
+    with METRICS.timer("load", "compact"):
+        check = schema.compact(raw, schema.LT_CHECK)
+    with METRICS.timer("load", "index"):
+        idx = FrameIndex(check, "qb_num", "item", ("item", "site"))
+    with METRICS.timer("load", "timelines"):
+        tl = AvailabilityTimelines(check)
+    with METRICS.timer("load", "qb_summaries"):
+        qb = build_qb_summaries(check)
+    return SimpleNamespace(
+        check=check,
+        idx=idx,
+        tl=tl,
+        qb=qb,
+        dates=date_render.DateColumns(check),   # formatted per page from cached day codes
+        memory=schema.memory_report(raw, check),
+        mtime=mtime,
+        source=source,
+        # same workbook / report -> same version in every worker and after a restart (ETags, cursors)
+        version=None if source is None else frame_cache.file_fingerprint(source),
+    )
+
+STORE = SnapshotStore(build_snapshot, name="lt-check")
+STORE.refresh(force=True)
+STORE.start(interval=RELOAD_SECONDS or None)
+# rendered pages / API answers per (route, args, snapshot version); ETag + 304 for refreshes
+CACHE = ResponseCache(STORE)
+# per-stage timings + snapshot gauges on /metrics, Server-Timing on every response, ?profile=1 with LT_PROFILE=1
+METRICS.init_app(app, STORE, rows=lambda snap: {"check": len(snap.check)})
+
+def qb_summary(qb_num: str, snap: SimpleNamespace | None = None):
+    # all QB summaries are materialized with the snapshot (qb_summaries.py); read-only
+    snap = snap or STORE.current
+    with METRICS.timer("filter", "qb_summary"):
+        return snap.qb.get(qb_num)
+
+
+def earliest_assign_date(item: str, need_qty: float, site: str | None, snap: SimpleNamespace | None = None):
+    # timelines are precomputed per (item, site) at load; this is a binary search
+    snap = snap or STORE.current
+    with METRICS.timer("aggregate", "earliest_assign_date"):
+        return snap.tl.earliest(item, need_qty, site)
 
 @app.route("/", methods=["GET"])
+@CACHE.cached
 def index():
     qb = request.args.get("qb", "").strip()
-    summary = qb_summary(qb) if qb else None
+    snap = STORE.current
+    summary = qb_summary(qb, snap) if qb else None
     assign = None
     if summary and (summary["available"] < 0 or summary["need_qty"] > summary["on_hand"]):
-        assign = earliest_assign_date(summary["item"], max(summary["need_qty"], 1), summary["site"])
-    return render_template_string(TPL, qb=qb, summary=summary, assign=assign, app_title=APP_TITLE)
+        assign = earliest_assign_date(summary["item"], max(summary["need_qty"], 1), summary["site"], snap)
+    app_title = f"LT Check — From {os.path.basename(getattr(snap, 'source', None) or EXCEL_PATH)}"
+    return render_template(PAGE, qb=qb, summary=summary, assign=assign, app_title=app_title)
 
 @app.route("/api/qb/<qb_num>")
+@CACHE.cached
 def api_qb(qb_num):
-    s = qb_summary(qb_num)
+    snap = STORE.current
+    s = qb_summary(qb_num, snap)
     if not s:
         return jsonify({"error": "QB not found"}), 404
     resp = {"summary": s}
     if s["available"] < 0 or s["need_qty"] > s["on_hand"]:
-        a = earliest_assign_date(s["item"], max(s["need_qty"], 1), s["site"])
-        tl = a["timeline"].copy()
-        tl["ship_date"] = tl["ship_date"].astype(str)
-        resp["assign"] = {
-            "earliest_date": a["date"],
-            "start_on_hand": a["start_on_hand"],
-            "timeline": tl.head(50).to_dict(orient="records")
-        }
+        a = earliest_assign_date(s["item"], max(s["need_qty"], 1), s["site"], snap)
+        with METRICS.timer("serialize", "qb"):
+            tl = a["timeline"].copy()
+            tl["ship_date"] = tl["ship_date"].astype(str)
+            resp["assign"] = {
+                "earliest_date": a["date"],
+                "start_on_hand": a["start_on_hand"],
+                "timeline": tl.head(50).to_dict(orient="records")
+            }
     return jsonify(resp)
 
 @app.route("/api/assign", methods=["GET"])
+@CACHE.cached
 def api_assign():
     item = (request.args.get("item") or "").strip()
     site = (request.args.get("site") or "").strip() or None
@@ -186,80 +180,244 @@ def api_assign():
         return jsonify({"error": "Need qty must be > 0"}), 400
 
     a = earliest_assign_date(item, need_qty, site)
-    tl = a["timeline"].copy()
-    tl["ship_date"] = tl["ship_date"].astype(str)
+    with METRICS.timer("serialize", "assign"):
+        tl = a["timeline"].copy()
+        tl["ship_date"] = tl["ship_date"].astype(str)
+        return jsonify({
+            "item": item,
+            "site": site,
+            "need_qty": need_qty,
+            "earliest_date": (None if a["date"] is None else str(a["date"])),
+            "start_on_hand": a["start_on_hand"],
+            "timeline": tl.head(50).to_dict(orient="records"),
+        })
 
-    return jsonify({
-        "item": item,
-        "site": site,
-        "need_qty": need_qty,
-        "earliest_date": (None if a["date"] is None else str(a["date"])),
-        "start_on_hand": a["start_on_hand"],
-        "timeline": tl.head(50).to_dict(orient="records"),
-    })
+MAX_BATCH_LINES = 5000
+
+def _batch_lines(body: dict, snap: SimpleNamespace) -> pd.DataFrame:
+    """Request JSON -> one row per SO line: id, qb_num, item, site, need_qty, ship_date, order_date."""
+    cols = ["id", "qb_num", "item", "site", "need_qty", "ship_date", "order_date"]
+    parts = []
+    qb_nums = body.get("qb_nums") or []
+    if qb_nums:
+        chk = snap.check
+        pos = np.concatenate([snap.idx.positions("qb_num", str(q)) for q in qb_nums])
+        rows = chk.iloc[np.sort(pos)]
+        rows = rows[pd.to_numeric(rows.get("qty_minus", 0), errors="coerce").fillna(0) > 0]
+        parts.append(pd.DataFrame({
+            "id": None,
+            "qb_num": rows["qb_num"].astype(object),
+            "item": rows["item"].astype(object),
+            "site": rows["site"].astype(object) if "site" in rows.columns else None,
+            "need_qty": rows["qty_minus"].astype(float),
+            "ship_date": rows["ship_date"] if "ship_date" in rows.columns else pd.NaT,
+            "order_date": pd.to_datetime(rows["Order Date"], errors="coerce") if "Order Date" in rows.columns else pd.NaT,
+        }, columns=cols))
+    lines = body.get("lines") or []
+    if lines:
+        df = pd.DataFrame(lines).reindex(columns=cols)
+        if df["item"].isna().any() or (df["item"].astype(str).str.strip() == "").any():
+            raise ValueError("Every line needs an item")
+        df["item"] = df["item"].astype(str).str.strip()
+        df["site"] = df["site"].astype(object).where(df["site"].notna() & (df["site"].astype(str).str.strip() != ""), None)
+        df["need_qty"] = pd.to_numeric(df["need_qty"], errors="coerce")
+        if (df["need_qty"].isna() | (df["need_qty"] <= 0)).any():
+            raise ValueError("Every line needs need_qty > 0")
+        for c in ("ship_date", "order_date"):
+            df[c] = pd.to_datetime(df[c], errors="coerce")
+        parts.append(df)
+    if not parts:
+        raise ValueError("Send qb_nums and/or lines")
+    out = pd.concat(parts, ignore_index=True) if len(parts) > 1 else parts[0].reset_index(drop=True)
+    if len(out) > MAX_BATCH_LINES:
+        raise ValueError(f"At most {MAX_BATCH_LINES} lines per request")
+    return out
+
+def assign_batch(lines: pd.DataFrame, snap: SimpleNamespace | None = None) -> pd.DataFrame:
+    """
+    What-if allocation of many SO lines against the availability timelines.
+
+    Lines are served in priority order (ship date, then order date, undated
+    last, then request order).  Lines on the same timeline key (item + site,
+    or item) compete: a line is covered once cumulative available reaches its
+    own need plus the needs of every line ahead of it, so the answer for the
+    first line equals /api/assign.  One groupby cumsum + one searchsorted
+    for the whole batch.
+    """
+    snap = snap or STORE.current
+    df = lines.reset_index(drop=True)
+    site = df["site"].astype(object).where(df["site"].notna(), None)
+    key = df["item"].astype(str) + "\x1f" + df["site"].astype("string").fillna("")
+    ship = pd.to_datetime(df["ship_date"], errors="coerce")
+    order_d = pd.to_datetime(df["order_date"], errors="coerce")
+    big = np.iinfo(np.int64).max
+    ship_k = np.where(ship.isna(), big, ship.to_numpy(dtype="datetime64[ns]").view(np.int64))
+    order_k = np.where(order_d.isna(), big, order_d.to_numpy(dtype="datetime64[ns]").view(np.int64))
+    prio = np.lexsort((np.arange(len(df)), order_k, ship_k))
+
+    rank = np.empty(len(df), dtype=np.int64)
+    rank[prio] = np.arange(len(df))
+    need = df["need_qty"].to_numpy(dtype=float)
+    cum = pd.Series(need[prio]).groupby(key.to_numpy()[prio], sort=False).cumsum().to_numpy()
+    cum_need = np.empty(len(df))
+    cum_need[prio] = cum
+
+    earliest = snap.tl.earliest_many(df["item"].astype(str).tolist(), cum_need, site.tolist())
+    out = df.assign(priority=rank + 1, cum_need=cum_need, earliest_date=earliest)
+    out["late"] = ship.notna() & out["earliest_date"].notna() & (out["earliest_date"] > ship)
+    return out.sort_values("priority")
+
+@app.route("/api/assign_batch", methods=["POST"])
+def api_assign_batch():
+    """
+    POST {"qb_nums": [...]} and/or {"lines": [{"item", "need_qty", "site"?, "ship_date"?,
+    "order_date"?, "id"?}, ...]} -> earliest feasible date per line, in priority order.
+    """
+    snap = STORE.current
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict):
+        return jsonify({"error": "Expected a JSON object"}), 400
+    try:
+        lines = _batch_lines(body, snap)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    with METRICS.timer("aggregate", "assign_batch"):
+        res = assign_batch(lines, snap)
+    METRICS.rows("assign_batch", len(res))
+    with METRICS.timer("serialize", "assign_batch"):
+        for c in ("ship_date", "order_date", "earliest_date"):
+            res[c] = to_date_str(res[c], "%Y-%m-%d").replace("", None)
+        res = res.astype(object).where(res.notna(), None)
+        return jsonify({
+            "count": int(len(res)),
+            "uncovered": int(res["earliest_date"].isna().sum()),
+            "late": int(res["late"].sum()),
+            "lines": res.to_dict(orient="records"),
+        })
+
+def _item_row_order(frame: pd.DataFrame, pos: np.ndarray, site_col: str, date_col: str) -> np.ndarray:
+    """
+    Row positions of one item in response order: by site (blank / missing
+    site last), then rows without Order Date first, then ship date ascending.
+    """
+    sub = frame.iloc[pos]
+    n = len(pos)
+    site = sub[site_col].astype("string") if site_col in sub.columns else pd.Series(pd.NA, index=sub.index, dtype="string")
+    site_na = site.isna().to_numpy()
+    site_codes, _ = pd.factorize(site.fillna(""), sort=True)
+    site_blank = (site.fillna("") == "").to_numpy()
+    if "Order Date" in sub.columns:
+        order_na = (sub["Order Date"].isna() | (sub["Order Date"].astype("string") == "")).to_numpy(dtype=bool)
+    else:
+        order_na = np.zeros(n, dtype=bool)
+    if date_col in sub.columns:
+        d = pd.to_datetime(sub[date_col], errors="coerce")
+        d_nat = d.isna().to_numpy()
+        d_key = np.where(d_nat, 0, d.to_numpy(dtype="datetime64[ns]").view(np.int64))
+    else:
+        d_nat = np.zeros(n, dtype=bool)
+        d_key = np.zeros(n, dtype=np.int64)
+    order = np.lexsort((np.arange(n), d_key, d_nat, ~order_na, site_codes, site_na, site_blank))
+    return pos[order]
+
+def _item_rows_formatter(date_col: str, cols: list, dates: date_render.DateColumns):
+    def fmt(g: pd.DataFrame) -> pd.DataFrame:
+        g = g[cols].copy()
+        for c in [date_col, "Order Date", "Ship Date"]:
+            if c in g.columns:
+                g[c] = dates.render(g, c, "%m-%d-%Y")
+        return schema.fill_blank(g)
+    return fmt
 
 @app.route("/api/item_rows", methods=["GET"])
+@CACHE.cached
 def api_item_rows():
     item = (request.args.get("item") or "").strip()
     if not item:
         return jsonify({"error": "Missing item"}), 400
 
-    df = CHECK[CHECK["item"] == item].copy()
+    snap = STORE.current
+    frame = snap.idx.frame
+    stream = request.args.get("format") == "ndjson"
+    try:
+        offset = paging.decode_cursor(request.args.get("cursor"), snap.version)
+        limit = paging.parse_limit(request.args.get("limit"), default=None if stream else paging.DEFAULT_LIMIT)
+        cols = paging.select_columns(list(frame.columns), request.args.get("cols"))
+    except paging.StaleCursor as e:
+        return jsonify({"error": str(e)}), 409
+    except paging.PageError as e:
+        return jsonify({"error": str(e)}), 400
 
     # Detect canonical column names you use
-    site_col = "site" if "site" in df.columns else "Inventory Site"
-    date_col = "ship_date" if "ship_date" in df.columns else "Ship Date"
-
-    # Ensure datetime dtype for sorting
-    if date_col in df.columns:
-        df[date_col] = pd.to_datetime(df[date_col], errors="coerce")
-
-    cols = list(df.columns)
-    groups = []
-    total_count = 0
-
-    for site_value, g in df.groupby(site_col, dropna=False):
-        # --- Safe sorting: NA Order Date first, then Ship Date ascending ---
-        if "Order Date" in g.columns:
-            g["__is_order_na"] = g["Order Date"].isna() | (g["Order Date"] == "")
-        else:
-            g["__is_order_na"] = False
-
-        if date_col in g.columns:
-            g = g.sort_values(
-                by=["__is_order_na", date_col],
-                ascending=[False, True],   # False → NA first; True → date ascending
-                na_position="last"
-            ).copy()
-        else:
-            g = g.sort_values("__is_order_na", ascending=False).copy()
-
-        total_count += len(g)
-
-        # Format date columns safely
-        for c in [date_col, "Order Date", "Ship Date"]:
-            if c in g.columns:
-                g[c] = to_date_str(g[c])  # use the safe helper from earlier
-
-        g = g.fillna("")
-
-        groups.append({
-            "site": "" if pd.isna(site_value) else str(site_value),
-            "count": int(len(g)),
-            "columns": cols,
-            "rows": g.to_dict(orient="records"),
+    site_col = "site" if "site" in frame.columns else "Inventory Site"
+    date_col = "ship_date" if "ship_date" in frame.columns else "Ship Date"
+
+    # Only the positions are sorted; rows are formatted page by page
+    with METRICS.timer("filter", "item_rows"):
+        pos = _item_row_order(frame, snap.idx.positions("item", item), site_col, date_col)
+    sl, next_off = paging.page_slice(len(pos), offset, limit)
+    page_pos = pos[sl]
+    METRICS.rows("item_rows", len(page_pos))
+    fmt = _item_rows_formatter(date_col, cols, snap.dates)
+    next_cursor = None if next_off is None else paging.encode_cursor(snap.version, next_off)
+
+    if stream:
+        meta = {"item": item, "count": int(len(pos)), "columns": cols, "version": snap.version,
+                "offset": sl.start, "next_cursor": next_cursor}
+        return paging.ndjson_response(meta, paging.iter_chunks(frame, page_pos, fmt))
+
+    # per-site totals over all rows of the item, rows only for this page
+    with METRICS.timer("aggregate", "item_rows"):
+        site_all = frame[site_col].iloc[pos] if site_col in frame.columns else pd.Series(pd.NA, index=range(len(pos)))
+        site_all = site_all.astype("string").fillna("").to_numpy(dtype=object)
+        site_counts = pd.Series(site_all).value_counts().to_dict()
+
+    with METRICS.timer("serialize", "item_rows"):
+        page = fmt(frame.iloc[page_pos])
+        page_sites = site_all[sl]
+        groups = []
+        if len(page_pos):
+            starts = np.flatnonzero(np.r_[True, page_sites[1:] != page_sites[:-1]])
+            ends = np.r_[starts[1:], len(page_sites)]
+            for a, b in zip(starts, ends):
+                groups.append({
+                    "site": str(page_sites[a]),
+                    "count": int(site_counts[page_sites[a]]),
+                    "columns": cols,
+                    "rows": page.iloc[a:b].to_dict(orient="records"),
+                })
+
+        return jsonify({
+            "item": item,
+            "count": int(len(pos)),
+            "groups": groups,
+            "offset": sl.start,
+            "limit": limit,
+            "next_cursor": next_cursor,
+            "version": snap.version,
         })
 
 
-    groups.sort(key=lambda x: (x["site"] == "", x["site"]))  # optional stable order
-
+@app.route("/api/reload", methods=["POST"])
+def api_reload():
+    # Re-read the workbook in the background; poll the status URL for the result
+    job = STORE.trigger(force=request.args.get("mode") == "full")
     return jsonify({
-        "item": item,
-        "count": int(total_count),
-        "groups": groups,
-    })
-
-
+        "ok": True,
+        "job": job,
+        "status_url": url_for("api_reload_status", job_id=job["id"]),
+    }), 202
+
+@app.route("/api/reload/<job_id>", methods=["GET"])
+def api_reload_status(job_id):
+    job = STORE.job(job_id)
+    if job is None:
+        return jsonify({"ok": False, "error": "Unknown job"}), 404
+    snap = STORE.current
+    return jsonify({"ok": job["state"] != "failed", "job": job, "snapshot": STORE.status(),
+                    "response_cache": CACHE.stats(),
+                    "memory": None if snap is None else {k: snap.memory[k] for k in ("rows", "before", "after")}})
 
 
 TPL = """
@@ -401,84 +559,108 @@ document.addEventListener('click', function (e) {
   const panel = document.getElementById('assign-panel');
   panel.innerHTML = '<div class="alert alert-info">Loading timeline for <b>' + safeItem + '</b>…</div>';
 
-  const url = '/api/item_rows?item=' + encodeURIComponent(item);
-
-  fetch(url).then(r => r.json()).then(d => {
-    if (d.error) {
-      panel.innerHTML = '<div class="alert alert-danger">' + d.error + '</div>';
-      return;
-    }
-
-    const groups = d.groups || [];
-    if (!groups.length) {
-      panel.innerHTML = '<div class="card mt-3"><div class="card-header fw-bold">Timeline — ' +
-        safeItem + ' (All Sites)</div><div class="card-body">No data</div></div>';
-      return;
-    }
-
-    // helpers
-    const isProj = c => String(c).trim().toLowerCase() === 'projected';
-    const isNumericCol = c => {
-      const s = String(c).trim().toLowerCase();
-      return ['qty(-)','qty(+)','projected','on hand','on sales order','available','on po','net change','cumulative available']
-        .includes(s);
-    };
-
-    // Build a card per site
-    const siteCards = groups.map(function(g) {
-      const cols = g.columns || [];
-
-      // THEAD with highlight on "projected"
-      const thead = '<thead><tr>' + cols.map(c => {
-        const safeC = String(c).replace(/</g,'&lt;').replace(/>/g,'&gt;');
-        const classes = []
-        if (isProj(c)) classes.push('hi-projected');
-        if (isNumericCol(c)) classes.push('text-end');
-        const clsAttr = classes.length ? ' class="' + classes.join(' ') + '"' : '';
-        return '<th' + clsAttr + '>' + safeC + '</th>';
-      }).join('') + '</tr></thead>';
-
-      // TBODY with highlight on "projected" + right-align numeric columns
-      const rows = (g.rows || []).map(function(row) {
-        const tds = cols.map(function(c) {
-          const v = (row[c] == null ? '' : String(row[c]));
-          const classes = [];
-          if (isProj(c)) classes.push('hi-projected','fw-bold');
-          if (isNumericCol(c)) classes.push('text-end');
-          const clsAttr = classes.length ? ' class="' + classes.join(' ') + '"' : '';
-          return '<td' + clsAttr + '>' + v.replace(/</g,'&lt;').replace(/>/g,'&gt;') + '</td>';
-        }).join('');
-        return '<tr>' + tds + '</tr>';
-      }).join('');
-
-      const body = rows || '<tr><td colspan="' + cols.length +
-                   '" class="text-center text-muted">No rows</td></tr>';
-
-      return '' +
-      '<div class="card mt-3">' +
-        '<div class="card-header fw-bold">Site: ' +
-          (g.site ? g.site.replace(/</g,'&lt;').replace(/>/g,'&gt;') : '(None)') +
-          ' &nbsp; <span class="text-muted fw-normal">Rows: ' + (g.count||0) + '</span>' +
-        '</div>' +
-        '<div class="card-body">' +
-          '<div class="table-responsive">' +
-            '<table class="table table-sm table-bordered table-hover align-middle">' +
-              thead + '<tbody>' + body + '</tbody>' +
-            '</table>' +
-          '</div>' +
-        '</div>' +
-      '</div>';
-    }).join('');
-
-    panel.innerHTML = '' +
-      '<div class="card mt-3">' +
-        '<div class="card-header fw-bold">Timeline — ' + safeItem + ' (Grouped by Inventory Site, Ship Date ↑)</div>' +
-        '<div class="card-body">' +
-          '<div class="text-muted small mb-2">Total rows: ' + (d.count||0) + '</div>' +
-          siteCards +
+  const baseUrl = '/api/item_rows?item=' + encodeURIComponent(item) + '&limit=500';
+
+  // helpers
+  const esc = v => String(v).replace(/</g,'&lt;').replace(/>/g,'&gt;');
+  const isProj = c => String(c).trim().toLowerCase() === 'projected';
+  const isNumericCol = c => {
+    const s = String(c).trim().toLowerCase();
+    return ['qty(-)','qty(+)','projected','on hand','on sales order','available','on po','net change','cumulative available']
+      .includes(s);
+  };
+  const cellCls = (c, extra) => {
+    const classes = extra ? [extra] : [];
+    if (isProj(c)) classes.push('hi-projected');
+    if (isNumericCol(c)) classes.push('text-end');
+    return classes.length ? ' class="' + classes.join(' ') + '"' : '';
+  };
+  const rowHtml = (cols, row) => '<tr>' + cols.map(function(c) {
+    const v = (row[c] == null ? '' : String(row[c]));
+    return '<td' + cellCls(c, isProj(c) ? 'fw-bold' : '') + '>' + esc(v) + '</td>';
+  }).join('') + '</tr>';
+
+  // Build a card per site; later pages append to the same card
+  const siteCard = function(g) {
+    const cols = g.columns || [];
+    const thead = '<thead><tr>' + cols.map(c => '<th' + cellCls(c) + '>' + esc(c) + '</th>').join('') + '</tr></thead>';
+    const card = document.createElement('div');
+    card.className = 'card mt-3';
+    card.innerHTML = '' +
+      '<div class="card-header fw-bold">Site: ' + (g.site ? esc(g.site) : '(None)') +
+        ' &nbsp; <span class="text-muted fw-normal">Rows: ' + (g.count||0) + '</span>' +
+      '</div>' +
+      '<div class="card-body">' +
+        '<div class="table-responsive">' +
+          '<table class="table table-sm table-bordered table-hover align-middle">' +
+            thead + '<tbody></tbody>' +
+          '</table>' +
         '</div>' +
       '</div>';
-  }).catch(function(err) {
+    return card;
+  };
+
+  const tbodies = {};
+  let shown = 0;
+
+  const loadPage = function(cursor) {
+    const url = baseUrl + (cursor ? '&cursor=' + encodeURIComponent(cursor) : '');
+    return fetch(url).then(r => r.json()).then(d => {
+      if (d.error) {
+        panel.innerHTML = '<div class="alert alert-danger">' + esc(d.error) + '</div>';
+        return;
+      }
+
+      const groups = d.groups || [];
+      if (!cursor && !groups.length) {
+        panel.innerHTML = '<div class="card mt-3"><div class="card-header fw-bold">Timeline — ' +
+          safeItem + ' (All Sites)</div><div class="card-body">No data</div></div>';
+        return;
+      }
+
+      if (!cursor) {
+        panel.innerHTML = '' +
+          '<div class="card mt-3">' +
+            '<div class="card-header fw-bold">Timeline — ' + safeItem + ' (Grouped by Inventory Site, Ship Date ↑)</div>' +
+            '<div class="card-body">' +
+              '<div class="text-muted small mb-2">Total rows: ' + (d.count||0) +
+                ' <span id="item-rows-shown"></span></div>' +
+              '<div id="item-rows-sites"></div>' +
+              '<div id="item-rows-more" class="mt-2"></div>' +
+            '</div>' +
+          '</div>';
+      }
+
+      const sites = document.getElementById('item-rows-sites');
+      groups.forEach(function(g) {
+        if (!tbodies[g.site]) {
+          const card = siteCard(g);
+          sites.appendChild(card);
+          tbodies[g.site] = card.querySelector('tbody');
+        }
+        const cols = g.columns || [];
+        tbodies[g.site].insertAdjacentHTML('beforeend', (g.rows || []).map(r => rowHtml(cols, r)).join(''));
+        shown += (g.rows || []).length;
+      });
+
+      document.getElementById('item-rows-shown').textContent =
+        shown < (d.count||0) ? '(showing ' + shown + ')' : '';
+      const more = document.getElementById('item-rows-more');
+      more.innerHTML = '';
+      if (d.next_cursor) {
+        const btn = document.createElement('button');
+        btn.className = 'btn btn-sm btn-outline-secondary';
+        btn.textContent = 'Load more';
+        btn.addEventListener('click', function () {
+          btn.disabled = true;
+          loadPage(d.next_cursor);
+        });
+        more.appendChild(btn);
+      }
+    });
+  };
+
+  loadPage(null).catch(function(err) {
     panel.innerHTML = '<div class="alert alert-danger">Error: ' + String(err) + '</div>';
   });
 });
@@ -489,6 +671,9 @@ document.addEventListener('click', function (e) {
 </html>
 """
 
+# Compiled once at import (render_template() takes the Template object)
+PAGE = app.jinja_env.from_string(TPL)
+
 
 if __name__ == "__main__":
     app.run(debug=True, host="0.0.0.0", port=5002)
\ No newline at end of file
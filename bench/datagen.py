@@ -0,0 +1,317 @@
+"""
+Synthetic sources for the benchmarks, shaped like the real exports / tables.
+
+    data = generate(100_000, seed=7)
+    data["check"]      # LT workbook "check" sheet (Excel column names)
+    data["so"]         # public.wo_structured
+    data["nav"]        # public."NT Shipping Schedule" (Pre rows: "<parent>, including a, 2x b")
+    data["pod_report"] # QuickBooks "open purchase orders.csv", with section / Total rows
+    data["nav_platform"]  # "Sales Date return platform.csv"
+    data["item_map"]   # "item name replace.csv" (QB,NAV)
+
+    paths = write_sources(data, tmpdir)   # pod / nav / item_map CSVs for POD_NAV.build()
+
+`n` is the row count of every table (detail lines for the QuickBooks
+report; the section / item / Total rows come on top).  Item, QB Num and
+customer counts grow with `n` in about the ratios of the 2025-10 workbook
+(~5 rows per item, ~30 per QB Num), item popularity is skewed, ~20 % of
+NAV lines are pre-installed systems whose BOM sits in the description
+(NBSP / "Including" / "Nx " variants included) and a few % of NAV model
+names only match through the item name map.  Same seed, same data.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+SIZES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+
+BASE_DATE = np.datetime64("2025-10-01")
+FAMILIES = np.array(["Nuvo", "POC", "SEMIL", "RGS", "GC", "PB", "NRU", "AccsyBx", "Cblkit", "Ant"], dtype=object)
+SUFFIXES = np.array(["", "GC", "-CRL", "E", "-POE", "-M12"], dtype=object)
+ACCESSORY_FAMILIES = {"AccsyBx", "Cblkit", "Ant"}
+SITES = np.array(["WH01S-NTA", "WH01X-NTA", "Drop Ship", "WH03-NTA"], dtype=object)
+SITE_P = [0.7, 0.15, 0.1, 0.05]
+VENDOR = "Neousys Technology Incorp."
+NAV_DROP = ["Engineer Service- COS", "CUSTOMER SERVICES", "FORWARDING CHARGE, EXCLUDING IMPORT DUTY."]
+
+
+def _pick(rng: np.random.Generator, n_choices: int, size: int, skew: float = 2.0) -> np.ndarray:
+    """Indices in [0, n_choices) with low indices more popular (a few items carry most lines)."""
+    return np.minimum((rng.random(size) ** skew * n_choices).astype(np.int64), n_choices - 1)
+
+
+def _dates(rng: np.random.Generator, size: int, lo: int, hi: int, start=BASE_DATE) -> np.ndarray:
+    return start + rng.integers(lo, hi, size=size).astype("timedelta64[D]")
+
+
+def _fmt(dates: np.ndarray, fmt: str) -> np.ndarray:
+    # a few hundred distinct days: format those, then take
+    uniq, inv = np.unique(dates, return_inverse=True)
+    s = pd.Series(pd.to_datetime(uniq))
+    return s.dt.strftime(fmt).astype(object).where(s.notna(), "").to_numpy(dtype=object)[inv]
+
+
+def _numbered(prefix: str, start: int, idx: np.ndarray) -> np.ndarray:
+    return (prefix + pd.Series(idx + start).astype(str)).to_numpy(dtype=object)
+
+
+def make_catalog(n: int, rng: np.random.Generator) -> dict:
+    """Item codes, customers, QB Nums and pre-installed BOM descriptions for `n`-row tables."""
+    n_items = max(50, n // 5)
+    fam = FAMILIES[rng.integers(0, len(FAMILIES), size=n_items)]
+    items = (pd.Series(fam) + "-" + pd.Series(np.arange(1000, 1000 + n_items)).astype(str)
+             + pd.Series(SUFFIXES[rng.integers(0, len(SUFFIXES), size=n_items)])).to_numpy(dtype=object)
+    accessory = np.isin(fam, list(ACCESSORY_FAMILIES))
+
+    # pre-installed systems: parent + 1..4 components, some with an "Nx " prefix
+    comp_pool = items[accessory] if accessory.sum() >= 10 else items[: max(10, n_items // 10)]
+    systems = np.flatnonzero(~accessory)
+    n_bom = max(10, n_items // 20)
+    parents = items[systems[rng.integers(0, len(systems), size=n_bom)]]
+    descs = []
+    for parent in parents:
+        k = int(rng.integers(1, 5))
+        tokens = []
+        for comp in comp_pool[rng.integers(0, len(comp_pool), size=k)]:
+            q = int(rng.choice([1, 1, 1, 2, 4]))
+            tokens.append(comp if q == 1 else f"{q}x {comp}")
+        sep = ",\u00a0" if rng.random() < 0.1 else ", "   # NBSP, as pasted from NAV
+        word = "Including" if rng.random() < 0.1 else "including"
+        descs.append(f"{parent} w/ OS image, {word} {sep.join(tokens)}")
+
+    n_qb = max(20, n // 30)
+    n_pod = max(20, n // 20)
+    n_cust = max(20, min(2000, n // 100))
+    so_nums = _numbered("SO-", 20250000, np.arange(n_qb))
+    customers = np.array([f"Customer {i:04d}, Inc." for i in range(n_cust)], dtype=object)
+    return {
+        "items": items,
+        "accessory": accessory,
+        "bom_parent": parents,
+        "bom_desc": np.array(descs, dtype=object),
+        "so_nums": so_nums,
+        "customers": customers,
+        # PO header fields: one date / SO / customer / site per POD Num
+        "pod_nums": _numbered("POD-", 250000, np.arange(n_pod)),
+        "pod_date": _dates(rng, n_pod, -120, 0),
+        "pod_so": so_nums[rng.integers(0, n_qb, size=n_pod)],
+        "pod_customer": customers[_pick(rng, n_cust, n_pod)],
+        "pod_site": SITES[rng.choice(len(SITES), size=n_pod, p=SITE_P)],
+    }
+
+
+def make_check(n: int, rng: np.random.Generator, cat: dict) -> pd.DataFrame:
+    """LT workbook "check" sheet: stock rows (no QB Num), SO demand and POD supply, with projected."""
+    items = cat["items"]
+    item = items[_pick(rng, len(items), n)]
+    site = SITES[rng.choice(len(SITES), size=n, p=SITE_P)]
+    kind = rng.choice(3, size=n, p=[0.15, 0.6, 0.25])          # 0 stock, 1 SO line, 2 POD line
+    demand, supply = kind == 1, kind == 2
+
+    qb = np.full(n, np.nan, dtype=object)
+    qb[demand] = cat["so_nums"][_pick(rng, len(cat["so_nums"]), int(demand.sum()), skew=1.0)]
+    qb[supply] = cat["pod_nums"][_pick(rng, len(cat["pod_nums"]), int(supply.sum()), skew=1.0)]
+    po = np.full(n, np.nan, dtype=object)
+    po[demand] = _numbered("PO", 700000, rng.integers(0, max(10, n // 30), size=int(demand.sum())))
+    po[supply] = cat["so_nums"][rng.integers(0, len(cat["so_nums"]), size=int(supply.sum()))]
+    name = np.full(n, np.nan, dtype=object)
+    name[demand] = cat["customers"][_pick(rng, len(cat["customers"]), int(demand.sum()))]
+    name[supply] = VENDOR
+
+    order = _dates(rng, n, -120, 0)
+    ship = order + rng.integers(5, 150, size=n).astype("timedelta64[D]")
+    ship[rng.random(n) < 0.03] = np.datetime64("NaT")
+    order[kind == 0] = np.datetime64("NaT")
+    ship[kind == 0] = np.datetime64("NaT")
+
+    qty_minus = np.where(demand, rng.integers(1, 21, size=n), np.nan).astype(float)
+    qty_minus[supply] = 0.0
+    qty_plus = np.where(supply, rng.integers(1, 51, size=n), 0).astype(float)
+    remark = np.full(n, np.nan, dtype=object)
+    lo = supply & (rng.random(n) < 0.3)
+    remark[lo] = _numbered("LO2508", 1000, rng.integers(0, 9000, size=int(lo.sum())))
+
+    df = pd.DataFrame({
+        "Order Date": order.astype("datetime64[us]"), "Ship Date": ship.astype("datetime64[us]"),
+        "QB Num": qb, "P. O. #": po, "Name": name, "Qty(-)": qty_minus, "Qty(+)": qty_plus,
+        "Item": item, "Inventory Site": site, "Remark": remark,
+    })
+    # workbook order: site, item, stock row first, then by ship date
+    df = df.sort_values(["Inventory Site", "Item", "Ship Date"], na_position="first", kind="stable")
+    df = df.reset_index(drop=True)
+
+    key = df["Item"] + "\x1f" + df["Inventory Site"]
+    on_hand_item = pd.Series(rng.integers(0, 120, size=len(items)).astype(float), index=items)
+    on_hand = on_hand_item.reindex(df["Item"]).to_numpy()
+    delta = df["Qty(+)"] - df["Qty(-)"].fillna(0.0)
+    on_sale = df.groupby(key)["Qty(-)"].transform("sum").to_numpy()
+    on_po = df.groupby(key)["Qty(+)"].transform("sum").to_numpy()
+    df["projected"] = on_hand + delta.groupby(key).cumsum().to_numpy()
+    df["On Hand"] = on_hand
+    df["On Sales Order"] = on_sale
+    df["Available"] = on_hand - on_sale
+    df["On PO"] = on_po
+    df["Check"] = (df["projected"] < 0).astype(float)
+    return df
+
+
+def make_so(check: pd.DataFrame, rng: np.random.Generator, cat: dict) -> pd.DataFrame:
+    """public.wo_structured: the check columns plus the table's own status columns."""
+    so = check.copy()
+    n = len(so)
+    so["Pre/Bare"] = np.where(so["Item"].isin(set(cat["bom_parent"])), "Pre", "Bare").astype(object)
+    so["Component_Status"] = np.where(so["Available"] >= 0, "Available", "Shortage").astype(object)
+    so["Picked"] = np.where(rng.random(n) < 0.2, "Y", "").astype(object)
+    so["On Hand - WIP"] = so["On Hand"] - rng.integers(0, 3, size=n)
+    return so
+
+
+def make_nav(n: int, rng: np.random.Generator, cat: dict) -> pd.DataFrame:
+    """public."NT Shipping Schedule": NAV lines, ~20 % pre-installed with their BOM in Description."""
+    pre = rng.random(n) < 0.2
+    n_pre = int(pre.sum())
+    bom = rng.integers(0, len(cat["bom_desc"]), size=n_pre)
+
+    items = cat["items"]
+    item = items[_pick(rng, len(items), n)]
+    item[pre] = cat["bom_parent"][bom]
+    desc = (pd.Series(item, dtype=object) + " industrial computer, fanless").to_numpy(dtype=object, copy=True)
+    desc[pre] = cat["bom_desc"][bom]
+
+    qb = cat["pod_nums"][_pick(rng, len(cat["pod_nums"]), n, skew=1.0)]
+    stock = rng.random(n) < 0.05
+    qb[stock] = "For NTA_CoastIPC"
+    order = _dates(rng, n, -90, 0)
+    ship = order + rng.integers(10, 120, size=n).astype("timedelta64[D]")
+    so_no = np.where(rng.random(n) < 0.7, _numbered("SO2509", 1000, rng.integers(0, 9000, size=n)),
+                     _numbered("LO2508", 1000, rng.integers(0, 9000, size=n)))
+    return pd.DataFrame({
+        "SO NO.": so_no, "QB Num": qb, "Item": item, "Description": desc,
+        "Ship Date": _fmt(ship, "%Y/%m/%d"), "Qty(+)": rng.integers(1, 31, size=n),
+        "Pre/Bare": np.where(pre, "Pre", "Bare").astype(object),
+        "Order Date": _fmt(order, "%Y/%m/%d"),
+        "ETA": _fmt(ship + np.timedelta64(5, "D"), "%Y/%m/%d"),
+    })
+
+
+def make_item_map(rng: np.random.Generator, cat: dict) -> pd.DataFrame:
+    """item name replace.csv: ~3 % of items have a longer NAV model name."""
+    items = cat["items"]
+    pick = np.flatnonzero(rng.random(len(items)) < 0.03)
+    qb = items[pick]
+    nav = (pd.Series(qb) + "-JetPack-6.0").to_numpy(dtype=object)
+    lower = rng.random(len(pick)) < 0.3
+    nav[lower] = [s.lower() for s in nav[lower]]
+    return pd.DataFrame({"QB": qb, "NAV": nav})
+
+
+def make_nav_platform(n: int, rng: np.random.Generator, cat: dict, item_map: pd.DataFrame) -> pd.DataFrame:
+    """Sales Date return platform.csv (NAV export); Customer PO No. = POD Num, pre rows have No. S50-..."""
+    nav = make_nav(n, rng, cat)
+    pre = (nav["Pre/Bare"] == "Pre").to_numpy()
+    model = nav["Item"].to_numpy(dtype=object).copy()
+    # some lines carry the NAV spelling, only matched through the item map
+    alias = pd.Series(item_map["NAV"].to_numpy(dtype=object), index=item_map["QB"].to_numpy(dtype=object))
+    has_alias = pd.Index(model).isin(alias.index) & (rng.random(n) < 0.5)
+    model[has_alias] = alias.reindex(model[has_alias]).to_numpy(dtype=object)
+    drop = rng.random(n) < 0.01
+    model[drop] = np.array(NAV_DROP, dtype=object)[rng.integers(0, len(NAV_DROP), size=int(drop.sum()))]
+
+    po = nav["QB Num"].to_numpy(dtype=object).copy()
+    split = (rng.random(n) < 0.15) & (po != "For NTA_CoastIPC")
+    po[split] = (pd.Series(po[split]) + "(" + pd.Series(rng.integers(1, 4, size=int(split.sum()))).astype(str)
+                 + ")").to_numpy(dtype=object)
+    no = np.where(pre, _numbered("S50-", 100000, rng.integers(0, 90000, size=n)),
+                  _numbered("950-", 100000, rng.integers(0, 90000, size=n)))
+    return pd.DataFrame({
+        "Document No.": nav["SO NO."], "Line No.": (np.arange(n) % 50 + 1) * 10000,
+        "Sell-to Customer Name": "Neousys Technology America, Inc.",
+        "Customer PO No.": po, "No.": no, "Ordering Model": nav["Item"],
+        "Customer Ordering Model": model, "Quantity": nav["Qty(+)"].astype(float),
+        "OP Estimated Shipping Date": nav["Ship Date"], "Description": nav["Description"].str.slice(0, 50),
+        "Customer Ordering Desc.": nav["Description"],
+    })
+
+
+def make_pod_report(n: int, rng: np.random.Generator, cat: dict) -> pd.DataFrame:
+    """
+    QuickBooks "open purchase orders" export: n detail lines grouped under
+    "Inventory" > category > item headers, each group closed by a "Total ..." row.
+    """
+    items = cat["items"]
+    code = _pick(rng, len(items), n)
+    item = items[code]
+    category = np.where(cat["accessory"][code], "Accessory", "System").astype(object)
+    pod = _pick(rng, len(cat["pod_nums"]), n, skew=1.0)
+    order = cat["pod_date"][pod]
+    deliv = order + rng.integers(10, 120, size=n).astype("timedelta64[D]")
+    deliv[rng.random(n) < 0.1] = np.datetime64("NaT")
+    qty = np.where(rng.random(n) < 0.02, rng.integers(1000, 3000, size=n), rng.integers(1, 60, size=n))
+    num = cat["pod_nums"][pod]
+    split = rng.random(n) < 0.1
+    num[split] = (pd.Series(num[split]) + "(1)").to_numpy(dtype=object)
+    qty_s = pd.Series(qty)
+    qty_txt = qty_s.map("{:,}".format).to_numpy(dtype=object)   # "1,200" like the export
+    price = rng.choice([5.0, 6.0, 35.0, 120.0, 950.0], size=n)
+
+    detail = pd.DataFrame({
+        "": np.nan,
+        "Date": _fmt(order, "%m/%d/%Y"), "Num": num,
+        "P. O. #": cat["pod_so"][pod], "Name": cat["pod_customer"][pod], "Source Name": VENDOR,
+        "Memo": (pd.Series(item) + "  Accessory kit includes screws*6, grommets*4 and bracket ...").to_numpy(dtype=object),
+        "Deliv Date": _fmt(deliv, "%m/%d/%Y"), "Qty": qty_txt, "Rcv'd": "0", "Backordered": qty_txt,
+        "Amount": (qty * price).round(2), "Item": (pd.Series(category) + ":" + pd.Series(item)).to_numpy(dtype=object),
+        "Open Balance": (qty * price).round(2),
+        "Inventory Site": cat["pod_site"][pod],
+    })
+
+    # section rows around the details, placed with a (category, item, part) sort key
+    cat_codes, cat_names = pd.factorize(category, sort=True)
+    groups = pd.DataFrame({"c": cat_codes, "i": code, "qty": qty}).groupby(["c", "i"], sort=True)["qty"].sum()
+    g_c = groups.index.get_level_values(0).to_numpy()
+    g_i = groups.index.get_level_values(1).to_numpy()
+    big = len(items) + 1
+    head = pd.DataFrame({"": items[g_i]})
+    total = pd.DataFrame({"": "Total " + pd.Series(items[g_i]), "Qty": groups.map("{:,}".format).to_numpy(),
+                          "Backordered": groups.map("{:,}".format).to_numpy(), "Rcv'd": "0"})
+    sections = pd.DataFrame({"": np.asarray(cat_names, dtype=object)})
+    section_totals = pd.DataFrame({"": "Total " + pd.Series(np.asarray(cat_names, dtype=object))})
+    parts = [detail, head, total, sections, section_totals]
+    k_cat = np.concatenate([cat_codes, g_c, g_c, np.arange(len(cat_names)), np.arange(len(cat_names))])
+    k_item = np.concatenate([code, g_i, g_i, np.full(len(cat_names), -1), np.full(len(cat_names), big)])
+    k_part = np.concatenate([np.ones(n), np.zeros(len(g_i)), np.full(len(g_i), 2),
+                             np.zeros(len(cat_names)), np.zeros(len(cat_names))])
+    body = pd.concat(parts, ignore_index=True)
+    body = body.take(np.lexsort((np.arange(len(body)), k_part, k_item, k_cat)))
+    out = pd.concat([pd.DataFrame({"": ["Inventory"]}), body,
+                     pd.DataFrame({"": ["Total Inventory", "TOTAL"]})], ignore_index=True)
+    return out[list(detail.columns)]
+
+
+def generate(n: int, seed: int = 7) -> dict:
+    rng = np.random.default_rng(seed)
+    cat = make_catalog(n, rng)
+    check = make_check(n, rng, cat)
+    item_map = make_item_map(rng, cat)
+    return {
+        "check": check,
+        "so": make_so(check, rng, cat),
+        "nav": make_nav(n, rng, cat),
+        "pod_report": make_pod_report(n, rng, cat),
+        "nav_platform": make_nav_platform(n, rng, cat, item_map),
+        "item_map": item_map,
+    }
+
+
+def write_sources(data: dict, directory: str) -> dict:
+    """CSV exports POD_NAV.build() reads: {"pod": path, "nav": path, "item_map": path}."""
+    paths = {
+        "pod": os.path.join(directory, "open purchase orders.csv"),
+        "nav": os.path.join(directory, "Sales Date return platform.csv"),
+        "item_map": os.path.join(directory, "item name replace.csv"),
+    }
+    data["pod_report"].to_csv(paths["pod"], index=False)
+    data["nav_platform"].to_csv(paths["nav"], index=False, encoding="utf-8")
+    data["item_map"].to_csv(paths["item_map"], index=False, encoding="utf-8-sig")
+    return paths
@@ -0,0 +1,247 @@
+"""
+Benchmark runner: pipeline stages + web routes on synthetic data.
+
+    python -m bench.run                       # 10k + 100k, compare with bench/baselines.json
+    python -m bench.run --sizes 10k,100k,1m
+    python -m bench.run --update              # store this machine's numbers as the baselines
+
+Each size runs in its own process (so peak RSS is per size and a 1M run does
+not inflate the 10k numbers).  Per size:
+
+    pod_nav        POD_NAV.build() on the generated CSV exports (QuickBooks parse,
+                   pre-installed expansion, item map, merge)
+    bom_expand     preinstalled.expand_nav_preinstalled() on NT Shipping Schedule
+    ledger         ledger.run() (SO vs expanded NAV)
+    lt_snapshot    Webpage.py snapshot build (index, timelines, QB summaries)
+    /api/qb, /api/assign, /api/item_rows   Webpage.py through the test client
+    /so_lines      Webpage 2.0.py through the test client (direct mode, no DB)
+
+Stages are repeated --repeat times, routes get --requests requests with
+random keys (response cache off).  Reported: p50 / p99 (ms), throughput
+(rows/s for stages, requests/s for routes) and the process peak RSS after
+the case.  A case regresses when its p50 exceeds the baseline by more than
+--tolerance or its peak RSS by more than --rss-tolerance; the exit status
+is then 1.  Baselines are machine specific: refresh them with --update on
+the machine that runs the comparison.
+"""
+import argparse
+import importlib
+import importlib.util
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINES = os.path.join(ROOT, "bench", "baselines.json")
+DEFAULT_SIZES = "10k,100k"
+ROUTES = ["/api/qb", "/api/assign", "/api/item_rows", "/so_lines"]
+
+
+def peak_rss_mb() -> float | None:
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)   # bytes on macOS, KiB elsewhere
+
+
+def summarize(times: list[float], units: float) -> dict:
+    t = np.asarray(times)
+    p50, p99 = np.percentile(t, [50, 99])
+    return {"runs": len(t), "p50_ms": round(p50 * 1000, 3), "p99_ms": round(p99 * 1000, 3),
+            "throughput": round(units / p50, 1) if p50 > 0 else None, "peak_rss_mb": peak_rss_mb()}
+
+
+def time_stage(fn, rows: int, repeat: int) -> dict:
+    times = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t)
+    return {"rows": rows, **summarize(times, rows)}
+
+
+def time_requests(client, urls: list) -> dict:
+    client.get(urls[0])   # warm-up
+    times = []
+    for url in urls:
+        t = time.perf_counter()
+        resp = client.get(url)
+        times.append(time.perf_counter() - t)
+        if resp.status_code >= 500:
+            raise RuntimeError(f"{url} -> {resp.status_code}")
+    return {"rows": len(urls), **summarize(times, 1)}
+
+
+# ---- one size (child process) -------------------------------------------------
+
+def _import_webpage2():
+    spec = importlib.util.spec_from_file_location("webpage2", os.path.join(ROOT, "Webpage 2.0.py"))
+    mod = importlib.util.module_from_spec(spec)
+    sys.modules["webpage2"] = mod
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def run_size(n: int, repeat: int, requests: int, seed: int) -> dict:
+    # apps: no background refresh, no response cache, no DB (snapshots are published below)
+    os.environ.update({"LT_RELOAD_SECONDS": "0", "LT_REFRESH_SECONDS": "0", "LT_RESPONSE_CACHE": "0",
+                       "LT_DIRECT_MODE": "1", "LT_SHARED_SNAPSHOT": "0", "LT_PROFILE": "0",
+                       "LT_DATABASE_DSN": "sqlite://"})
+    os.chdir(ROOT)
+    sys.path.insert(0, ROOT)
+    import POD_NAV
+    import ledger
+    import schema
+    from bench import datagen
+    from preinstalled import expand_nav_preinstalled
+
+    rng = np.random.default_rng(seed)
+    data = datagen.generate(n, seed)
+    res = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = datagen.write_sources(data, tmp)
+        res["pod_nav"] = time_stage(lambda: POD_NAV.build(paths["pod"], paths["nav"], paths["item_map"]),
+                                    n, repeat)
+    res["bom_expand"] = time_stage(lambda: expand_nav_preinstalled(data["nav"]), n, repeat)
+    nav_exp = expand_nav_preinstalled(data["nav"])
+    res["ledger"] = time_stage(lambda: ledger.run(data["so"], nav_exp), len(data["so"]) + len(nav_exp), repeat)
+
+    W = importlib.import_module("Webpage")
+    check = W.normalize_check(data["check"].copy())
+    res["lt_snapshot"] = time_stage(lambda: W.snapshot_from_check(check), n, repeat)
+    W.STORE.publish(W.snapshot_from_check(check))
+    snap = W.STORE.current
+    qbs = snap.check["qb_num"].dropna().astype(str).unique()
+    items = snap.check["item"].dropna().astype(str).unique()
+    client = W.app.test_client()
+    res["/api/qb"] = time_requests(client, [f"/api/qb/{q}" for q in rng.choice(qbs, requests)])
+    res["/api/assign"] = time_requests(
+        client, [f"/api/assign?item={i}&need_qty={q}" for i, q in zip(rng.choice(items, requests),
+                                                                         rng.integers(1, 50, requests))])
+    res["/api/item_rows"] = time_requests(client, [f"/api/item_rows?item={i}" for i in rng.choice(items, requests)])
+
+    W2 = _import_webpage2()
+    so = schema.compact(W2._normalize(data["so"].copy()), schema.SO_INV)
+    nav = schema.compact(W2._normalize(data["nav"].copy()), schema.NAV)
+    W2.STORE.publish(W2._build_snapshot(so, nav))
+    so_items = data["so"]["Item"].dropna().astype(str).unique()
+    res["/so_lines"] = time_requests(W2.app.test_client(),
+                                     [f"/so_lines?item={i}" for i in rng.choice(so_items, requests)])
+    return res
+
+
+# ---- driver ---------------------------------------------------------------------
+
+def run_child(size: str, args) -> dict:
+    with tempfile.NamedTemporaryFile("r", suffix=".json", delete=False) as f:
+        out = f.name
+    try:
+        cmd = [sys.executable, "-m", "bench.run", "--child", size, "--out", out, "--seed", str(args.seed),
+               "--requests", str(args.requests)] + (["--repeat", str(args.repeat)] if args.repeat else [])
+        subprocess.run(cmd, cwd=ROOT, check=True)
+        with open(out, encoding="utf-8") as f:
+            return json.load(f)
+    finally:
+        os.remove(out)
+
+
+def default_repeat(n: int) -> int:
+    return 7 if n <= 10_000 else 5 if n <= 100_000 else 3
+
+
+def compare(results: dict, baselines: dict, tol: float, rss_tol: float) -> list[str]:
+    problems = []
+    for size, cases in results.items():
+        for case, r in cases.items():
+            b = baselines.get(size, {}).get(case)
+            if b is None:
+                continue
+            if r["p50_ms"] > b["p50_ms"] * (1 + tol):
+                problems.append(f"{size} {case}: p50 {r['p50_ms']:.1f} ms > baseline {b['p50_ms']:.1f} ms (+{tol:.0%})")
+            if r.get("peak_rss_mb") and b.get("peak_rss_mb") and r["peak_rss_mb"] > b["peak_rss_mb"] * (1 + rss_tol):
+                problems.append(f"{size} {case}: peak RSS {r['peak_rss_mb']:.0f} MB > baseline "
+                                f"{b['peak_rss_mb']:.0f} MB (+{rss_tol:.0%})")
+    return problems
+
+
+def print_table(results: dict, baselines: dict):
+    print(f"{'size':<6} {'case':<16} {'rows':>9} {'runs':>5} {'p50 ms':>10} {'p99 ms':>10} "
+          f"{'thru/s':>12} {'rss MB':>8} {'vs base':>8}")
+    for size, cases in results.items():
+        for case, r in cases.items():
+            b = baselines.get(size, {}).get(case)
+            ratio = f"{r['p50_ms'] / b['p50_ms']:.2f}x" if b and b["p50_ms"] else "-"
+            print(f"{size:<6} {case:<16} {r['rows']:>9} {r['runs']:>5} {r['p50_ms']:>10.2f} {r['p99_ms']:>10.2f} "
+                  f"{r['throughput'] or 0:>12,.0f} {r['peak_rss_mb'] or 0:>8.0f} {ratio:>8}")
+
+
+def main(argv=None) -> int:
+    from bench.datagen import SIZES
+
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    ap.add_argument("--sizes", default=DEFAULT_SIZES, help=f"comma separated, from {', '.join(SIZES)}")
+    ap.add_argument("--repeat", type=int, default=0, help="runs per stage (default: 7 / 5 / 3 by size)")
+    ap.add_argument("--requests", type=int, default=200, help="requests per route")
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--tolerance", type=float, default=0.5, help="allowed p50 slowdown vs baseline (0.5 = +50%%)")
+    ap.add_argument("--rss-tolerance", type=float, default=0.25)
+    ap.add_argument("--baselines", default=BASELINES)
+    ap.add_argument("--update", action="store_true", help="write the results as the new baselines")
+    ap.add_argument("--json", help="also write the results to this file")
+    ap.add_argument("--child", help=argparse.SUPPRESS)
+    ap.add_argument("--out", help=argparse.SUPPRESS)
+    args = ap.parse_args(argv)
+
+    if args.child:
+        n = SIZES[args.child]
+        res = run_size(n, args.repeat or default_repeat(n), args.requests, args.seed)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(res, f)
+        return 0
+
+    sizes = [s.strip().lower() for s in args.sizes.split(",") if s.strip()]
+    unknown = [s for s in sizes if s not in SIZES]
+    if unknown:
+        ap.error(f"unknown size(s): {', '.join(unknown)}")
+    results = {s: run_child(s, args) for s in sizes}
+
+    try:
+        with open(args.baselines, encoding="utf-8") as f:
+            stored = json.load(f)
+    except FileNotFoundError:
+        stored = {"results": {}}
+    print_table(results, stored["results"])
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.update:
+        stored["machine"] = {"python": platform.python_version(), "platform": platform.platform(),
+                             "cpus": os.cpu_count()}
+        stored["results"].update(results)
+        with open(args.baselines, "w", encoding="utf-8") as f:
+            json.dump(stored, f, indent=2)
+            f.write("\n")
+        print(f"baselines updated: {args.baselines}")
+        return 0
+
+    problems = compare(results, stored["results"], args.tolerance, args.rss_tolerance)
+    for p in problems:
+        print("REGRESSION", p)
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
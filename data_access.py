@@ -0,0 +1,129 @@
+"""
+Table reads from the Supabase Postgres for 9.py, the notebooks and
+Webpage 2.0.py.
+
+Reads go through the app's SQLAlchemy engine (its connection pool) with
+stream_results, i.e. a server-side cursor on Postgres: rows come over in
+batches of BATCH_ROWS and each batch is turned into a typed frame (and
+normalized) on arrival instead of the whole result being buffered first.
+Whole tables are typed from the table definition like pd.read_sql_table;
+ad-hoc queries take read_sql_query's dtype= / parse_dates= per batch.
+Independent reads run on a thread pool, one pooled connection each, so
+loading all sources takes about as long as the slowest table:
+
+    tables = fetch_tables(engine, ["wo_structured", "Open_Purchase_Orders", "NT Shipping Schedule"])
+    tables["wo_structured"]
+
+    out = gather({"so": lambda: SO_MIRROR.load(), "nav": lambda: NAV_MIRROR.load()})
+
+Works against any SQLAlchemy engine, e.g. a local SQLite file with the
+tables in an attached "public" database for testing (the local cache of
+read_table_cached is Postgres only; elsewhere it reads the table).
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator
+
+import pandas as pd
+from sqlalchemy import create_engine, make_url, text
+
+import frame_cache
+
+BATCH_ROWS = 10_000
+SOURCE_TABLES = ["wo_structured", "Open_Purchase_Orders", "NT Shipping Schedule"]
+TRANSACTION_POOLER_PORT = 6543   # Supabase pgbouncer, transaction mode (session mode: 5432)
+
+
+def connect_args(dsn: str) -> dict:
+    """
+    psycopg 3 prepares a statement server-side after prepare_threshold (5)
+    runs.  Behind a transaction-mode pooler the next run may land on another
+    backend ("prepared statement _pg3_N does not exist"), so auto-prepare is
+    turned off there; the session pooler / a direct connection keeps it.
+    """
+    url = make_url(dsn)
+    if url.drivername == "postgresql+psycopg" and url.port == TRANSACTION_POOLER_PORT:
+        return {"prepare_threshold": None}
+    return {}
+
+
+def make_engine(dsn: str, **kw):
+    return create_engine(dsn, pool_pre_ping=True, connect_args=connect_args(dsn), **kw)
+
+
+def quote_ident(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def table_sql(table: str, schema: str = "public", columns: Iterable[str] | None = None, where: str = "") -> str:
+    cols = "*" if columns is None else ", ".join(quote_ident(c) for c in columns)
+    return f"SELECT {cols} FROM {quote_ident(schema)}.{quote_ident(table)} {where}".rstrip()
+
+
+def iter_query(engine, sql, params: dict | None = None, chunksize: int = BATCH_ROWS,
+               normalize: Callable[[pd.DataFrame], pd.DataFrame] | None = None, **read_kw) -> Iterator[pd.DataFrame]:
+    """Stream a query as frames of at most `chunksize` rows (server-side cursor)."""
+    if isinstance(sql, str):
+        sql = text(sql)
+    with engine.connect() as conn:
+        conn = conn.execution_options(stream_results=True, max_row_buffer=chunksize)
+        for chunk in pd.read_sql_query(sql, conn, params=params, chunksize=chunksize, **read_kw):
+            yield normalize(chunk) if normalize else chunk
+
+
+def _concat(chunks: list[pd.DataFrame]) -> pd.DataFrame:
+    if len(chunks) == 1:
+        return chunks[0]
+    out = pd.concat(chunks, ignore_index=True)
+    # a batch where a column is all NULL comes back as object; retype those columns
+    mixed = [c for c in out.columns if out[c].dtype == object and any(ch[c].dtype != object for ch in chunks)]
+    if mixed:
+        out[mixed] = out[mixed].infer_objects()
+    return out
+
+
+def read_query(engine, sql, params: dict | None = None, chunksize: int = BATCH_ROWS,
+               normalize: Callable[[pd.DataFrame], pd.DataFrame] | None = None, **read_kw) -> pd.DataFrame:
+    return _concat(list(iter_query(engine, sql, params=params, chunksize=chunksize, normalize=normalize, **read_kw)))
+
+
+def iter_table(engine, table: str, schema: str = "public", columns: Iterable[str] | None = None,
+               chunksize: int = BATCH_ROWS, normalize: Callable[[pd.DataFrame], pd.DataFrame] | None = None
+               ) -> Iterator[pd.DataFrame]:
+    """Stream a whole table; column types come from the table definition (same as pd.read_sql_table)."""
+    with engine.connect() as conn:
+        conn = conn.execution_options(stream_results=True, max_row_buffer=chunksize)
+        for chunk in pd.read_sql_table(table, conn, schema=schema, columns=None if columns is None else list(columns),
+                                       chunksize=chunksize):
+            yield normalize(chunk) if normalize else chunk
+
+
+def read_table(engine, table: str, schema: str = "public", columns: Iterable[str] | None = None,
+               chunksize: int = BATCH_ROWS, normalize: Callable[[pd.DataFrame], pd.DataFrame] | None = None
+               ) -> pd.DataFrame:
+    return _concat(list(iter_table(engine, table, schema, columns, chunksize=chunksize, normalize=normalize)))
+
+
+def read_table_cached(engine, table: str, schema: str = "public", **kw) -> pd.DataFrame:
+    # local Arrow cache, re-pulled only when the table's row digest changes;
+    # the digest is Postgres SQL (string_agg / md5), other engines read directly
+    if engine.dialect.name != "postgresql":
+        return read_table(engine, table, schema, **kw)
+    cache_name = "sql_" + table.replace(" ", "_").lower()
+    return frame_cache.cached_frame(cache_name, frame_cache.db_fingerprint(engine, schema, table),
+                                    lambda: read_table(engine, table, schema, **kw))
+
+
+def gather(tasks: dict[str, Callable], max_workers: int | None = None) -> dict:
+    """Run independent zero-arg callables concurrently; {key: result}.  The first error is re-raised."""
+    if len(tasks) <= 1:
+        return {k: fn() for k, fn in tasks.items()}
+    with ThreadPoolExecutor(max_workers=max_workers or len(tasks), thread_name_prefix="db-fetch") as pool:
+        futures = {k: pool.submit(fn) for k, fn in tasks.items()}
+        return {k: f.result() for k, f in futures.items()}
+
+
+def fetch_tables(engine, tables: Iterable[str] = SOURCE_TABLES, schema: str = "public", cached: bool = True,
+                 max_workers: int | None = None, **kw) -> dict[str, pd.DataFrame]:
+    """Read several tables at once, one pooled connection per table."""
+    read = read_table_cached if cached else read_table
+    return gather({t: (lambda t=t: read(engine, t, schema, **kw)) for t in tables}, max_workers=max_workers)
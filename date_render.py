@@ -0,0 +1,117 @@
+"""
+Date parsing / rendering shared by the web apps and the QuickBooks parser.
+
+Source columns mix "2026/4/1", "2025/09/18", ISO timestamps and (QuickBooks)
+"09/18/2025".  pd.to_datetime without a format guesses one from the first
+value and turns every value written differently into NaT; here each
+distinct string is tried against SOURCE_FORMATS in order, explicitly, and
+only what none of them matches goes through pandas' per-value parser.
+
+Rendering never calls strftime per cell: a column is factorized, each
+distinct day is formatted once and the strings are taken back by code.
+For the snapshot frames DateColumns keeps those codes per (column, format),
+built on first use, so a drill-down page only gathers the rows it shows:
+
+    snap.dates = DateColumns(check)                      # at snapshot build
+    page["Ship Date"] = snap.dates.render(page, "Ship Date", "%m-%d-%Y")
+
+    format_dates(df["ETA"], "%Y-%m-%d")                  # any other frame
+    parse_dates(df["Ship Date"])                         # -> datetime64, NaT for blanks
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+SOURCE_FORMATS = ("%Y/%m/%d", "ISO8601", "%m/%d/%Y")
+DISPLAY_FMT = "%Y-%m-%d"
+
+
+def _parse_text(txt: pd.Series, formats, infer: bool) -> pd.Series:
+    codes, uniq = pd.factorize(txt.str.strip())
+    u = pd.Series(np.asarray(uniq, dtype=object))
+    parsed = pd.Series(pd.NaT, index=u.index, dtype="datetime64[us]")
+    todo = (u != "").to_numpy(dtype=bool, copy=True)
+    for fmt in formats:
+        if not todo.any():
+            break
+        got = pd.to_datetime(u[todo], format=fmt, errors="coerce")
+        hit = got.index[got.notna()]
+        parsed[hit] = got[hit]
+        todo[hit] = False
+    if infer and todo.any():
+        parsed[todo] = pd.to_datetime(u[todo], format="mixed", errors="coerce")
+    vals = np.append(parsed.to_numpy(dtype="datetime64[us]"), np.datetime64("NaT", "us"))
+    return pd.Series(vals[np.where(codes < 0, len(u), codes)], index=txt.index, name=txt.name)
+
+
+def parse_dates(s: pd.Series, formats=SOURCE_FORMATS, infer: bool = True) -> pd.Series:
+    """
+    Values -> datetime64 (NaT for blanks / unparseable).  Datetime columns are
+    returned as they are; strings are matched against `formats` in order,
+    infer=False leaves strings none of them match as NaT.
+    """
+    if not isinstance(s, pd.Series):
+        s = pd.Series(s)
+    if pd.api.types.is_datetime64_any_dtype(s):
+        return s
+    kind = pd.api.types.infer_dtype(s, skipna=True)
+    if kind == "empty":
+        return pd.Series(pd.NaT, index=s.index, name=s.name, dtype="datetime64[us]")
+    if kind == "string":
+        return _parse_text(s.astype("string"), formats, infer)
+    if kind == "mixed":
+        is_text = s.map(lambda v: isinstance(v, str)).to_numpy(dtype=bool)
+        out = pd.Series(pd.NaT, index=s.index, name=s.name, dtype="datetime64[us]")
+        out[is_text] = _parse_text(s[is_text].astype("string"), formats, infer)
+        out[~is_text] = pd.to_datetime(s[~is_text], errors="coerce")
+        return out
+    # datetime / date objects, numbers
+    return pd.to_datetime(s, errors="coerce")
+
+
+def _codes(d: pd.Series, fmt: str) -> tuple[np.ndarray, np.ndarray]:
+    """datetime column -> (int codes, formatted distinct days + a trailing blank); NaT -> the blank."""
+    codes, uniq = pd.factorize(d)
+    txt = pd.DatetimeIndex(uniq).strftime(fmt).to_numpy(dtype=object) if len(uniq) else np.empty(0, dtype=object)
+    codes = np.where(codes < 0, len(txt), codes).astype(np.int32)
+    return codes, np.append(txt, None)
+
+
+def format_dates(s: pd.Series, fmt: str = DISPLAY_FMT, na="", formats=SOURCE_FORMATS, infer: bool = True) -> pd.Series:
+    """Parse (see parse_dates) and render as strings; `na` for NaT."""
+    codes, txt = _codes(parse_dates(s, formats, infer), fmt)
+    txt[-1] = na
+    return pd.Series(txt[codes], index=s.index, name=s.name, dtype=object)
+
+
+class DateColumns:
+    """
+    Rendered date columns of one snapshot frame.  render() takes row slices
+    of that frame (frame.iloc[...] / FrameIndex.rows(), index unchanged);
+    the frame needs the default RangeIndex, otherwise it formats the slice.
+    """
+
+    def __init__(self, frame: pd.DataFrame):
+        self.frame = frame
+        idx = frame.index
+        self._positional = isinstance(idx, pd.RangeIndex) and idx.start == 0 and idx.step == 1
+        self._cols: dict[tuple, tuple] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, col: str, fmt: str) -> tuple[np.ndarray, np.ndarray]:
+        got = self._cols.get((col, fmt))
+        if got is None:
+            with self._lock:
+                got = self._cols.get((col, fmt))
+                if got is None:
+                    got = self._cols[(col, fmt)] = _codes(parse_dates(self.frame[col]), fmt)
+        return got
+
+    def render(self, rows: pd.DataFrame, col: str, fmt: str = DISPLAY_FMT, na="") -> pd.Series:
+        if not self._positional or col not in self.frame.columns:
+            return format_dates(rows[col], fmt, na)
+        codes, txt = self._get(col, fmt)
+        txt = txt.copy()
+        txt[-1] = na
+        return pd.Series(txt[codes[rows.index.to_numpy()]], index=rows.index, name=col, dtype=object)
@@ -0,0 +1,158 @@
+"""
+Incremental refresh of Postgres tables into in-memory frames.
+
+A TableMirror keeps the last loaded frame of one table plus an md5 row hash
+per row (computed server-side from the whole row text).  A delta refresh
+then only pulls the hash and ctid (physical row address) of every row,
+diffs the hashes against the cached ones and fetches the rows whose hash
+is new by ctid, a TID scan that touches only those rows instead of
+re-hashing the table; rows whose hash disappeared are dropped.  No
+updated-at column or primary key is needed, and deletes are picked up as
+well.  Postgres only (md5 of the row text, ctid).
+
+A row updated between the hash pass and the fetch has moved to a new
+ctid and is missing from that refresh; its hash stays "changed" and the
+next refresh picks it up.
+
+Row order after a delta refresh follows the order of the hash scan, so the
+merged frame looks the same as a fresh SELECT *.
+
+With cache_name set, the mirror (rows + hashes) is persisted through
+frame_cache after every change; a cold start then reads the newest cached
+copy and only runs a delta refresh against it.
+"""
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+import data_access
+import frame_cache
+from schema import compact, memory_report
+
+HASH_COL = "__row_hash"
+CTID_COL = "__ctid"
+FETCH_CHUNK = 5000
+
+
+class TableMirror:
+
+    def __init__(self, engine, schema: str, table: str, normalize=None, cache_name: str | None = None,
+                 spec: dict | None = None):
+        """
+        normalize: optional fn(df) -> df applied to every batch of rows read
+        from the table (full read or delta), e.g. date coercion.
+        spec: optional schema.py spec; the merged frame is compacted with it
+        (after caching) and last_stats["memory"] reports before/after bytes.
+        """
+        self.engine = engine
+        self.schema = schema
+        self.table = table
+        self.normalize = normalize
+        self.cache_name = cache_name
+        self.spec = spec
+        self.frame: pd.DataFrame | None = None
+        self.hashes: pd.Series | None = None   # aligned with frame rows
+        self.fingerprint: str | None = None    # digest of the row hashes: same table content, same value
+        self.last_stats: dict = {}
+
+    @property
+    def _from(self) -> str:
+        return f'"{self.schema}"."{self.table}" AS t'
+
+    _hash_expr = "md5(CAST(t AS text))"
+
+    def _read_rows(self, where: str = "", params: dict | None = None) -> pd.DataFrame:
+        sql = text(f'SELECT {self._hash_expr} AS "{HASH_COL}", t.* FROM {self._from} {where}')
+        # streamed in batches; normalize runs per batch
+        return data_access.read_query(self.engine, sql, params=params, normalize=self.normalize)
+
+    def _read_hashes(self) -> pd.DataFrame:
+        sql = text(f'SELECT {self._hash_expr} AS "{HASH_COL}", CAST(t.ctid AS text) AS "{CTID_COL}" FROM {self._from}')
+        return pd.read_sql_query(sql, con=self.engine)
+
+    def load(self, full: bool = False) -> pd.DataFrame:
+        """
+        Return the current table.  full=True (or first call) reads everything,
+        otherwise only changed rows are fetched and merged.  The mirror is
+        only updated once the whole refresh succeeded.
+        """
+        if self.frame is None and not full:
+            self._seed_from_cache()
+        if full or self.frame is None:
+            df = self._read_rows()
+            hashes = df.pop(HASH_COL)
+            self._commit(df, hashes, {"mode": "full", "rows": len(df), "fetched": len(df), "dropped": 0})
+            return self.frame
+
+        scan = self._read_hashes()
+        new_hashes = scan[HASH_COL]
+        new_counts = new_hashes.value_counts()
+        old_counts = self.hashes.value_counts()
+        both = pd.concat([old_counts.rename("old"), new_counts.rename("new")], axis=1).fillna(0)
+        changed = both.index[both["old"] != both["new"]]
+
+        if len(changed) == 0:
+            # unchanged: hand back the very same frame object
+            self.last_stats = {"mode": "delta", "rows": len(self.frame), "fetched": 0, "dropped": 0,
+                               "at": datetime.now().isoformat(timespec="seconds")}
+            return self.frame
+
+        changed_set = set(changed)
+        keep = ~self.hashes.isin(changed_set).to_numpy()
+        # every row of the scan carrying a new hash, addressed by ctid (TID scan, no re-hash of the table)
+        to_fetch = scan.loc[new_hashes.isin(changed_set), CTID_COL].tolist()
+
+        parts = [self.frame.loc[keep]]
+        fetched = 0
+        for i in range(0, len(to_fetch), FETCH_CHUNK):
+            chunk = self._read_rows(
+                where="WHERE t.ctid = ANY(CAST(:ctids AS tid[]))",
+                params={"ctids": to_fetch[i:i + FETCH_CHUNK]},
+            )
+            fetched += len(chunk)
+            parts.append(chunk)
+        merged_hashes = pd.concat([self.hashes.loc[keep]] + [p[HASH_COL] for p in parts[1:]], ignore_index=True)
+        merged = pd.concat([parts[0]] + [p.drop(columns=HASH_COL) for p in parts[1:]], ignore_index=True)
+
+        # put rows back in scan order: match (hash, n-th occurrence) to the hash list
+        want = pd.DataFrame({"h": new_hashes, "k": new_hashes.groupby(new_hashes).cumcount()})
+        want["pos"] = np.arange(len(want))
+        have = pd.DataFrame({"h": merged_hashes, "k": merged_hashes.groupby(merged_hashes).cumcount()})
+        pos = have.merge(want, on=["h", "k"], how="left")["pos"].to_numpy()
+        order = np.argsort(np.where(np.isnan(pos), np.inf, pos), kind="stable")
+        merged = merged.take(order).reset_index(drop=True)
+        merged_hashes = merged_hashes.take(order).reset_index(drop=True)
+
+        self._commit(merged, merged_hashes, {
+            "mode": "delta", "rows": len(merged), "fetched": fetched,
+            "dropped": int((~keep).sum()),
+        })
+        return self.frame
+
+    def _seed_from_cache(self):
+        if not self.cache_name:
+            return
+        cached = frame_cache.read_cached(self.cache_name)
+        if cached is None or HASH_COL not in cached.columns:
+            return
+        self.hashes = cached.pop(HASH_COL)
+        self.fingerprint = frame_cache.hashes_fingerprint(self.hashes)
+        self.frame = cached if self.spec is None else compact(cached, self.spec)
+
+    def _commit(self, df: pd.DataFrame, hashes: pd.Series, stats: dict):
+        df = df.reset_index(drop=True)
+        hashes = hashes.reset_index(drop=True)
+        fingerprint = frame_cache.hashes_fingerprint(hashes)
+        if self.cache_name:
+            stored = frame_cache.write_cached(self.cache_name, fingerprint, df.assign(**{HASH_COL: hashes}))
+            df = stored.drop(columns=HASH_COL)
+        if self.spec is not None:
+            compacted = compact(df, self.spec)
+            stats = {**stats, "memory": {k: v for k, v in memory_report(df, compacted).items() if k != "columns"}}
+            df = compacted
+        self.frame = df
+        self.hashes = hashes
+        self.fingerprint = fingerprint
+        self.last_stats = {**stats, "at": datetime.now().isoformat(timespec="seconds")}
@@ -0,0 +1,164 @@
+"""
+Local columnar cache of the source tables (Arrow IPC / Feather files).
+
+Frames are stored already normalized (parsed dates, numeric columns,
+string ids) under LT_CACHE_DIR, one file per (name, fingerprint):
+
+    .lt_cache/<name>--<fingerprint>.arrow
+
+The fingerprint is the source file mtime/size for the Excel workbook, or
+a row-hash digest for a Postgres table.  Files are uncompressed Arrow IPC
+so they can be memory-mapped; a restart or an extra worker reads them
+instead of re-parsing the workbook or pulling the tables again.  Object
+columns Arrow cannot type (P. O. # mixing ints and strings) are pickled
+into the file's schema metadata, so a cache hit returns the same values
+as the loader, not their str().
+
+pyarrow is optional: without it every call just runs the loader.
+"""
+import glob
+import hashlib
+import os
+import pickle
+
+import pandas as pd
+from sqlalchemy import text
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+except ImportError:  # cache disabled
+    pa = None
+
+_PICKLED_KEY = b"lt_cache.pickled"
+CACHE_DIR = os.environ.get("LT_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".lt_cache"))
+CACHE_VERSION = "2"   # bump when the normalization of cached frames changes
+
+
+def enabled() -> bool:
+    return pa is not None
+
+
+def file_fingerprint(path: str, *extra) -> str:
+    st = os.stat(path)
+    return _digest(CACHE_VERSION, os.path.abspath(path), st.st_mtime_ns, st.st_size, *extra)
+
+
+def hashes_fingerprint(hashes: pd.Series) -> str:
+    """Order-independent digest of per-row hashes (see delta_refresh.TableMirror)."""
+    return _digest(CACHE_VERSION, hashlib.md5("".join(sorted(hashes.astype(str))).encode()).hexdigest())
+
+
+def db_fingerprint(engine, schema: str, table: str) -> str:
+    """Row count + digest of all row hashes, computed server-side (nothing but one row comes back)."""
+    sql = text(
+        f'SELECT count(*) AS n, md5(string_agg(md5(CAST(t AS text)), \'\' ORDER BY md5(CAST(t AS text)))) AS h '
+        f'FROM "{schema}"."{table}" AS t'
+    )
+    with engine.connect() as conn:
+        n, h = conn.execute(sql).one()
+    return _digest(CACHE_VERSION, schema, table, n, h)
+
+
+def _digest(*parts) -> str:
+    return hashlib.md5("|".join(map(str, parts)).encode()).hexdigest()[:16]
+
+
+def _path(name: str, fingerprint: str) -> str:
+    return os.path.join(CACHE_DIR, f"{name}--{fingerprint}.arrow")
+
+
+def _untyped_columns(df: pd.DataFrame) -> list:
+    """Object columns Arrow cannot type as they are (e.g. P. O. # with ints and strings)."""
+    bad = []
+    for c in df.columns:
+        if df[c].dtype != object:
+            continue
+        try:
+            pa.array(df[c], from_pandas=True)
+        except (pa.ArrowException, TypeError, ValueError):
+            bad.append(c)
+    return bad
+
+
+def normalize_for_arrow(df: pd.DataFrame) -> pd.DataFrame:
+    """Object columns Arrow cannot type (e.g. P. O. # with ints and strings) -> strings, NaN kept."""
+    if pa is None:
+        return df
+    bad = _untyped_columns(df)
+    if not bad:
+        return df
+    out = df.copy()
+    for c in bad:
+        s = df[c]
+        out[c] = s.where(s.isna(), s.astype(str))
+    return out
+
+
+def read_cached(name: str, fingerprint: str | None = None) -> pd.DataFrame | None:
+    """Cached frame for `fingerprint`, or the newest one for `name` when fingerprint is None."""
+    if pa is None:
+        return None
+    if fingerprint is not None:
+        path = _path(name, fingerprint)
+        if not os.path.exists(path):
+            return None
+    else:
+        files = glob.glob(_path(name, "*"))
+        if not files:
+            return None
+        path = max(files, key=os.path.getmtime)
+    try:
+        with pa.memory_map(path, "r") as src:
+            table = pa_ipc.open_file(src).read_all()
+    except (OSError, pa.ArrowException):
+        return None
+    df = table.to_pandas()
+    meta = table.schema.metadata or {}
+    if _PICKLED_KEY in meta:
+        columns, pickled = pickle.loads(meta[_PICKLED_KEY])
+        for c, vals in pickled.items():
+            df[c] = vals
+        df = df[columns]
+    return df
+
+
+def write_cached(name: str, fingerprint: str, df: pd.DataFrame) -> pd.DataFrame:
+    """Write atomically, drop older files for `name`; returns the frame as it was stored."""
+    if pa is None:
+        return df
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = _path(name, fingerprint)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        bad = _untyped_columns(df)
+        table = pa.Table.from_pandas(df.drop(columns=bad), preserve_index=False)
+        if bad:
+            # the mixed columns travel as pickled arrays (our own cache file, read back by read_cached)
+            payload = pickle.dumps((list(df.columns), {c: df[c].to_numpy() for c in bad}))
+            table = table.replace_schema_metadata({**(table.schema.metadata or {}), _PICKLED_KEY: payload})
+        with pa.OSFile(tmp, "wb") as sink, pa_ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp, path)
+    except (OSError, pa.ArrowException):
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        return df
+    for old in glob.glob(_path(name, "*")):
+        if old != path:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+    return df
+
+
+def cached_frame(name: str, fingerprint: str, loader) -> pd.DataFrame:
+    """Read `name` from cache when the fingerprint matches, else run `loader()` and cache its result."""
+    df = read_cached(name, fingerprint)
+    if df is not None:
+        return df
+    df = write_cached(name, fingerprint, loader())
+    # hand back the stored copy so a miss and a later hit see identical dtypes
+    stored = read_cached(name, fingerprint)
+    return df if stored is None else stored
@@ -0,0 +1,91 @@
+"""
+NAV -> QB item name normalization ("item name replace.csv", columns QB,NAV).
+
+The map is loaded once per (path, mtime) and compiled into a hash index
+of normalized NAV names.  Matching is done on a key with clean_space()
+applied (NBSP / full-width space -> ' ', stripped) and upper-cased, so
+"gc-jetson-agx64gb-orin-nvidia-jetpack-6.0 " still hits.  A column is
+translated through its distinct values only (factorize -> get_indexer ->
+take), so the cost follows the number of distinct names, not rows.
+
+    item_map = load_item_map()
+    NAV["Item"] = item_map.translate(NAV["Item"])
+    item_map.unmapped(NAV["Item"], known=pod["Item"])   # names to add to the map
+"""
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from preinstalled import clean_space_series
+
+ITEM_MAP_PATH = os.environ.get(
+    "LT_ITEM_MAP", os.path.join(os.path.dirname(os.path.abspath(__file__)), "item name replace.csv"))
+
+
+def normalize_keys(s: pd.Series) -> pd.Series:
+    """Match key: clean_space + upper-case ('' for NaN)."""
+    return clean_space_series(s).str.upper()
+
+
+class ItemNameMap:
+
+    def __init__(self, nav_names, qb_names):
+        m = pd.DataFrame({"key": normalize_keys(pd.Series(nav_names, dtype=object)),
+                          "qb": clean_space_series(pd.Series(qb_names, dtype=object))})
+        # same precedence as dict(zip(NAV, QB)): the last line wins
+        m = m[(m["key"] != "") & (m["qb"] != "")].drop_duplicates("key", keep="last")
+        self._keys = pd.Index(m["key"].to_numpy(dtype=object))
+        self._values = m["qb"].to_numpy(dtype=object)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _positions(self, items: pd.Series) -> tuple[np.ndarray, np.ndarray, pd.Index]:
+        """(codes per row, map position per distinct value or -1, distinct values)."""
+        codes, uniques = pd.factorize(items, use_na_sentinel=True)
+        uniques = pd.Index(uniques, dtype=object)
+        upos = self._keys.get_indexer(normalize_keys(pd.Series(uniques, dtype=object)))
+        return codes, upos, uniques
+
+    def translate(self, items: pd.Series) -> pd.Series:
+        """QB name where mapped, otherwise the space-cleaned original; NaN stays NaN."""
+        codes, upos, uniques = self._positions(items)
+        cleaned = clean_space_series(pd.Series(uniques, dtype=object)).to_numpy(dtype=object)
+        out_u = np.where(upos >= 0, self._values[np.maximum(upos, 0)] if len(self._values) else cleaned, cleaned)
+        out = np.empty(len(codes), dtype=object)
+        valid = codes >= 0
+        out[valid] = out_u[codes[valid]]
+        out[~valid] = np.nan
+        return pd.Series(out, index=items.index, name=items.name)
+
+    def is_mapped(self, items: pd.Series) -> np.ndarray:
+        codes, upos, _ = self._positions(items)
+        return (codes >= 0) & (upos[np.maximum(codes, 0)] >= 0) if len(upos) else np.zeros(len(codes), bool)
+
+    def unmapped(self, items: pd.Series, known=None) -> pd.DataFrame:
+        """
+        Distinct names with no map entry, with their row counts (most frequent
+        first).  known: names that are valid as-is (e.g. the QB item list) and
+        should not be reported.
+        """
+        s = clean_space_series(items[~self.is_mapped(items) & items.notna().to_numpy()])
+        s = s[s != ""]
+        if known is not None:
+            known_keys = pd.Index(normalize_keys(pd.Series(list(known), dtype=object)).unique())
+            s = s[known_keys.get_indexer(normalize_keys(s)) < 0]
+        counts = s.astype(object).value_counts()
+        return pd.DataFrame({"NAV": counts.index.astype(object), "Rows": counts.to_numpy()})
+
+
+@lru_cache(maxsize=4)
+def _load(path: str, mtime_ns: int) -> ItemNameMap:
+    m = pd.read_csv(path, dtype=str, encoding="utf-8-sig")
+    return ItemNameMap(m["NAV"], m["QB"])
+
+
+def load_item_map(path: str = ITEM_MAP_PATH) -> ItemNameMap:
+    """Cached per (path, mtime): editing the CSV is picked up on the next call."""
+    path = os.path.abspath(path)
+    return _load(path, os.stat(path).st_mtime_ns)
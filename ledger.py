@@ -0,0 +1,349 @@
+"""
+Projected-stock ledger: SO demand vs NAV/POD supply per item.
+
+Library version of build_opening_stock / build_events / build_ledger /
+compute_so_readiness from "LT Check(ZC).ipynb".  All events (OPEN
+snapshot, IN from NAV_EXP, OUT from SO) are put into flat NumPy arrays,
+sorted once by (item, date, kind) and the projected balance is a
+segmented cumulative sum over that order.  Summary, violations and SO
+readiness come out of the same arrays, readiness "catch-up" dates with
+one searchsorted instead of a per-row group scan.
+
+    res = run(SO, NAV_EXP)
+    res["ledger"], res["item_summary"], res["violations"], res["so_readiness"]
+
+    res = run_parallel(SO, NAV_EXP, workers=16)   # same result, items sharded over processes
+
+Order of the balance: per item the OPEN row first, then events by date
+(undated last), IN before OUT on the same date.  OUT rows are dated by
+the SO Ship Date.
+"""
+import numpy as np
+import pandas as pd
+
+import partition_exec
+
+KIND_ORDER = {"IN": 0, "OUT": 1}
+LEDGER_COLS = ["Date", "Item", "Delta", "Kind", "Source", "Opening", "QB Num", "P. O. #", "Name",
+               "CumDelta", "Projected_NAV", "NAV_before", "NAV_after"]
+EVENT_COLS = ["Date", "Item", "Delta", "Kind", "Source", "QB Num", "P. O. #", "Name"]
+READINESS_COLS = ["Date", "Item", "Delta", "QB Num", "P. O. #", "Name",
+                  "NAV_before", "NAV_after", "Covered_On_Date", "Covered_By_Date"]
+_INFO_COLS = ["QB Num", "P. O. #", "Name"]
+_NAT_LAST = np.iinfo(np.int64).max
+
+
+# -------------------------------
+# Helpers
+# -------------------------------
+
+def _norm_cols(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.copy(deep=False)
+    for c in ["Ship Date", "Order Date", "Arrive Date", "Date"]:
+        if c in df.columns:
+            df[c] = pd.to_datetime(df[c], errors="coerce")
+    if "Item" in df.columns:
+        df["Item"] = df["Item"].astype("string").str.strip()
+    for c in ["Qty(+)", "Qty(-)", "On Hand", "On Hand - WIP"]:
+        if c in df.columns:
+            df[c] = pd.to_numeric(df[c], errors="coerce").fillna(0.0)
+    return df
+
+
+def _dates_ns(s) -> np.ndarray:
+    s = pd.Series(s)
+    if not pd.api.types.is_datetime64_any_dtype(s):
+        s = pd.to_datetime(s, errors="coerce")
+    return np.asarray(s.dt.tz_localize(None) if s.dt.tz is not None else s, dtype="datetime64[ns]")
+
+
+def _sort_key(dates: np.ndarray) -> np.ndarray:
+    """datetime64 -> int64 with NaT sorting last."""
+    k = dates.view(np.int64).copy()
+    k[np.isnat(dates)] = _NAT_LAST
+    return k
+
+
+def build_opening_stock(SO: pd.DataFrame, prefer_wip=True) -> pd.DataFrame:
+    """
+    Opening stock per Item from the SO snapshot columns (last row per item).
+    prefer_wip=True -> use 'On Hand - WIP' if present else 'On Hand'
+    """
+    col = "On Hand - WIP" if (prefer_wip and "On Hand - WIP" in SO.columns) else "On Hand"
+    src = _norm_cols(SO[[c for c in ("Item", col) if c in SO.columns]])
+    if col not in src.columns:
+        src[col] = 0.0
+    return (src[["Item", col]]
+            .dropna()
+            .drop_duplicates(subset=["Item"], keep="last")
+            .rename(columns={col: "Opening"})
+            .reset_index(drop=True))
+
+
+def _event_arrays(so: pd.DataFrame, nav: pd.DataFrame) -> dict:
+    """IN rows (NAV Qty(+) > 0, dated by Date) then OUT rows (SO Qty(-) > 0, dated by Ship Date)."""
+    nin = nav.loc[(nav["Qty(+)"] > 0) & nav["Item"].notna()]
+    out = so.loc[(so["Qty(-)"] > 0) & so["Item"].notna()]
+    n_in, n_out = len(nin), len(out)
+    ev = {
+        "item": np.concatenate([nin["Item"].to_numpy(dtype=object), out["Item"].to_numpy(dtype=object)]),
+        "date": np.concatenate([_dates_ns(nin["Date"]), _dates_ns(out["Ship Date"])]),
+        "delta": np.concatenate([nin["Qty(+)"].to_numpy(dtype=float), -out["Qty(-)"].to_numpy(dtype=float)]),
+        "kind": np.repeat(np.array(["IN", "OUT"], dtype=object), [n_in, n_out]),
+        "source": np.repeat(np.array(["NAV", "SO"], dtype=object), [n_in, n_out]),
+    }
+    for c in _INFO_COLS:
+        vals = out[c].to_numpy(dtype=object) if c in out.columns else np.full(n_out, np.nan, dtype=object)
+        ev[c] = np.concatenate([np.full(n_in, np.nan, dtype=object), vals])
+    return ev
+
+
+def build_events(SO: pd.DataFrame, NAV_EXP: pd.DataFrame) -> pd.DataFrame:
+    """
+    Unified event table: IN from NAV_EXP, OUT from SO (negative Delta),
+    sorted by Item, Date, IN before OUT on the same date.
+    """
+    ev = _event_arrays(_norm_cols(SO), _norm_cols(NAV_EXP))
+    kord = np.where(ev["kind"] == "OUT", KIND_ORDER["OUT"], KIND_ORDER["IN"])
+    codes, _ = pd.factorize(ev["item"], sort=True)
+    order = np.lexsort((np.arange(len(codes)), kord, _sort_key(ev["date"]), codes))
+    return pd.DataFrame({
+        "Date": ev["date"][order], "Item": ev["item"][order], "Delta": ev["delta"][order],
+        "Kind": ev["kind"][order], "Source": ev["source"][order],
+        **{c: ev[c][order] for c in _INFO_COLS},
+    })[EVENT_COLS]
+
+
+# -------------------------------
+# Engine
+# -------------------------------
+
+def _project(SO: pd.DataFrame, NAV_EXP: pd.DataFrame, prefer_wip=True, today=None) -> dict:
+    """Everything in calc order (item, OPEN first, date, kind) as flat arrays."""
+    so = _norm_cols(SO)
+    nav = _norm_cols(NAV_EXP)
+    stock = build_opening_stock(so, prefer_wip=prefer_wip)
+    ev = _event_arrays(so, nav)
+    today = pd.Timestamp.today().normalize() if today is None else pd.Timestamp(today)
+
+    n_open = len(stock)
+    item = np.concatenate([stock["Item"].to_numpy(dtype=object), ev["item"]])
+    date = np.concatenate([np.full(n_open, today.to_datetime64(), dtype="datetime64[ns]"), ev["date"]])
+    delta = np.concatenate([np.zeros(n_open), ev["delta"]])
+    kind = np.concatenate([np.full(n_open, "OPEN", dtype=object), ev["kind"]])
+    source = np.concatenate([np.full(n_open, "Snapshot", dtype=object), ev["source"]])
+    info = {c: np.concatenate([np.full(n_open, np.nan, dtype=object), ev[c]]) for c in _INFO_COLS}
+
+    codes, items = pd.factorize(item, sort=True)
+    items = np.asarray(items, dtype=object)
+    opening_by_code = np.zeros(len(items))
+    opening_by_code[codes[:n_open]] = stock["Opening"].to_numpy(dtype=float)
+    has_stock = np.zeros(len(items), dtype=bool)
+    has_stock[codes[:n_open]] = True
+
+    is_event = np.ones(len(item), dtype=np.int8)
+    is_event[:n_open] = 0
+    kord = np.where(kind == "OUT", KIND_ORDER["OUT"], KIND_ORDER["IN"])
+    order = np.lexsort((np.arange(len(item)), kord, _sort_key(date), is_event, codes))
+
+    codes = codes[order]
+    delta = delta[order]
+    # segmented cumsum (groupby keeps it exact per item, no cross-item rounding)
+    cum = pd.Series(delta).groupby(codes, sort=False).cumsum().to_numpy()
+    opening = opening_by_code[codes]
+    projected = opening + cum
+    kind = kind[order]
+    is_out = kind == "OUT"
+    return {
+        "items": items, "has_stock": has_stock, "opening_by_code": opening_by_code,
+        "code": codes, "item": items[codes], "date": date[order],
+        "delta": delta, "kind": kind, "source": source[order],
+        "opening": opening,
+        "info": {c: v[order] for c, v in info.items()},
+        "cum": cum, "projected": projected,
+        "nav_before": np.where(is_out, projected - delta, np.nan),
+        "nav_after": np.where(is_out, projected, np.nan),
+    }
+
+
+def _display_order(p: dict) -> np.ndarray:
+    """Ledger presentation order: Item, Date, Kind (IN < OPEN < OUT), stable."""
+    krank = np.select([p["kind"] == "IN", p["kind"] == "OPEN"], [0, 1], 2)
+    return np.lexsort((np.arange(len(p["code"])), krank, _sort_key(p["date"]), p["code"]))
+
+
+def _ledger_frame(p: dict, rows=None) -> pd.DataFrame:
+    rows = np.arange(len(p["code"])) if rows is None else rows
+    return pd.DataFrame({
+        "Date": p["date"][rows], "Item": p["item"][rows], "Delta": p["delta"][rows],
+        "Kind": p["kind"][rows], "Source": p["source"][rows], "Opening": p["opening"][rows],
+        **{c: p["info"][c][rows] for c in _INFO_COLS},
+        "CumDelta": p["cum"][rows], "Projected_NAV": p["projected"][rows],
+        "NAV_before": p["nav_before"][rows], "NAV_after": p["nav_after"][rows],
+    })[LEDGER_COLS]
+
+
+def _item_summary(p: dict) -> pd.DataFrame:
+    n_items = len(p["items"])
+    codes, proj, dkey = p["code"], p["projected"], _sort_key(p["date"])
+    min_proj = np.full(n_items, np.nan)
+    if len(codes):
+        starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+        min_proj[codes[starts]] = np.minimum.reduceat(proj, starts)
+
+    first_date = np.full(n_items, np.datetime64("NaT"), dtype="datetime64[ns]")
+    first_val = np.full(n_items, np.nan)
+    neg = np.flatnonzero(proj < 0)
+    if len(neg):
+        o = neg[np.lexsort((neg, dkey[neg], codes[neg]))]
+        first = o[np.r_[True, codes[o][1:] != codes[o][:-1]]]
+        first_date[codes[first]] = p["date"][first]
+        first_val[codes[first]] = proj[first]
+
+    summary = pd.DataFrame({
+        "Item": p["items"],
+        "Opening": np.where(p["has_stock"], p["opening_by_code"], np.nan),
+        "Min_Projected_NAV": min_proj,
+        "First_Shortage_Date": first_date,
+        "NAV_at_First_Shortage": first_val,
+    })
+    summary["OK"] = summary["Min_Projected_NAV"].fillna(0) >= 0
+    return summary.sort_values(["OK", "Min_Projected_NAV"], ascending=[True, True], kind="stable")
+
+
+def _catchup_dates(codes, dates, projected, q_codes, q_dates) -> np.ndarray:
+    """
+    For each query (item code, date): first date on/after it where the item's
+    projected balance is >= 0 (NaT if none / undated query).
+    """
+    res = np.full(len(q_codes), np.datetime64("NaT"), dtype="datetime64[ns]")
+    ok = (projected >= 0) & ~np.isnat(dates)
+    qv = ~np.isnat(q_dates)
+    if not ok.any() or not qv.any():
+        return res
+    ok_c, ok_d = codes[ok], dates[ok].view(np.int64)
+    q_c, q_d = q_codes[qv], q_dates[qv].view(np.int64)
+    # dense date ranks so (code, date) fits one int64 key
+    uniq = np.unique(np.concatenate([ok_d, q_d]))
+    span = len(uniq) + 1
+    ok_key = ok_c.astype(np.int64) * span + np.searchsorted(uniq, ok_d)
+    srt = np.argsort(ok_key, kind="stable")
+    ok_key, ok_c, ok_d = ok_key[srt], ok_c[srt], ok_d[srt]
+    q_key = q_c.astype(np.int64) * span + np.searchsorted(uniq, q_d)
+    j = np.searchsorted(ok_key, q_key, side="left")
+    hit = j < len(ok_key)
+    hit[hit] = ok_c[j[hit]] == q_c[hit]
+    out = np.full(len(q_c), np.datetime64("NaT"), dtype="datetime64[ns]")
+    out[hit] = ok_d[j[hit]].view("datetime64[ns]")
+    res[qv] = out
+    return res
+
+
+def _readiness(codes, item, date, delta, info, nav_before, nav_after, projected, rows) -> pd.DataFrame:
+    """rows: OUT rows in output order."""
+    covered = nav_after[rows] >= 0
+    by = np.full(len(rows), np.datetime64("NaT"), dtype="datetime64[ns]")
+    nc = ~covered
+    by[nc] = _catchup_dates(codes, date, projected, codes[rows][nc], date[rows][nc])
+    return pd.DataFrame({
+        "Date": date[rows], "Item": item[rows], "Delta": delta[rows],
+        **{c: info[c][rows] for c in _INFO_COLS},
+        "NAV_before": nav_before[rows], "NAV_after": nav_after[rows],
+        "Covered_On_Date": covered, "Covered_By_Date": by,
+    })[READINESS_COLS]
+
+
+# -------------------------------
+# Public API (same shapes as the notebook)
+# -------------------------------
+
+def run(SO: pd.DataFrame, NAV_EXP: pd.DataFrame, prefer_wip=True, today=None) -> dict:
+    """ledger / item_summary / violations / so_readiness from one projection pass."""
+    p = _project(SO, NAV_EXP, prefer_wip=prefer_wip, today=today)
+    disp = _display_order(p)
+    out_rows = disp[p["kind"][disp] == "OUT"]
+    neg = np.flatnonzero(p["projected"] < 0)   # violations: OPEN rows first, then events
+    return {
+        "ledger": _ledger_frame(p, disp),
+        "item_summary": _item_summary(p),
+        "violations": _ledger_frame(p, neg[np.argsort(p["kind"][neg] != "OPEN", kind="stable")]),
+        "so_readiness": _readiness(p["code"], p["item"], p["date"], p["delta"], p["info"],
+                                   p["nav_before"], p["nav_after"], p["projected"], out_rows),
+    }
+
+
+def run_parallel(SO: pd.DataFrame, NAV_EXP: pd.DataFrame, prefer_wip=True, today=None,
+                 workers: int | None = None) -> dict:
+    """
+    run() partitioned by item over a process pool (partition_exec.py).
+    run() projects every Item on its own and never reads Parent_Item, so
+    items are not linked by BOM: shared components (SSDs, CPUs) would pull
+    most pre-installed parents into one shard.  Returns exactly what run()
+    returns, in the same order and with the same dtypes.
+    """
+    today = pd.Timestamp.today().normalize() if today is None else pd.Timestamp(today)
+    parts = partition_exec.run_partitioned(run, {"SO": SO, "NAV_EXP": NAV_EXP}, {"SO": "Item", "NAV_EXP": "Item"},
+                                           workers=workers, prefer_wip=prefer_wip, today=today)
+    return parts[0] if len(parts) == 1 else _merge_runs(parts)
+
+
+def _merge_runs(parts: list[dict]) -> dict:
+    """Shard results of run() -> one result.  Items are disjoint across shards, so a stable sort per frame does it."""
+    def cat(name):
+        # empty shard frames / all-NaN text columns come back as object: infer again from the
+        # merged values, as run() does from its object arrays
+        frames = [p[name] for p in parts if len(p[name])] or [parts[0][name]]
+        df = pd.concat(frames, ignore_index=True)
+        for c in df.columns:
+            if df[c].dtype == object:
+                df[c] = pd.Series(df[c].to_numpy(dtype=object), index=df.index)
+        return df
+
+    def item_rank(df):
+        return pd.factorize(df["Item"].to_numpy(dtype=object), sort=True)[0]
+
+    def reorder(df, *keys):   # keys major first, shard order breaks ties
+        order = np.lexsort((np.arange(len(df)),) + keys[::-1])
+        return df.take(order).reset_index(drop=True)
+
+    summary = cat("item_summary")
+    summary.index = item_rank(summary)   # run() keeps the sorted-item position as the index
+    summary = (summary.sort_index(kind="stable")
+               .sort_values(["OK", "Min_Projected_NAV"], ascending=[True, True], kind="stable"))
+    ledger, violations, readiness = cat("ledger"), cat("violations"), cat("so_readiness")
+    return {
+        "ledger": reorder(ledger, item_rank(ledger)),
+        "item_summary": summary,
+        "violations": reorder(violations, (violations["Kind"] != "OPEN").to_numpy(), item_rank(violations)),
+        "so_readiness": reorder(readiness, item_rank(readiness)),
+    }
+
+
+def build_ledger(SO: pd.DataFrame, NAV_EXP: pd.DataFrame, prefer_wip=True,
+                 today=None) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """
+    Returns:
+      ledger: per-item time-phased projection
+      item_summary: opening, min projected, first shortage date, ok flag
+      violations: rows where projection < 0
+    """
+    res = run(SO, NAV_EXP, prefer_wip=prefer_wip, today=today)
+    return res["ledger"], res["item_summary"], res["violations"]
+
+
+def compute_so_readiness(ledger: pd.DataFrame) -> pd.DataFrame:
+    """
+    OUT rows of a ledger: covered on their Ship Date or not, and if not the
+    date the item's projection is back to >= 0 (Covered_By_Date).
+    """
+    codes, _ = pd.factorize(ledger["Item"].to_numpy(dtype=object), sort=True)
+    dates = _dates_ns(ledger["Date"])
+    kind = ledger["Kind"].to_numpy(dtype=object)
+    order = np.lexsort((np.arange(len(ledger)), _sort_key(dates), codes))
+    rows = order[kind[order] == "OUT"]
+    info = {c: (ledger[c].to_numpy(dtype=object) if c in ledger.columns
+                else np.full(len(ledger), np.nan, dtype=object)) for c in _INFO_COLS}
+    return _readiness(codes, ledger["Item"].to_numpy(dtype=object), dates,
+                      ledger["Delta"].to_numpy(dtype=float), info,
+                      ledger["NAV_before"].to_numpy(dtype=float), ledger["NAV_after"].to_numpy(dtype=float),
+                      ledger["Projected_NAV"].to_numpy(dtype=float), rows)
@@ -0,0 +1,57 @@
+"""
+Row-position lookups for the LT Check web apps.
+
+A FrameIndex is built once per loaded frame and maps key values
+(QB Num, Item, Item+Site, ...) to row positions, so a request only touches
+the rows it returns instead of scanning the whole table with a boolean mask.
+The index keeps a reference to the frame it was built from; swapping the
+FrameIndex object swaps frame and index together.
+"""
+import numpy as np
+import pandas as pd
+
+_EMPTY = np.array([], dtype=np.intp)
+
+
+def _norm_key(v):
+    if isinstance(v, tuple):
+        return tuple(_norm_key(x) for x in v)
+    return "" if v is None else str(v)
+
+
+class FrameIndex:
+    """
+    FrameIndex(df, "QB Num", "Item", ("Item", "Inventory Site"))
+
+    Each spec is a column name or a tuple of column names.  Key values are
+    compared as strings (same as `df[col].astype(str) == value`); rows with a
+    missing key value are not indexed.
+    """
+
+    def __init__(self, df: pd.DataFrame, *specs):
+        self.frame = df
+        self._maps: dict = {}
+        for spec in specs:
+            cols = list(spec) if isinstance(spec, tuple) else [spec]
+            if not all(c in df.columns for c in cols):
+                continue
+            keys = [df[c].astype("string").rename(c) for c in cols]
+            groups = df.groupby(keys, sort=False, dropna=True).indices
+            if len(cols) == 1:
+                self._maps[spec] = {str(k[0] if isinstance(k, tuple) else k): v for k, v in groups.items()}
+            else:
+                self._maps[spec] = {tuple(str(x) for x in k): v for k, v in groups.items()}
+
+    def __contains__(self, spec) -> bool:
+        return spec in self._maps
+
+    def positions(self, spec, key) -> np.ndarray:
+        """Row positions (ascending) for `key` under `spec`; empty if unknown."""
+        return self._maps[spec].get(_norm_key(key), _EMPTY)
+
+    def rows(self, spec, key) -> pd.DataFrame:
+        """Matching rows in original order (a new frame, safe to modify)."""
+        return self.frame.iloc[self.positions(spec, key)].copy()
+
+    def keys(self, spec):
+        return self._maps[spec].keys()
@@ -0,0 +1,268 @@
+"""
+LT check book, generated: the "check" sheet of 20251002_LT.xlsx for every
+item and site, built from the sources instead of by hand.
+
+    lines      open sales orders (qb_report SALES_ORDERS, Qty(-))
+               + POD lines dated by NAV (POD_NAV.build()["final"], Qty(+))
+    inventory  QuickBooks "Inventory Stock Status by Site" (the workbook's
+               "inventory" sheet): On Hand / On Sales Order / Available / On PO
+
+Per (Item, Inventory Site), in the inventory report's order: one opening
+row (Qty(+) = On Hand), then the lines by Ship Date (undated last, same-date
+lines in source order, SO before POD).  projected is the running sum of
+Qty(+) - Qty(-) from the opening row; the inventory columns are repeated on
+every row and Check = Available + On PO, i.e. what the last projected
+should come back to.  Lines whose (item, site) is not in the inventory
+report follow the inventory groups, starting from 0.
+
+Items are independent, so the book is cut into shards by item and the
+shards are projected in a process pool (partition_exec.py, --workers;
+small books stay in process, the pool start-up costs more than the work).  The result is
+written as a dated snapshot, each file atomically:
+
+    reports/LT_check_20261018.parquet     (pyarrow)
+    reports/LT_check_20261018.xlsx        (openpyxl write-only, streamed row by row)
+
+Webpage.py serves the newest report in LT_REPORT_DIR on its own (its reload
+poll sees the new file) and falls back to the hand-built workbook.
+
+    python lt_report.py                       # today's report, all cores
+    python lt_report.py --workers 1 --no-xlsx
+    check = build_check(load_lines(), load_inventory())
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+import POD_NAV
+import date_render
+import frame_cache
+import partition_exec
+import qb_report
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SO_PATH = "open sales orders.CSV"
+INVENTORY_PATH = os.environ.get("LT_INVENTORY", "20251002_LT.xlsx")
+INVENTORY_SHEET = "inventory"
+REPORT_DIR = os.environ.get("LT_REPORT_DIR", os.path.join(HERE, "reports"))
+REPORT_PREFIX = "LT_check_"
+SHEET_NAME = "check"
+
+LINE_COLS = POD_NAV.FINAL_COLS
+KEYS = ["Item", "Inventory Site"]
+INV_COLS = ["On Hand", "On Sales Order", "Available", "On PO"]
+CHECK_COLS = LINE_COLS + ["projected"] + INV_COLS + ["Check"]
+XLSX_MAX_ROWS = 1_048_575        # Excel sheet limit minus the header
+_NAT_LAST = np.iinfo(np.int64).max
+
+
+# ---- sources ------------------------------------------------------------------
+
+def load_inventory(path: str = INVENTORY_PATH, sheet: str | None = INVENTORY_SHEET) -> pd.DataFrame:
+    """
+    QuickBooks "Inventory Stock Status by Site" (xlsx sheet or CSV export) ->
+    Item, Inventory Site + INV_COLS, one row per detail line, report order.
+    The first column carries the labels: site / category headers open a
+    section, "Total <name>" closes it; the site is the outermost open section.
+    """
+    raw = pd.read_csv(path, dtype=str) if path.lower().endswith(".csv") else pd.read_excel(path, sheet_name=sheet)
+    labels = raw.iloc[:, 0]
+    num = {c: pd.to_numeric(raw[c], errors="coerce") for c in INV_COLS if c in raw.columns}
+    detail = (num["On Hand"].notna() & labels.notna()
+              & ~labels.astype(str).str.startswith("Total ")).to_numpy()
+
+    site, open_sections = [], []
+    for lab, is_detail in zip(labels.tolist(), detail):
+        if not is_detail and isinstance(lab, str):
+            lab = lab.strip()
+            if lab.startswith("Total "):
+                if lab[6:] in open_sections:
+                    del open_sections[open_sections.index(lab[6:]):]
+            elif lab:
+                open_sections.append(lab)
+        site.append(open_sections[0] if open_sections else None)
+
+    out = pd.DataFrame({"Item": labels.astype(str).str.strip(), "Inventory Site": site})
+    for c in INV_COLS:
+        out[c] = num[c].fillna(0.0) if c in num else 0.0
+    return out.loc[detail].drop_duplicates(subset=KEYS, keep="first").reset_index(drop=True)
+
+
+def load_lines(so_path: str = SO_PATH, pod_path: str = POD_NAV.POD_PATH, nav_path: str = POD_NAV.NAV_PATH,
+               item_map_path: str = POD_NAV.ITEM_MAP_PATH) -> pd.DataFrame:
+    """SO lines then POD lines (LINE_COLS), dates parsed, quantities numeric, blank text -> NaN."""
+    so = qb_report.read_report(so_path, qb_report.SALES_ORDERS)
+    pod = POD_NAV.build(pod_path, nav_path, item_map_path)["final"]
+    lines = pd.concat([so.reindex(columns=LINE_COLS), pod.reindex(columns=LINE_COLS)], ignore_index=True)
+    for c in ("Order Date", "Ship Date"):
+        lines[c] = date_render.parse_dates(lines[c])
+    for c in ("Qty(-)", "Qty(+)"):
+        lines[c] = pd.to_numeric(lines[c], errors="coerce").fillna(0.0)
+    for c in ("QB Num", "P. O. #", "Name", "Item", "Inventory Site", "Remark"):
+        s = lines[c].astype(object)
+        lines[c] = s.where(~s.map(lambda v: isinstance(v, str) and not v.strip()), np.nan)
+    return lines.loc[lines["Item"].notna()].reset_index(drop=True)
+
+
+# ---- projection ---------------------------------------------------------------
+
+def _project_shard(lines: pd.DataFrame, inventory: pd.DataFrame) -> pd.DataFrame:
+    """
+    One shard (whole items): opening rows + lines -> check rows with `_g`
+    (group rank) and sorted by it.  Both frames carry `_g`; inventory has one
+    row per group it knows.
+    """
+    n_open = len(inventory)
+    opening = lines[LINE_COLS].iloc[:0].reindex(range(n_open))     # all blank, line dtypes
+    opening["Item"] = inventory["Item"].to_numpy()
+    opening["Inventory Site"] = inventory["Inventory Site"].to_numpy()
+    opening["Qty(+)"] = inventory["On Hand"].to_numpy(dtype=float)
+    rows = pd.concat([opening, lines[LINE_COLS]], ignore_index=True)
+    g = np.concatenate([inventory["_g"].to_numpy(dtype=np.int64), lines["_g"].to_numpy(dtype=np.int64)])
+    is_line = np.r_[np.zeros(n_open, dtype=np.int8), np.ones(len(lines), dtype=np.int8)]
+    ship = rows["Ship Date"].to_numpy(dtype="datetime64[ns]")
+    ship_key = ship.view(np.int64).copy()
+    ship_key[np.isnat(ship)] = _NAT_LAST
+    order = np.lexsort((np.arange(len(rows)), ship_key, is_line, g))
+
+    rows = rows.take(order).reset_index(drop=True)
+    g = g[order]
+    delta = rows["Qty(+)"].fillna(0.0).to_numpy(dtype=float) - rows["Qty(-)"].fillna(0.0).to_numpy(dtype=float)
+    rows["projected"] = pd.Series(delta).groupby(g, sort=False).cumsum().to_numpy()
+
+    # inventory columns by group; groups the report does not know -> 0
+    pos = pd.Index(inventory["_g"].to_numpy(dtype=np.int64)).get_indexer(g)
+    for c in INV_COLS:
+        vals = np.append(inventory[c].to_numpy(dtype=float), 0.0)
+        rows[c] = vals[pos]
+    rows["Check"] = rows["Available"] + rows["On PO"]
+    rows["_g"] = g
+    return rows
+
+
+def build_check(lines: pd.DataFrame, inventory: pd.DataFrame, workers: int | None = None,
+                shards: int | None = None) -> pd.DataFrame:
+    """The check book (CHECK_COLS), groups in inventory-report order."""
+    # group rank per (item, site): inventory groups first, in report order, new keys after
+    item, site = (pd.factorize(np.concatenate([inventory[c].to_numpy(dtype=object), lines[c].to_numpy(dtype=object)]),
+                               use_na_sentinel=False)[0].astype(np.int64) for c in KEYS)
+    codes, _ = pd.factorize(item * (site.max(initial=0) + 1) + site)
+    inventory = inventory.assign(_g=codes[:len(inventory)])
+    lines = lines.assign(_g=codes[len(inventory):])
+
+    # every site of an item lands in the same shard
+    parts = partition_exec.run_partitioned(_project_shard, {"lines": lines, "inventory": inventory},
+                                           {"lines": "Item", "inventory": "Item"}, workers=workers, shards=shards)
+
+    out = pd.concat(parts, ignore_index=True)
+    if len(parts) > 1:
+        # shards come back sorted by group rank: a stable sort merges them
+        out = out.take(np.argsort(out["_g"].to_numpy(), kind="stable")).reset_index(drop=True)
+    return out[CHECK_COLS]
+
+
+# ---- sinks ----------------------------------------------------------------------
+
+def write_parquet(check: pd.DataFrame, path: str):
+    tmp = f"{path}.tmp"
+    frame_cache.normalize_for_arrow(check).to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+
+
+def write_xlsx(check: pd.DataFrame, path: str, sheet: str = SHEET_NAME):
+    """Streamed (openpyxl write-only): rows go straight to the zip, memory stays flat."""
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(sheet)
+    ws.append(list(check.columns))
+    cols = []
+    for c in check.columns:
+        s = check[c]
+        if pd.api.types.is_datetime64_any_dtype(s):
+            vals = s.dt.to_pydatetime().astype(object)
+        else:
+            vals = s.to_numpy(dtype=object, copy=True)
+        vals[pd.isna(s).to_numpy()] = None
+        cols.append(vals)
+    for row in zip(*cols):
+        ws.append(row)
+    tmp = f"{path}.tmp"
+    wb.save(tmp)
+    os.replace(tmp, path)
+
+
+def report_path(day: date, ext: str, report_dir: str = REPORT_DIR) -> str:
+    return os.path.join(report_dir, f"{REPORT_PREFIX}{day:%Y%m%d}.{ext}")
+
+
+def latest_report(report_dir: str = REPORT_DIR) -> str | None:
+    """Newest dated report in `report_dir` (Parquet over xlsx for the same day), or None."""
+    found = glob.glob(os.path.join(report_dir, f"{REPORT_PREFIX}*.parquet"))
+    found += glob.glob(os.path.join(report_dir, f"{REPORT_PREFIX}*.xlsx"))
+    if not found:
+        return None
+    return max(found, key=lambda p: (os.path.basename(p).rsplit(".", 1)[0], p.endswith(".parquet")))
+
+
+def run(day: date | None = None, workers: int | None = None, xlsx: bool = True, parquet: bool = True,
+        report_dir: str = REPORT_DIR, so_path: str = SO_PATH, inventory_path: str = INVENTORY_PATH) -> dict:
+    """Build + write today's (or `day`'s) report; returns the paths written, row count and timings."""
+    day = day or date.today()
+    timings = {}
+    t = time.perf_counter()
+    lines = load_lines(so_path)
+    inventory = load_inventory(inventory_path)
+    timings["load"] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    check = build_check(lines, inventory, workers)
+    timings["build"] = time.perf_counter() - t
+
+    os.makedirs(report_dir, exist_ok=True)
+    written = []
+    if parquet and frame_cache.enabled():
+        t = time.perf_counter()
+        written.append(report_path(day, "parquet", report_dir))
+        write_parquet(check, written[-1])
+        timings["parquet"] = time.perf_counter() - t
+    if xlsx:
+        if len(check) > XLSX_MAX_ROWS:
+            print(f"{len(check)} rows do not fit one sheet; xlsx skipped", file=sys.stderr)
+        else:
+            t = time.perf_counter()
+            written.append(report_path(day, "xlsx", report_dir))
+            write_xlsx(check, written[-1])
+            timings["xlsx"] = time.perf_counter() - t
+    return {"paths": written, "rows": len(check), "timings": timings}
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Generate the dated LT check report (Parquet + xlsx).")
+    ap.add_argument("--date", help="report date, YYYY-MM-DD (default: today)")
+    ap.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    ap.add_argument("--out", default=REPORT_DIR, help="report directory")
+    ap.add_argument("--so", default=SO_PATH, help="open sales orders export")
+    ap.add_argument("--inventory", default=INVENTORY_PATH, help="inventory stock status by site (xlsx / csv)")
+    ap.add_argument("--no-xlsx", action="store_true")
+    ap.add_argument("--no-parquet", action="store_true")
+    args = ap.parse_args(argv)
+
+    day = datetime.strptime(args.date, "%Y-%m-%d").date() if args.date else None
+    res = run(day, args.workers, xlsx=not args.no_xlsx, parquet=not args.no_parquet, report_dir=args.out,
+              so_path=args.so, inventory_path=args.inventory)
+    steps = ", ".join(f"{k} {v:.2f}s" for k, v in res["timings"].items())
+    print(f"{res['rows']} rows ({steps})")
+    for p in res["paths"]:
+        print(p)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,210 @@
+"""
+Per-stage timers, row counts and snapshot gauges for the Flask apps, in
+Prometheus text format on /metrics.
+
+    METRICS = Metrics("lt_check")
+    METRICS.init_app(app, STORE, rows=lambda snap: {"check": len(snap.check)})
+
+    with METRICS.timer("filter", "item_rows"):
+        ...
+    METRICS.rows("item_rows", n)
+
+Series (all carry app="<name>"):
+
+    lt_request_seconds{endpoint,status}   histogram, whole request
+    lt_stage_seconds{stage,op}            histogram; stage is load / filter /
+                                          aggregate / serialize / render
+    lt_rows_total{op}                     counter, rows returned / loaded
+    lt_snapshot_info{version} (always 1), lt_snapshot_age_seconds,
+    lt_snapshot_rows{table}
+
+Jinja rendering is timed automatically (stage="render", op=endpoint) through
+Flask's template signals.  Every response carries the request's stages in a
+Server-Timing header.
+
+?profile=1 on any GET returns a profile of that request instead of the page:
+pyinstrument's text report when it is installed, else cProfile sorted by
+cumulative time.  Off unless LT_PROFILE=1: the apps listen on 0.0.0.0 and
+the report shows stacks with absolute file paths.
+"""
+import cProfile
+import io
+import os
+import pstats
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable
+
+from flask import Flask, Response, before_render_template, g, has_request_context, request, template_rendered
+
+try:
+    from pyinstrument import Profiler
+except ImportError:
+    Profiler = None
+
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+PROFILE_ENABLED = os.environ.get("LT_PROFILE", "0") == "1"
+PROFILE_LINES = 60
+
+
+class _Histogram:
+    __slots__ = ("counts", "total", "n")
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.total = 0.0
+        self.n = 0
+
+    def observe(self, v: float):
+        for i, b in enumerate(BUCKETS):
+            if v <= b:
+                self.counts[i] += 1
+                break
+        self.total += v
+        self.n += 1
+
+
+def _labels(d: dict) -> str:
+    def esc(v):
+        return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in d.items()) + "}"
+
+
+class Metrics:
+
+    def __init__(self, app_name: str):
+        self.app_name = app_name
+        self._lock = threading.Lock()
+        self._hist: dict[tuple, _Histogram] = defaultdict(_Histogram)   # (metric, labels tuple)
+        self._counters: dict[tuple, float] = defaultdict(float)
+        self._store = None
+        self._rows_fn: Callable | None = None
+
+    # ---- recording ----------------------------------------------------------
+
+    def observe(self, metric: str, seconds: float, **labels):
+        with self._lock:
+            self._hist[(metric, tuple(labels.items()))].observe(seconds)
+
+    def stage(self, stage: str, op: str, seconds: float):
+        self.observe("lt_stage_seconds", seconds, stage=stage, op=op)
+        if has_request_context():
+            g.setdefault("_lt_stages", []).append((f"{stage}.{op}", seconds))
+
+    @contextmanager
+    def timer(self, stage: str, op: str):
+        t = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage(stage, op, time.perf_counter() - t)
+
+    def rows(self, op: str, n: int):
+        with self._lock:
+            self._counters[("lt_rows_total", (("op", op),))] += n
+
+    # ---- exposition ---------------------------------------------------------
+
+    def render(self) -> str:
+        app = ("app", self.app_name)
+        out = []
+        with self._lock:
+            hist = sorted(self._hist.items())
+            counters = sorted(self._counters.items())
+        seen = set()
+        for (metric, labels), h in hist:
+            if metric not in seen:
+                out.append(f"# TYPE {metric} histogram")
+                seen.add(metric)
+            base = dict((app,) + labels)
+            cum = 0
+            for b, c in zip(BUCKETS, h.counts):
+                cum += c
+                out.append(f"{metric}_bucket{_labels({**base, 'le': b})} {cum}")
+            out.append(f"{metric}_bucket{_labels({**base, 'le': '+Inf'})} {h.n}")
+            out.append(f"{metric}_sum{_labels(base)} {h.total:.6f}")
+            out.append(f"{metric}_count{_labels(base)} {h.n}")
+        for (metric, labels), v in counters:
+            if metric not in seen:
+                out.append(f"# TYPE {metric} counter")
+                seen.add(metric)
+            out.append(f"{metric}{_labels(dict((app,) + labels))} {v:g}")
+
+        snap = None if self._store is None else self._store.current
+        if snap is not None:
+            base = {"app": self.app_name}
+            # the version is a source fingerprint, not a number: exported as a label
+            out.append("# TYPE lt_snapshot_info gauge")
+            out.append(f"lt_snapshot_info{_labels({**base, 'version': snap.version})} 1")
+            loaded_at = getattr(snap, "loaded_at", None)
+            if loaded_at is not None:
+                out.append("# TYPE lt_snapshot_age_seconds gauge")
+                out.append(f"lt_snapshot_age_seconds{_labels(base)} {(datetime.now() - loaded_at).total_seconds():.1f}")
+            if self._rows_fn is not None:
+                out.append("# TYPE lt_snapshot_rows gauge")
+                for table, n in self._rows_fn(snap).items():
+                    out.append(f"lt_snapshot_rows{_labels({**base, 'table': table})} {n}")
+        return "\n".join(out) + "\n"
+
+    # ---- Flask wiring -------------------------------------------------------
+
+    def init_app(self, app: Flask, store=None, rows: Callable | None = None):
+        """Request timing, template timing, Server-Timing, ?profile=1 and the /metrics route."""
+        self._store = store
+        self._rows_fn = rows
+
+        @app.before_request
+        def _start():
+            g._lt_t0 = time.perf_counter()
+            if PROFILE_ENABLED and request.method == "GET" and request.args.get("profile") == "1":
+                if Profiler is not None:
+                    g._lt_prof = Profiler()
+                    g._lt_prof.start()
+                else:
+                    g._lt_prof = cProfile.Profile()
+                    g._lt_prof.enable()
+
+        @app.after_request
+        def _finish(resp: Response):
+            t0 = g.pop("_lt_t0", None)
+            if t0 is None or request.endpoint == "metrics":
+                return resp
+            elapsed = time.perf_counter() - t0
+            self.observe("lt_request_seconds", elapsed, endpoint=request.endpoint or "unknown",
+                         status=resp.status_code)
+            stages = g.pop("_lt_stages", [])
+            timing = [f'{name.replace(".", "-")};dur={s * 1000:.2f}' for name, s in stages]
+            resp.headers["Server-Timing"] = ", ".join(timing + [f"total;dur={elapsed * 1000:.2f}"])
+            prof = g.pop("_lt_prof", None)
+            if prof is not None:
+                resp = Response(self._profile_text(prof), mimetype="text/plain")
+            return resp
+
+        def _render_start(sender, template, context, **extra):
+            if has_request_context():
+                g._lt_render_t0 = time.perf_counter()
+
+        def _render_done(sender, template, context, **extra):
+            t = g.pop("_lt_render_t0", None) if has_request_context() else None
+            if t is not None:
+                self.stage("render", request.endpoint or "template", time.perf_counter() - t)
+
+        before_render_template.connect(_render_start, app, weak=False)
+        template_rendered.connect(_render_done, app, weak=False)
+
+        @app.route("/metrics")
+        def metrics():
+            return Response(self.render(), mimetype="text/plain; version=0.0.4")
+
+    @staticmethod
+    def _profile_text(prof) -> str:
+        if Profiler is not None and isinstance(prof, Profiler):
+            prof.stop()
+            return prof.output_text(unicode=True, color=False)
+        prof.disable()
+        buf = io.StringIO()
+        pstats.Stats(prof, stream=buf).sort_stats("cumulative").print_stats(PROFILE_LINES)
+        return buf.getvalue()
@@ -0,0 +1,102 @@
+"""
+Cursor pagination, column selection and NDJSON streaming for the row
+endpoints of the web apps.
+
+    ?limit=500                 page size (capped at MAX_LIMIT)
+    ?cursor=<next_cursor>      continue after the previous page
+    ?cols=Item,Qty(-),...      only these columns
+    ?format=ndjson             stream every row, one JSON object per line
+
+A cursor is "<snapshot version>.<row offset>" (the version is the source
+fingerprint, the same in every worker); a cursor from an older
+snapshot is refused (StaleCursor) so a reload between two pages cannot
+silently skip or repeat rows.  Only the rows of the current page / chunk
+are formatted and serialized, so memory and time-to-first-byte do not
+depend on how many rows an item has.
+"""
+import json
+from typing import Callable, Iterable
+
+import numpy as np
+import pandas as pd
+from flask import Response, stream_with_context
+
+DEFAULT_LIMIT = 500
+MAX_LIMIT = 5000
+STREAM_CHUNK = 1000
+NDJSON_MIMETYPE = "application/x-ndjson"
+
+
+class PageError(ValueError):
+    """Bad paging arguments (-> 400)."""
+
+
+class StaleCursor(PageError):
+    """Cursor from another snapshot version (-> 409)."""
+
+
+def encode_cursor(version: str | int, offset: int) -> str:
+    return f"{version}.{offset}"
+
+
+def decode_cursor(cursor: str | None, version: str | int) -> int:
+    """Row offset for `cursor`; 0 when no cursor is given."""
+    if not cursor:
+        return 0
+    try:
+        v, off = cursor.rsplit(".", 1)
+        off = int(off)
+    except ValueError:
+        raise PageError(f"Bad cursor: {cursor!r}") from None
+    if v != str(version):
+        raise StaleCursor("Data was reloaded since this cursor was issued; restart from the first page.")
+    if off < 0:
+        raise PageError(f"Bad cursor: {cursor!r}")
+    return off
+
+
+def parse_limit(value: str | None, default: int | None = DEFAULT_LIMIT) -> int | None:
+    if value in (None, ""):
+        return default
+    try:
+        n = int(value)
+    except ValueError:
+        raise PageError(f"Bad limit: {value!r}") from None
+    if n <= 0:
+        raise PageError("limit must be > 0")
+    return min(n, MAX_LIMIT)
+
+
+def select_columns(available: list, cols_arg: str | None) -> list:
+    """?cols=a,b,c -> those columns (in that order); all columns when absent."""
+    if not cols_arg:
+        return list(available)
+    want = [c.strip() for c in cols_arg.split(",") if c.strip()]
+    unknown = [c for c in want if c not in available]
+    if unknown:
+        raise PageError(f"Unknown column(s): {', '.join(unknown)}")
+    return want
+
+
+def page_slice(n: int, offset: int, limit: int | None) -> tuple[slice, int | None]:
+    """(slice of the page, next offset or None at the end)."""
+    end = n if limit is None else min(n, offset + limit)
+    return slice(min(offset, n), end), (end if end < n else None)
+
+
+def ndjson_response(meta: dict, chunks: Iterable[pd.DataFrame]) -> Response:
+    """First line `meta`, then one line per row of every chunk; chunks are produced lazily."""
+    def gen():
+        yield json.dumps(meta, ensure_ascii=False, default=str) + "\n"
+        for chunk in chunks:
+            if len(chunk):
+                body = chunk.to_json(orient="records", lines=True, force_ascii=False, date_format="iso")
+                yield body if body.endswith("\n") else body + "\n"
+    return Response(stream_with_context(gen()), mimetype=NDJSON_MIMETYPE)
+
+
+def iter_chunks(frame: pd.DataFrame, positions: np.ndarray, fmt: Callable[[pd.DataFrame], pd.DataFrame],
+                chunk_rows: int = STREAM_CHUNK):
+    """Format + yield frame rows at `positions` a chunk at a time."""
+    for i in range(0, len(positions), chunk_rows):
+        yield fmt(frame.iloc[positions[i:i + chunk_rows]])
@@ -0,0 +1,182 @@
+"""
+Partitioned execution by item across a process pool.
+
+The projections (ledger.run, lt_report's check book) treat every item on
+its own.  A caller whose function does read across items (e.g. a BOM,
+NAV_EXP Parent_Item -> Item) passes those pairs as `links`: linked items
+are merged with a vectorized union-find (hook to the smaller root +
+pointer jumping, a few NumPy passes whatever the book size).  Only link
+what `fn` actually reads together: shared components (SSDs, CPUs) join
+most pre-installed parents into one closure and one big shard.  Items /
+closures are then packed into shards by row count, heaviest first onto
+the lightest shard, so every shard has about the same work.
+
+Every input frame is split by the shard of its item column and written
+once as uncompressed Arrow IPC in shared memory (/dev/shm when present).
+The workers memory-map their shard instead of receiving pickles.  Columns
+Arrow cannot type as they are (e.g. P. O. # mixing ints and strings) are
+pickled alongside, so every worker sees exactly the frame a single-process
+run would.  Rows keep their original relative order within a shard.
+
+    parts = run_partitioned(ledger.run, {"SO": so, "NAV_EXP": nav_exp},
+                            item_cols={"SO": "Item", "NAV_EXP": "Item"},
+                            workers=16, today=today)
+    # one result per shard, in shard order; the caller merges (ledger.run_parallel)
+
+Small inputs (< min_rows) and workers=1 run `fn` once in process on the
+whole frames and return [result].  Without pyarrow the pool still works,
+the shards are pickled instead.  LT_WORKERS overrides the core count.
+"""
+import heapq
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+except ImportError:
+    pa = None
+
+PARALLEL_MIN_ROWS = 200_000      # total input rows below this: no pool, the start-up costs more
+SHM_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+
+def default_workers() -> int:
+    return int(os.environ.get("LT_WORKERS", "0")) or os.cpu_count() or 1
+
+
+# ---- grouping -------------------------------------------------------------------
+
+def _key_codes(s) -> tuple[np.ndarray, np.ndarray]:
+    """Item column -> (codes, distinct shard keys): stripped strings, NaN its own key; strips distinct values only."""
+    codes, uniq = pd.factorize(pd.Series(s), use_na_sentinel=False)
+    keys = pd.Series(np.asarray(uniq, dtype=object)).astype("string").str.strip()
+    return codes, keys.to_numpy(dtype=object, na_value=np.nan)
+
+
+def components(n: int, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Union-find over n nodes and edges a[i] - b[i] -> root (smallest node) per node."""
+    parent = np.arange(n)
+    if len(a) == 0:
+        return parent
+    while True:
+        ra, rb = parent[a], parent[b]
+        if (ra == rb).all():
+            return parent
+        lo = np.minimum(ra, rb)
+        np.minimum.at(parent, ra, lo)
+        np.minimum.at(parent, rb, lo)
+        while True:
+            up = parent[parent]
+            if (up == parent).all():
+                break
+            parent = up
+
+
+def plan_shards(cols: list, n_shards: int, links=()) -> list[np.ndarray]:
+    """
+    Shard number per row of every item column in `cols`.  Items joined by
+    `links` ((a, b) pairs of item columns) share a shard; closures are
+    balanced by row count (largest first, onto the lightest shard; ties by
+    first appearance, so the plan is deterministic).
+    """
+    parts = [_key_codes(c) for c in list(cols) + [x for pair in links for x in pair]]
+    # one code space over the distinct keys of all columns
+    gcodes, guniq = pd.factorize(np.concatenate([u for _, u in parts]) if parts else np.empty(0, dtype=object),
+                                 use_na_sentinel=False)
+    offs = np.cumsum([0] + [len(u) for _, u in parts])
+    codes = [gcodes[offs[i] + c] for i, (c, _) in enumerate(parts)]
+    na = np.flatnonzero(pd.isna(guniq))
+    la, lb = [], []
+    for a, b in zip(codes[len(cols)::2], codes[len(cols) + 1::2]):
+        ok = ~(np.isin(a, na) | np.isin(b, na))
+        la.append(a[ok])
+        lb.append(b[ok])
+    root = components(len(guniq), np.concatenate(la) if la else np.empty(0, dtype=np.int64),
+                      np.concatenate(lb) if lb else np.empty(0, dtype=np.int64))
+
+    row_codes = codes[:len(cols)]
+    weight = np.bincount(root[np.concatenate(row_codes)] if row_codes else np.empty(0, dtype=np.int64),
+                         minlength=len(guniq))
+    comps = np.flatnonzero(weight)
+    comps = comps[np.argsort(-weight[comps], kind="stable")]
+    shard_of_root = np.zeros(len(guniq), dtype=np.int32)
+    heap = [(0, s) for s in range(n_shards)]
+    for c in comps.tolist():
+        load, s = heapq.heappop(heap)
+        shard_of_root[c] = s
+        heapq.heappush(heap, (load + int(weight[c]), s))
+    return [shard_of_root[root[rc]] for rc in row_codes]
+
+
+# ---- shared shard files -------------------------------------------------------
+
+def _arrow_ok(s: pd.Series) -> bool:
+    try:
+        pa.array(s, from_pandas=True)
+    except (pa.ArrowException, TypeError, ValueError):
+        return False
+    return True
+
+
+def _write_shard(df: pd.DataFrame, path: str) -> dict:
+    safe = [c for c in df.columns if df[c].dtype != object or _arrow_ok(df[c])]
+    table = pa.Table.from_pandas(df[safe], preserve_index=False)
+    with pa.OSFile(path, "wb") as sink, pa_ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    return {"path": path, "columns": list(df.columns),
+            "objects": [c for c in safe if df[c].dtype == object],   # Arrow hands these back as str
+            "pickled": {c: df[c].to_numpy() for c in df.columns if c not in safe}}
+
+
+def _read_shard(src: dict) -> pd.DataFrame:
+    with pa.memory_map(src["path"], "r") as f:
+        df = pa_ipc.open_file(f).read_all().to_pandas(split_blocks=True)
+    for c in src["objects"]:
+        df[c] = df[c].astype(object)
+    for c, vals in src["pickled"].items():
+        df[c] = vals
+    return df[src["columns"]]
+
+
+def _run_shard(fn: Callable, sources: list, kwargs: dict):
+    frames = [_read_shard(s) if isinstance(s, dict) else s for s in sources]
+    return fn(*frames, **kwargs)
+
+
+# ---- driver -------------------------------------------------------------------------
+
+def run_partitioned(fn: Callable, frames: dict[str, pd.DataFrame], item_cols: dict[str, str], links=(),
+                    workers: int | None = None, shards: int | None = None, min_rows: int | None = None,
+                    **kwargs) -> list:
+    """
+    fn(*frames.values(), **kwargs) per shard in a process pool -> results in
+    shard order (empty shards skipped).  `fn` must be a module-level function
+    (it is pickled by name).
+    """
+    workers = workers or default_workers()
+    names = list(frames)
+    total = sum(len(df) for df in frames.values())
+    if workers <= 1 or total < (PARALLEL_MIN_ROWS if min_rows is None else min_rows):
+        return [fn(*frames.values(), **kwargs)]
+
+    n = shards or workers
+    shard_ids = plan_shards([frames[k][item_cols[k]] for k in names], n, links)
+    with tempfile.TemporaryDirectory(prefix="lt-shards-", dir=SHM_DIR) as tmp:
+        tasks = []
+        for s in range(n):
+            if not any((ids == s).any() for ids in shard_ids):
+                continue
+            sources = []
+            for k, ids in zip(names, shard_ids):
+                part = frames[k].loc[ids == s]
+                sources.append(_write_shard(part, os.path.join(tmp, f"{s}-{k}.arrow")) if pa is not None else part)
+            tasks.append(sources)
+        with ProcessPoolExecutor(max_workers=min(workers, n)) as ex:
+            futures = [ex.submit(_run_shard, fn, sources, kwargs) for sources in tasks]
+            return [f.result() for f in futures]
@@ -0,0 +1,183 @@
+"""
+Allocation of NAV partial receipts to POD lines (split_pod_by_nav).
+
+POD lines and NAV receipts (Qty(+) > 0) are matched on (QB Num, Item).
+Both sides are sorted once by key; inside a key each POD line covers an
+interval of the cumulative ordered qty and each NAV receipt an interval of
+the cumulative received qty.  Cutting both at the union of their interval
+ends gives every (POD line, NAV receipt) overlap in one linear pass:
+
+    POD   |---- 6 ----|-- 3 --|
+    NAV   |-- 4 --|--- 5 ---|
+    ->    (L1,R1,4) (L1,R2,2) (L2,R2,3)
+
+i.e. FIFO: receipts are consumed by POD lines in order and a receipt left
+over after one line carries on into the next line of the same key.  What
+NAV does not cover becomes a residual row (original Deliv Date); POD lines
+whose key has no NAV receipt at all are returned as unmatched (note in
+the notebook's "Split_Note" column, as in 'Unmatched items.xlsx').
+
+    res = allocate(pod, NAV_EXP)
+    res["splitted"], res["unmatched"], res["diagnostics"]
+"""
+import numpy as np
+import pandas as pd
+
+KEYS = ["QB Num", "Item"]
+NOTE_COL = "Split Note"
+UNMATCHED_NOTE_COL = "Split_Note"       # notebook name, kept for 'Unmatched items.xlsx'
+NOTE_ALLOCATED = "Allocated from NAV"
+NOTE_RESIDUAL = "Residual (not yet covered by NAV)"
+NOTE_UNMATCHED = "Unmatched (no NAV receipts)"
+PREFER_COLS = ["Order Date", "QB Num", "Name", "Item", "Qty(+)", "Deliv Date", NOTE_COL]
+_NAT_LAST = np.iinfo(np.int64).max
+
+
+def _norm(df: pd.DataFrame, date_col: str) -> pd.DataFrame:
+    df = df.copy(deep=False)
+    for c in KEYS:
+        df[c] = df[c].astype(str).str.strip()
+    df["Qty(+)"] = pd.to_numeric(df["Qty(+)"], errors="coerce")
+    if date_col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[date_col]):
+        df[date_col] = pd.to_datetime(df[date_col], errors="coerce")
+    return df
+
+
+def _key_codes(pod: pd.DataFrame, nav: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+    """Shared (QB Num, Item) codes for both sides, ordered like the keys."""
+    both = pd.concat([pod[KEYS], nav[KEYS]], ignore_index=True)
+    codes = both.groupby(KEYS, sort=True, dropna=False).ngroup().to_numpy()   # blank keys match each other
+    return codes[:len(pod)], codes[len(pod):]
+
+
+def _segment_cumsum(values: np.ndarray, codes: np.ndarray) -> np.ndarray:
+    return pd.Series(values).groupby(codes, sort=False).cumsum().to_numpy()
+
+
+def allocate(pod: pd.DataFrame, nav_exp: pd.DataFrame, tol: float = 1e-6, nav_date_col: str = "Date") -> dict:
+    """
+    Returns:
+      splitted   : POD split into NAV-covered partial rows + residual rows
+      allocated  : the NAV-covered rows only
+      residuals  : the residual rows only
+      unmatched  : POD rows with no NAV rows for the same (QB Num, Item)
+      diagnostics: counts / quantities of the run
+    """
+    pod_ = _norm(pod, "Deliv Date")
+    nav_ = _norm(nav_exp, nav_date_col)
+    nav_ = nav_.loc[nav_["Qty(+)"] > 0]
+
+    pod_code, nav_code = _key_codes(pod_, nav_)
+    n_keys = max(pod_code.max(initial=-1), nav_code.max(initial=-1)) + 1
+    nav_keys = np.zeros(n_keys, dtype=bool)
+    nav_keys[nav_code] = True
+    pod_keys = np.zeros(n_keys, dtype=bool)
+    pod_keys[pod_code] = True
+    matched = nav_keys[pod_code]
+    unmatched = pod_.loc[~matched].reset_index(drop=True).assign(**{UNMATCHED_NOTE_COL: NOTE_UNMATCHED})
+
+    if not matched.any():
+        # no (QB Num, Item) shared with NAV (also empty inputs): nothing to cut
+        empty = pod_.iloc[:0].assign(**{NOTE_COL: pd.Series(dtype=object)})
+        empty = empty[[c for c in PREFER_COLS if c in empty.columns] + [c for c in empty.columns if c not in PREFER_COLS]]
+        diagnostics = {
+            "pod_lines": int(len(pod_)), "nav_receipts": int(len(nav_)),
+            "matched_lines": 0, "unmatched_lines": int(len(pod_)),
+            "allocated_rows": 0, "residual_rows": 0, "allocated_qty": 0.0, "residual_qty": 0.0,
+            "nav_unused_qty": 0.0, "nav_keys_without_pod": int((nav_keys & ~pod_keys).sum()),
+        }
+        return {"splitted": empty, "allocated": empty.copy(), "residuals": empty.copy(),
+                "unmatched": unmatched, "diagnostics": diagnostics}
+
+    # ---- sort both sides once: POD by key (input order inside), NAV by key, date (NaT last)
+    p_pos = np.flatnonzero(matched)
+    p_pos = p_pos[np.argsort(pod_code[p_pos], kind="stable")]
+    p_code = pod_code[p_pos]
+    p_qty = np.clip(pod_["Qty(+)"].to_numpy(dtype=float)[p_pos], 0, None)
+    p_qty = np.nan_to_num(p_qty)
+    p_end = _segment_cumsum(p_qty, p_code)
+
+    n_dates = np.asarray(nav_[nav_date_col], dtype="datetime64[ns]")
+    n_dkey = n_dates.view(np.int64).copy()
+    n_dkey[np.isnat(n_dates)] = _NAT_LAST
+    n_pos = np.flatnonzero(pod_keys[nav_code])
+    n_pos = n_pos[np.lexsort((n_pos, n_dkey[n_pos], nav_code[n_pos]))]
+    n_code = nav_code[n_pos]
+    n_qty = nav_["Qty(+)"].to_numpy(dtype=float)[n_pos]
+    n_end = _segment_cumsum(n_qty, n_code)
+    n_date = n_dates[n_pos]
+
+    # ---- cut at the union of interval ends, per key (a 0 start per POD key)
+    starts = np.unique(p_code)
+    b_code = np.concatenate([p_code, n_code, starts])
+    b_val = np.concatenate([p_end, n_end, np.zeros(len(starts))])
+    b_kind = np.repeat(np.array([1, 2, 0], dtype=np.int8), [len(p_code), len(n_code), len(starts)])
+    o = np.lexsort((b_val, b_code))
+    b_code, b_val, b_kind = b_code[o], b_val[o], b_kind[o]
+    # lines / receipts fully consumed at or before each boundary (global, keys are contiguous)
+    pod_done = np.cumsum(b_kind == 1)
+    nav_done = np.cumsum(b_kind == 2)
+    # one cut per distinct (key, value): keep the last of ties
+    last = np.r_[(b_code[1:] != b_code[:-1]) | (b_val[1:] != b_val[:-1]), True]
+    b_code, b_val, pod_done, nav_done = b_code[last], b_val[last], pod_done[last], nav_done[last]
+
+    seg = np.flatnonzero(b_code[:-1] == b_code[1:])     # segment k: [b_val[k], b_val[k+1])
+    length = b_val[seg + 1] - b_val[seg]
+    li = pod_done[seg]                                    # POD line covering the segment
+    ri = nav_done[seg]                                    # NAV receipt covering the segment
+    has_line = np.r_[p_code, -1][li] == b_code[seg]
+    has_rcpt = np.r_[n_code, -1][ri] == b_code[seg]
+
+    alloc = has_line & has_rcpt & (length > tol)
+    a_line, a_rcpt, a_qty = li[alloc], ri[alloc], length[alloc]
+
+    resid_qty = np.zeros(len(p_code))
+    r_sel = has_line & ~has_rcpt
+    np.add.at(resid_qty, li[r_sel], length[r_sel])
+    r_line = np.flatnonzero(resid_qty > tol)
+
+    # ---- build output rows (POD columns + new qty / date / note)
+    allocated = pod_.take(p_pos[a_line])
+    allocated["Qty(+)"] = a_qty
+    allocated["Deliv Date"] = n_date[a_rcpt]
+    allocated[NOTE_COL] = NOTE_ALLOCATED
+
+    residuals = pod_.take(p_pos[r_line])
+    residuals["Qty(+)"] = resid_qty[r_line]
+    residuals[NOTE_COL] = NOTE_RESIDUAL
+
+    # same row order as the per-line loop: each POD line's partials, then its residual
+    src_pos = np.r_[p_pos[a_line], p_pos[r_line]]
+    is_resid = np.repeat([0, 1], [len(a_line), len(r_line)])
+    order = np.lexsort((np.arange(len(src_pos)), is_resid, src_pos))
+    splitted = pd.concat([allocated, residuals]).iloc[order]
+    cols = [c for c in PREFER_COLS if c in splitted.columns] + [c for c in splitted.columns if c not in PREFER_COLS]
+    splitted = splitted[cols]
+    if len(splitted):
+        splitted = splitted.sort_values(["QB Num", "Item", "Deliv Date"], kind="mergesort")
+
+    diagnostics = {
+        "pod_lines": int(len(pod_)),
+        "nav_receipts": int(len(nav_)),
+        "matched_lines": int(matched.sum()),
+        "unmatched_lines": int((~matched).sum()),
+        "allocated_rows": int(len(a_line)),
+        "residual_rows": int(len(r_line)),
+        "allocated_qty": float(a_qty.sum()),
+        "residual_qty": float(resid_qty.sum()),
+        "nav_unused_qty": float(n_qty.sum() - a_qty.sum()),   # on keys that have POD lines
+        "nav_keys_without_pod": int((nav_keys & ~pod_keys).sum()),
+    }
+    return {
+        "splitted": splitted,
+        "allocated": splitted[splitted[NOTE_COL] == NOTE_ALLOCATED],
+        "residuals": splitted[splitted[NOTE_COL] == NOTE_RESIDUAL],
+        "unmatched": unmatched,
+        "diagnostics": diagnostics,
+    }
+
+
+def split_pod_by_nav(pod: pd.DataFrame, nav_exp: pd.DataFrame, tol=1e-6) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Notebook signature: (pod_splitted, pod_unmatched)."""
+    res = allocate(pod, nav_exp, tol=tol)
+    return res["splitted"], res["unmatched"]
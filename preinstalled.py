@@ -0,0 +1,170 @@
+"""
+Pre-installed BOM expansion.
+
+NAV / "NT Shipping Schedule" lines for pre-installed systems carry their
+components in the description, e.g.
+
+    "SEMIL-2047GC-CRL, including i9-13900E, 2x SSD-1TB"
+
+Everything here works on whole frames with pandas string ops: the
+descriptions are split once, components are exploded into one long frame
+and the "Nx" prefixes are extracted in bulk.  No per-row DataFrames.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+INCL_SPLIT = re.compile(r"\bincluding\b", re.IGNORECASE)
+QTYX_RE = re.compile(r"^\s*(\d+)\s*x\s*(.+?)\s*$", re.IGNORECASE)  # "2x SSD-1TB"
+
+EXPANDED_COLS = ["Parent_Item", "Qty_per_parent", "IsParent"]
+
+
+def clean_space(s: str) -> str:
+    if not isinstance(s, str):
+        return ""
+    # Normalize NBSP etc.
+    return s.replace('\u00A0', ' ').replace('\u3000', ' ').strip()
+
+
+def clean_space_series(s: pd.Series) -> pd.Series:
+    """Vectorized clean_space(): NBSP / full-width space -> ' ', strip, NaN -> ''."""
+    s = s.astype("string").fillna("")
+    return s.str.replace('\u00A0', ' ', regex=False).str.replace('\u3000', ' ', regex=False).str.strip()
+
+
+def parse_description(desc: str) -> tuple[str, list[str]]:
+    """
+    Returns (parent_code, component_tokens[])
+    e.g. "SEMIL-2047GC-CRL, including i9-13900E, 2x SSD-1TB"
+    -> ("SEMIL-2047GC-CRL", ["i9-13900E", "2x SSD-1TB"])
+    """
+    s = clean_space(desc)
+    parts = INCL_SPLIT.split(s, maxsplit=1)
+    # parent part may have a trailing ", ..." — keep only before first comma
+    parent = clean_space(parts[0].split(",")[0])
+    comps = []
+    if len(parts) > 1:
+        comps = [clean_space(x) for x in parts[1].split(",") if clean_space(x)]
+    return parent, comps
+
+
+def parse_component_token(token: str) -> tuple[str, float]:
+    """
+    Parses a component token possibly with 'Nx ' prefix.
+    Returns (item_code, qty_per_parent).
+    """
+    m = QTYX_RE.match(token)
+    if m:
+        return clean_space(m.group(2)), float(m.group(1))
+    return clean_space(token), 1.0
+
+
+def expand_preinstalled(
+    df: pd.DataFrame,
+    desc_col: str = "Description",
+    item_col: str = "Item",
+    qty_col: str = "Qty(+)",
+    squeeze_spaces: bool = False,
+    comp_sep: str = ",",
+) -> pd.DataFrame:
+    """
+    Expand every row of `df` into its components plus one parent row.
+
+    Output keeps all input columns and adds Parent_Item / Qty_per_parent /
+    IsParent.  For each source row the component rows come first (in
+    description order) followed by the parent row, same as the old loops.
+    Component Qty(+) = source Qty(+) * Nx prefix.
+
+    squeeze_spaces=True removes every blank from the resulting Item codes
+    (the POD_NAV.py behaviour, "2x SSD-1TB" -> "SSD-1TB").
+
+    comp_sep separates the components after "including": "," as in the
+    notebook's parse_description(); POD_NAV.py / 9.py split on ", ", so a
+    "mPCIe-CAN-IPEH-4047,Cbl-W20F-..." token stays one item there.
+    """
+    src = df.reset_index(drop=True)
+    n = len(src)
+    if n == 0:
+        return src.reindex(columns=list(src.columns) + EXPANDED_COLS)
+
+    desc = clean_space_series(src[desc_col]) if desc_col in src.columns else pd.Series("", index=src.index, dtype="string")
+    parts = desc.str.split(INCL_SPLIT, n=1, expand=True, regex=True)
+    head = parts[0]
+    tail = parts[1] if parts.shape[1] > 1 else pd.Series(pd.NA, index=src.index, dtype="string")
+
+    # parent code: text before the first comma, falling back to the Item
+    parent = head.str.split(",", n=1).str[0].str.strip()
+    fallback = clean_space_series(src[item_col]) if item_col in src.columns else ""
+    parent = parent.where(parent.fillna("") != "", fallback)
+
+    # one token per component, index = source position
+    tokens = tail.str.split(comp_sep, regex=False).explode().str.strip()
+    tokens = tokens[tokens.fillna("") != ""]
+
+    qtyx = tokens.str.extract(QTYX_RE)
+    comp_item = qtyx[1].fillna(tokens).str.strip()
+    comp_per = pd.to_numeric(qtyx[0], errors="coerce").fillna(1.0).astype(float)
+
+    base_qty = pd.to_numeric(src[qty_col], errors="coerce").fillna(0.0).astype(float) if qty_col in src.columns \
+        else pd.Series(0.0, index=src.index)
+
+    pos = tokens.index.to_numpy(dtype=np.int64)
+    comps = src.take(pos).reset_index(drop=True)
+    comps[item_col] = comp_item.to_numpy(dtype=object)
+    comps[qty_col] = base_qty.to_numpy()[pos] * comp_per.to_numpy()
+    comps["Parent_Item"] = parent.to_numpy(dtype=object)[pos]
+    comps["Qty_per_parent"] = comp_per.to_numpy()
+    comps["IsParent"] = False
+
+    parents = src.copy()
+    parents[item_col] = parent.to_numpy(dtype=object)
+    parents["Parent_Item"] = parents[item_col]
+    parents["Qty_per_parent"] = 1.0
+    parents["IsParent"] = True
+
+    out = pd.concat([comps, parents], ignore_index=True)
+    if squeeze_spaces:
+        for c in (item_col, "Parent_Item"):
+            out[c] = out[c].astype("string").str.replace(r"\s+", "", regex=True).astype(object)
+
+    # stable order: source row, components before the parent
+    order_pos = np.concatenate([pos, np.arange(n, dtype=np.int64)])
+    order_parent = np.concatenate([np.zeros(len(pos), dtype=np.int8), np.ones(n, dtype=np.int8)])
+    order = np.lexsort((order_parent, order_pos))
+    return out.take(order).reset_index(drop=True)
+
+
+def expand_nav_preinstalled(NAV: pd.DataFrame) -> pd.DataFrame:
+    """
+    NT Shipping Schedule -> expanded NAV (components + parents for Pre rows,
+    non-Pre rows pass through as their own parent).  Adds 'Date' = Ship Date + 5d.
+    """
+    for col in ["Pre/Bare", "Qty(+)", "Item"]:
+        if col not in NAV.columns:
+            raise ValueError(f"NAV must contain '{col}' column.")
+    NAV = NAV.copy()
+    if "Description" not in NAV.columns:
+        NAV["Description"] = ""
+    NAV["Description"] = clean_space_series(NAV["Description"]).astype(object)
+
+    pre_mask = NAV["Pre/Bare"].astype(str).str.strip().str.casefold().eq("pre")
+    expanded_pre = expand_preinstalled(NAV.loc[pre_mask])
+
+    nav_other = NAV.loc[~pre_mask].copy()
+    nav_other["Parent_Item"] = nav_other["Item"]
+    nav_other["Qty_per_parent"] = 1.0
+    nav_other["IsParent"] = True  # single line is its own parent
+
+    needed_cols = list(NAV.columns) + EXPANDED_COLS
+    expanded_all = pd.concat(
+        [expanded_pre.reindex(columns=needed_cols), nav_other.reindex(columns=needed_cols)],
+        ignore_index=True,
+    )
+
+    expanded_all["Qty(+)"] = pd.to_numeric(expanded_all["Qty(+)"], errors="coerce").fillna(0.0)
+    expanded_all["Qty_per_parent"] = pd.to_numeric(expanded_all["Qty_per_parent"], errors="coerce").fillna(1.0)
+    expanded_all["IsParent"] = expanded_all["IsParent"].astype(bool)
+    expanded_all["Date"] = pd.to_datetime(expanded_all["Ship Date"], errors="coerce") + pd.Timedelta(days=5)
+    return expanded_all
@@ -0,0 +1,117 @@
+"""
+Streaming parser for QuickBooks report exports ("open purchase orders.csv",
+"open sales orders.CSV").
+
+The exports are grouped reports: the first (unnamed) column carries the
+section / item headers ("Inventory", "Accessory", "<item>") and the
+"Total ..." subtotal rows, detail lines leave it empty.  The file is read
+in chunks, label rows are skipped, every detail line is normalized to a
+fixed set of columns and dtypes, and chunks are written out as they come,
+so memory stays flat whatever the size of the dump.
+
+    for chunk in iter_report("open purchase orders.csv", PURCHASE_ORDERS):
+        ...
+    write_report("open purchase orders.csv", "open purchase2.csv", PURCHASE_ORDERS)
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+import date_render
+
+CHUNK_ROWS = 50_000
+
+# Open purchase orders -> POD lines (POD_NAV.py)
+PURCHASE_ORDERS = {
+    "rename": {"Date": "Order Date", "Num": "QB Num", "P. O. #": "P. O. #", "Source Name": "Name",
+               "Deliv Date": "Deliv Date", "Backordered": "Qty(+)", "Item": "Item",
+               "Inventory Site": "Inventory Site"},
+    "min_values": 5,                 # 刪除有效值少於5個的行
+    "dates": ["Order Date", "Deliv Date"],
+    "numeric": ["Qty(+)"],
+    "split_paren": ["QB Num"],       # "POD-250574(1)" -> "POD-250574"
+    "strip_chars": "",
+    "constants": {},
+}
+
+# Open sales orders -> SO lines (POD_NAV_1.ipynb)
+SALES_ORDERS = {
+    "rename": {"Date": "Order Date", "Ship Date": "Ship Date", "Num": "QB Num", "P. O. #": "P. O. #",
+               "Name": "Name", "Backordered": "Qty(-)", "Item": "Item", "Inventory Site": "Inventory Site"},
+    "min_values": 6,
+    "dates": ["Order Date", "Ship Date"],
+    "numeric": ["Qty(-)"],
+    "split_paren": [],
+    "strip_chars": "*",
+    "constants": {"Qty(+)": 0.0, "Remark": ""},
+}
+
+SOURCE_DATE_FMT = "%m/%d/%Y"
+OUT_DATE_FMT = "%Y/%m/%d"
+
+
+def output_columns(spec: dict) -> list[str]:
+    return list(spec["rename"].values()) + [c for c in spec["constants"] if c not in spec["rename"].values()]
+
+
+def normalize_chunk(chunk: pd.DataFrame, label_col: str, spec: dict) -> pd.DataFrame:
+    """One raw chunk (all str) -> detail lines with fixed columns / dtypes."""
+    body = chunk.loc[chunk[label_col].isna()].drop(columns=label_col)
+    body = body.rename(columns=spec["rename"])
+    body = body.dropna(how="all").dropna(thresh=spec["min_values"])
+
+    # "Accessory:AccsyBx-..." -> "AccsyBx-..."
+    body["Item"] = body["Item"].str.split(":").str[1]
+    for ch in spec["strip_chars"]:
+        body["Item"] = body["Item"].str.replace(ch, "", regex=False)
+    for c in spec["split_paren"]:
+        body[c] = body[c].str.split("(").str[0]
+    for c in spec["dates"]:
+        body[c] = date_render.format_dates(body[c], OUT_DATE_FMT, na=np.nan, formats=(SOURCE_DATE_FMT,), infer=False)
+    for c in spec["numeric"]:
+        body[c] = pd.to_numeric(body[c].str.replace(",", "", regex=False), errors="coerce").astype("float64")
+    for c, v in spec["constants"].items():
+        body[c] = v
+
+    cols = output_columns(spec)
+    text_cols = [c for c in cols if c not in spec["numeric"] and not isinstance(spec["constants"].get(c), float)]
+    body[text_cols] = body[text_cols].astype(object)
+    return body[cols]
+
+
+def iter_report(path: str, spec: dict, chunksize: int = CHUNK_ROWS, encoding: str = "utf-8-sig"):
+    """Yield normalized detail-line chunks of a QuickBooks report export."""
+    header = pd.read_csv(path, nrows=0, encoding=encoding, encoding_errors="replace").columns
+    label_col = header[0]
+    usecols = [label_col] + [c for c in spec["rename"] if c in header]
+    reader = pd.read_csv(path, usecols=usecols, dtype=str, chunksize=chunksize,
+                         encoding=encoding, encoding_errors="replace")
+    with reader:
+        for chunk in reader:
+            out = normalize_chunk(chunk, label_col, spec)
+            if len(out):
+                yield out
+
+
+def read_report(path: str, spec: dict, chunksize: int = CHUNK_ROWS) -> pd.DataFrame:
+    parts = list(iter_report(path, spec, chunksize))
+    if not parts:
+        return pd.DataFrame(columns=output_columns(spec))
+    return pd.concat(parts, ignore_index=True)
+
+
+def write_report(path: str, dst: str, spec: dict, chunksize: int = CHUNK_ROWS) -> int:
+    """Stream `path` into CSV `dst` chunk by chunk (atomic replace at the end); returns row count."""
+    tmp = f"{dst}.tmp"
+    rows = 0
+    pd.DataFrame(columns=output_columns(spec)).to_csv(tmp, index=False)
+    try:
+        for chunk in iter_report(path, spec, chunksize):
+            chunk.to_csv(tmp, mode="a", header=False, index=False)
+            rows += len(chunk)
+        os.replace(tmp, dst)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return rows
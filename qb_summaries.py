@@ -0,0 +1,93 @@
+"""
+Per-QB Num summaries for the LT Check page, materialized at load time.
+
+build_qb_summaries(check) returns {qb_num: summary} for every QB Num of the
+"check" frame (Webpage.load_check() column names), same dict shape as the
+old per-request Webpage.qb_summary():
+
+    qb_num, item, site, ship_date, need_qty,
+    projected / on_hand / on_sale / available / on_po totals,
+    lines: one dict per row, sorted by item, ship_date (missing last)
+
+All groups are done in one pass: a single lexsort puts every QB's lines
+in display order, totals are reduceat sums over the group boundaries and
+the "main" line (earliest ship date, undated first) is picked per group
+from a second sort.  The summaries are shared by all requests of a
+snapshot; treat them as read-only.
+"""
+import numpy as np
+import pandas as pd
+
+LINE_COLS = ["item", "site", "ship_date", "qty_minus", "qty_plus",
+             "projected", "on_hand", "on_sale", "available", "on_po", "po_num", "remark", "name"]
+NUM_COLS = ["qty_minus", "qty_plus", "projected", "on_hand", "on_sale", "available", "on_po"]
+TOTAL_COLS = ["projected", "on_hand", "on_sale", "available", "on_po"]
+_BIG = np.iinfo(np.int64).max
+
+
+def _date_key(d: pd.Series, nat_first: bool) -> np.ndarray:
+    k = d.to_numpy(dtype="datetime64[ns]").view(np.int64).copy()
+    k[d.isna().to_numpy()] = np.iinfo(np.int64).min if nat_first else _BIG
+    return k
+
+
+def build_qb_summaries(df: pd.DataFrame, key_col: str = "qb_num") -> dict[str, dict]:
+    if key_col not in df.columns or df.empty:
+        return {}
+    keys = df[key_col].astype("string")
+    sub = df.loc[keys.notna().to_numpy()]
+    keys = keys[keys.notna()].to_numpy(dtype=object)
+    n = len(sub)
+    if n == 0:
+        return {}
+
+    cols = {}
+    for c in LINE_COLS:
+        cols[c] = sub[c] if c in sub.columns else pd.Series([None] * n, index=sub.index, dtype=object)
+    ship = pd.to_datetime(cols["ship_date"], errors="coerce")
+    for c in NUM_COLS:
+        cols[c] = pd.to_numeric(cols[c], errors="coerce").fillna(0.0).astype(float)
+
+    key_codes, uniq = pd.factorize(keys)
+    item = cols["item"].astype("string")
+    item_codes, _ = pd.factorize(item, sort=True)
+    item_codes = np.where(item.isna().to_numpy(), _BIG, item_codes)
+    pos = np.arange(n)
+
+    # display order inside each QB: item, ship_date (missing last); groups contiguous
+    order = np.lexsort((pos, _date_key(ship, nat_first=False), item_codes, key_codes))
+    g = key_codes[order]
+    starts = np.flatnonzero(np.r_[True, g[1:] != g[:-1]])
+    ends = np.r_[starts[1:], n]
+
+    lines_df = pd.DataFrame({c: cols[c].to_numpy()[order] if c != "ship_date" else
+                             ship.dt.strftime("%Y-%m-%d").fillna("").to_numpy(dtype=object)[order]
+                             for c in LINE_COLS})
+    for c in ("item", "site", "po_num", "remark", "name"):
+        lines_df[c] = lines_df[c].astype(object)
+    records = lines_df.to_dict(orient="records")
+
+    totals = {c: np.add.reduceat(cols[c].to_numpy()[order], starts) for c in TOTAL_COLS}
+
+    # "main" line: earliest ship date, undated first; ties keep the display order
+    rank = np.empty(n, dtype=np.int64)
+    rank[order] = pos
+    main_order = np.lexsort((rank, _date_key(ship, nat_first=True), key_codes))
+    mg = key_codes[main_order]
+    main_rows = main_order[np.r_[True, mg[1:] != mg[:-1]]]   # one per key code, ascending code
+
+    out = {}
+    for i, (a, b) in enumerate(zip(starts, ends)):
+        code = g[a]
+        m = main_rows[code]
+        d = ship.iloc[m]
+        out[str(uniq[code])] = {
+            "qb_num": str(uniq[code]),
+            "item": cols["item"].iloc[m],
+            "site": cols["site"].iloc[m],
+            "ship_date": None if pd.isna(d) else str(d.date()),
+            "need_qty": float(cols["qty_minus"].iloc[m]),
+            **{c: float(totals[c][i]) for c in TOTAL_COLS},
+            "lines": records[a:b],
+        }
+    return out
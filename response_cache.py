@@ -0,0 +1,162 @@
+"""
+Response cache + conditional GET for the Flask apps, tied to the data
+snapshot version.
+
+Every page / API answer is a pure function of (route, query args, snapshot),
+so a response is cached under (endpoint, view args, sorted query args,
+snapshot version) and carries
+
+    ETag:          W/"<store name>-<version>-<hash of route + args>"
+                   (version = source fingerprint, see snapshot.py: the same
+                   data gives the same ETag in every worker and after a restart)
+    Last-Modified: snapshot load time
+    Cache-Control: no-cache        (browsers revalidate, the server answers 304)
+
+A browser refresh with If-None-Match / If-Modified-Since gets a 304 without
+running the view; a repeat of the same lookup from anyone else is served from
+the LRU.  When the store publishes a new snapshot the cache is emptied and
+the ETags change, so nothing from an older load is ever returned.
+
+    CACHE = ResponseCache(STORE, maxsize=256)
+
+    @app.route("/so_lines")
+    @CACHE.cached
+    def so_lines(): ...
+
+Only 200 responses that are not streamed are stored (NDJSON streams still
+get the ETag / 304 handling).  Requests with any of `bypass_args` (e.g.
+?reload=1, ?profile=1) are passed straight to the view.
+"""
+import functools
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from datetime import timezone
+
+from flask import Response, make_response, request
+
+from snapshot import SnapshotStore
+
+DEFAULT_SIZE = int(os.environ.get("LT_RESPONSE_CACHE", "256"))   # entries; 0 = no LRU (ETag / 304 only)
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+class ResponseCache:
+
+    def __init__(self, store: SnapshotStore, maxsize: int = DEFAULT_SIZE, max_bytes: int = DEFAULT_MAX_BYTES,
+                 bypass_args: tuple = ("reload", "profile")):
+        self.store = store
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.bypass_args = bypass_args
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple, tuple] = OrderedDict()
+        self._bytes = 0
+        self._version = None
+        self.hits = self.misses = self.not_modified = 0
+
+    # ---- keys / validators ------------------------------------------------
+
+    def _key(self, version: str) -> tuple:
+        args = tuple(sorted(request.args.items(multi=True)))
+        view_args = tuple(sorted((request.view_args or {}).items()))
+        return request.endpoint, view_args, args, version
+
+    def _etag(self, key: tuple) -> str:
+        h = hashlib.blake2b(repr(key[:3]).encode("utf-8"), digest_size=8).hexdigest()
+        return f"{self.store.name}-{key[3]}-{h}"
+
+    def _not_modified(self, etag: str, last_modified) -> bool:
+        if request.if_none_match:
+            return request.if_none_match.contains_weak(etag)
+        ims = request.if_modified_since
+        return ims is not None and last_modified is not None and last_modified.replace(microsecond=0) <= ims
+
+    @staticmethod
+    def _validators(resp: Response, etag: str, last_modified):
+        resp.set_etag(etag, weak=True)
+        if last_modified is not None:
+            resp.last_modified = last_modified
+        resp.cache_control.no_cache = True
+        return resp
+
+    # ---- LRU ----------------------------------------------------------------
+
+    def _get(self, key: tuple):
+        with self._lock:
+            if key[3] != self._version:
+                self._clear_locked(key[3])
+                return None
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def _put(self, key: tuple, entry: tuple):
+        size = len(entry[0])
+        if self.maxsize <= 0 or size > self.max_bytes:
+            return
+        with self._lock:
+            if key[3] != self._version:
+                self._clear_locked(key[3])
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old[0])
+            self._entries[key] = entry
+            self._bytes += size
+            while self._entries and (len(self._entries) > self.maxsize or self._bytes > self.max_bytes):
+                _, dropped = self._entries.popitem(last=False)
+                self._bytes -= len(dropped[0])
+
+    def _clear_locked(self, version=None):
+        self._entries.clear()
+        self._bytes = 0
+        self._version = version
+
+    def clear(self):
+        with self._lock:
+            self._clear_locked()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"version": self._version, "entries": len(self._entries), "bytes": self._bytes,
+                    "hits": self.hits, "misses": self.misses, "not_modified": self.not_modified}
+
+    # ---- decorator ----------------------------------------------------------
+
+    def cached(self, view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            snap = self.store.current
+            if (request.method != "GET" or snap is None
+                    or any(a in request.args for a in self.bypass_args)):
+                return view(*args, **kwargs)
+
+            key = self._key(snap.version)
+            etag = self._etag(key)
+            last_modified = getattr(snap, "loaded_at", None)
+            if last_modified is not None:
+                last_modified = last_modified.astimezone(timezone.utc)
+
+            if self._not_modified(etag, last_modified):
+                self.not_modified += 1
+                return self._validators(Response(status=304), etag, last_modified)
+
+            entry = self._get(key)
+            if entry is not None:
+                self.hits += 1
+                body, status, headers = entry
+                resp = Response(body, status=status, headers=headers)
+                resp.headers["X-Cache"] = "HIT"
+                return self._validators(resp, etag, last_modified)
+
+            self.misses += 1
+            resp = make_response(view(*args, **kwargs))
+            if resp.status_code != 200:
+                return resp
+            if not resp.is_streamed:
+                self._put(key, (resp.get_data(), resp.status_code, list(resp.headers.items())))
+                resp.headers["X-Cache"] = "MISS"
+            return self._validators(resp, etag, last_modified)
+        return wrapper
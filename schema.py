@@ -0,0 +1,102 @@
+"""
+Compact in-memory schema for the frames the web apps keep per worker.
+
+Each spec lists the columns of one frame by kind:
+
+    categorical : repeated ids / labels (Item, QB Num, Name, Site, ...) -> category
+    numeric     : quantities -> float32 / int32 when that is lossless
+    dates       : -> datetime64
+
+    check = compact(raw, LT_CHECK)
+    memory_report(raw, check)   # {"before": bytes, "after": bytes, "columns": {...}}
+
+Columns missing from a frame are skipped; a categorical column is only
+converted when it repeats enough (unique / rows <= MAX_UNIQUE_RATIO) and
+its values share one Python type (category would stringify a mix), a
+float column only when every value survives the float32 round trip, so
+what the pages render does not change.  Code that fills blanks on these
+frames should go through fill_blank(), since fillna("") on a category
+without "" raises.
+"""
+import numpy as np
+import pandas as pd
+
+import date_render
+
+MAX_UNIQUE_RATIO = 0.5
+
+# Webpage.py (load_check column names)
+LT_CHECK = {
+    "categorical": ["item", "site", "qb_num", "name", "remark"],     # po_num mixes ints and strings: left as is
+    "numeric": ["qty_minus", "qty_plus", "projected", "on_hand", "on_sale", "available", "on_po", "delta"],
+    "dates": ["ship_date"],
+}
+
+# Webpage 2.0.py: public.wo_structured
+SO_INV = {
+    "categorical": ["Item", "QB Num", "Name", "Inventory Site", "P. O. #", "Remark", "Component_Status",
+                    "Pre/Bare", "Picked"],
+    "numeric": ["Qty(-)", "Qty(+)", "projected", "On Hand", "On Sales Order", "Available", "On PO", "Check",
+                "On Hand - WIP"],
+    "dates": ["Order Date", "Ship Date"],
+}
+
+# Webpage 2.0.py: public."NT Shipping Schedule"
+NAV = {
+    "categorical": ["SO NO.", "QB Num", "Item", "Pre/Bare"],
+    "numeric": ["Qty(+)"],
+    "dates": ["Order Date", "Ship Date", "ETA"],
+}
+
+
+def _downcast(s: pd.Series) -> pd.Series:
+    if pd.api.types.is_bool_dtype(s) or not pd.api.types.is_numeric_dtype(s):
+        return s
+    if pd.api.types.is_integer_dtype(s):
+        if s.dtype.itemsize > 4 and (s.empty or (s.min() >= np.iinfo(np.int32).min and s.max() <= np.iinfo(np.int32).max)):
+            return s.astype(np.int32)
+        return s
+    if s.dtype == np.float64:
+        v = s.to_numpy()
+        with np.errstate(over="ignore", invalid="ignore"):
+            v32 = v.astype(np.float32)
+        if np.array_equal(v32.astype(np.float64), v, equal_nan=True):
+            return pd.Series(v32, index=s.index, name=s.name)
+    return s
+
+
+def compact(df: pd.DataFrame, spec: dict) -> pd.DataFrame:
+    """New frame with the `spec` columns converted; other columns are shared, not copied."""
+    out = df.copy(deep=False)
+    n = len(df)
+    for c in spec.get("dates", ()):
+        if c in out.columns and not pd.api.types.is_datetime64_any_dtype(out[c]):
+            out[c] = date_render.parse_dates(out[c])
+    for c in spec.get("numeric", ()):
+        if c in out.columns:
+            out[c] = _downcast(out[c])
+    for c in spec.get("categorical", ()):
+        if c in out.columns and not isinstance(out[c].dtype, pd.CategoricalDtype):
+            uniq = pd.unique(out[c].dropna())
+            if n and len(uniq) <= MAX_UNIQUE_RATIO * n and len({type(v) for v in uniq}) <= 1:
+                out[c] = out[c].astype("category")
+    return out
+
+
+def fill_blank(df: pd.DataFrame) -> pd.DataFrame:
+    """fillna("") that also works on categorical columns (they become plain object columns)."""
+    cats = [c for c in df.columns if isinstance(df[c].dtype, pd.CategoricalDtype)]
+    if cats:
+        df = df.astype({c: object for c in cats})
+    return df.fillna("")
+
+
+def memory_report(before: pd.DataFrame, after: pd.DataFrame) -> dict:
+    """Deep memory of both frames, in bytes, overall and per column."""
+    b = before.memory_usage(deep=True, index=False)
+    a = after.memory_usage(deep=True, index=False)
+    cols = {
+        str(c): {"before": int(b[c]), "after": int(a.get(c, 0)), "dtype": str(after[c].dtype)}
+        for c in before.columns if c in after.columns
+    }
+    return {"rows": int(len(after)), "before": int(b.sum()), "after": int(a.sum()), "columns": cols}
@@ -0,0 +1,195 @@
+"""
+One data snapshot shared by all worker processes (gunicorn -w N).
+
+One worker is the loader: it holds an exclusive flock on
+<dir>/<name>.lock for as long as it lives, pulls the tables and publishes
+each new snapshot as uncompressed Arrow IPC files in shared memory
+(/dev/shm when present), then bumps the generation in <name>.json:
+
+    <dir>/wo-structured.json              {"generation": 7, "files": {...}}
+    <dir>/wo-structured-7-so.arrow
+    <dir>/wo-structured-7-nav.arrow
+
+The other workers never touch the database.  Their refresh only reads the
+manifest; when the generation moved they memory-map the new files
+read-only, so the column buffers live once in the page cache instead of
+once per worker (strings / numbers without a copy where Arrow allows it,
+categoricals as dictionary codes).  If the loader dies its lock is released
+and the next worker to refresh takes over.
+
+The election is per process: the pid is recorded with the lock, and a
+process forked from the loader (gunicorn --preload imports the app, and
+loads, in the master) drops the inherited lock fd and runs the election
+again instead of acting as a second loader.  Under --preload the master
+keeps the lock and its refresher thread, the workers attach.
+
+    SHARED = SharedSnapshot("wo-structured")
+    if SHARED.try_lead():
+        gen = SHARED.publish({"so": so, "nav": nav}, version=fingerprint)
+    else:
+        got = SHARED.attach(since=prev_generation)   # None: nothing new
+        gen, frames, version = got
+
+A worker that is not the loader cannot reload the tables itself;
+request_reload() leaves a note that the loader picks up (take_request())
+on its next refresh.
+
+Needs pyarrow and fcntl (Linux / macOS); otherwise enabled() is False and
+every worker loads on its own as before.  LT_SHARED_SNAPSHOT=0 turns it off.
+"""
+import glob
+import json
+import os
+from datetime import datetime
+
+import pandas as pd
+
+import frame_cache
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, no sharing
+    fcntl = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+except ImportError:
+    pa = None
+
+SHARED_DIR = os.environ.get(
+    "LT_SHARED_DIR", "/dev/shm/lt-snapshots" if os.path.isdir("/dev/shm") else os.path.join(frame_cache.CACHE_DIR, "shared"))
+KEEP_GENERATIONS = 2   # current + previous (a worker may still be mapping it)
+
+
+def enabled() -> bool:
+    return pa is not None and fcntl is not None and os.environ.get("LT_SHARED_SNAPSHOT", "1") != "0"
+
+
+class SharedSnapshot:
+
+    def __init__(self, name: str, directory: str = SHARED_DIR):
+        self.name = name
+        self.dir = directory
+        self._lock_fd: int | None = None
+        self._pid: int | None = None       # process that won the election
+
+    def _path(self, suffix: str) -> str:
+        return os.path.join(self.dir, f"{self.name}{suffix}")
+
+    # ---- loader election ----------------------------------------------------
+
+    @property
+    def is_leader(self) -> bool:
+        return self._lock_fd is not None and self._pid == os.getpid()
+
+    def try_lead(self) -> bool:
+        """True if this process is (now) the loader; the lock is held until the process exits."""
+        if self._lock_fd is not None and self._pid != os.getpid():
+            # forked from the loader: the fd shares its lock, closing our copy leaves it held
+            os.close(self._lock_fd)
+            self._lock_fd = None
+        if self._lock_fd is not None:
+            return True
+        os.makedirs(self.dir, exist_ok=True)
+        fd = os.open(self._path(".lock"), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self._lock_fd = fd
+        self._pid = os.getpid()
+        return True
+
+    # ---- generation manifest ------------------------------------------------
+
+    def manifest(self) -> dict | None:
+        try:
+            with open(self._path(".json"), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def generation(self) -> int:
+        m = self.manifest()
+        return 0 if m is None else int(m["generation"])
+
+    def publish(self, frames: dict[str, pd.DataFrame], version: str | None = None) -> int:
+        """
+        Write `frames` as the next generation and return its number (loader
+        only).  `version` (the data fingerprint) goes into the manifest for
+        the other workers; generations restart when /dev/shm is cleared.
+        """
+        if not self.is_leader:
+            raise RuntimeError(f"{self.name}: only the loader process can publish")
+        gen = self.generation() + 1
+        files = {}
+        for key, df in frames.items():
+            path = self._path(f"-{gen}-{key}.arrow")
+            tmp = f"{path}.tmp"
+            table = pa.Table.from_pandas(frame_cache.normalize_for_arrow(df), preserve_index=False)
+            with pa.OSFile(tmp, "wb") as sink, pa_ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+            os.replace(tmp, path)
+            files[key] = os.path.basename(path)
+        manifest = {"generation": gen, "version": version, "files": files, "pid": os.getpid(),
+                    "published_at": datetime.now().isoformat(timespec="seconds")}
+        tmp = self._path(".json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(tmp, self._path(".json"))   # the generation bump: one rename
+        self._drop_old(gen)
+        return gen
+
+    def _drop_old(self, gen: int):
+        # mapped files stay readable after unlink, so this is safe for workers mid-attach
+        for path in glob.glob(self._path("-*-*.arrow")):
+            try:
+                g = int(os.path.basename(path)[len(self.name) + 1:].split("-", 1)[0])
+            except ValueError:
+                continue
+            if g <= gen - KEEP_GENERATIONS:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def attach(self, since: int = 0) -> tuple[int, dict[str, pd.DataFrame], str | None] | None:
+        """(generation, frames, version) mapped read-only, or None when nothing newer than `since` is published."""
+        m = self.manifest()
+        if m is None or int(m["generation"]) <= since:
+            return None
+        frames = {}
+        for key, fname in m["files"].items():
+            with pa.memory_map(os.path.join(self.dir, fname), "r") as src:
+                table = pa_ipc.open_file(src).read_all()
+            frames[key] = table.to_pandas(split_blocks=True)
+        return int(m["generation"]), frames, m.get("version")
+
+    # ---- reload requests from non-loader workers ----------------------------
+
+    def request_reload(self, full: bool = False):
+        os.makedirs(self.dir, exist_ok=True)
+        path = self._path(".reload")
+        if full or not os.path.exists(path):
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("full" if full else "delta")
+
+    def take_request(self) -> bool | None:
+        """Pending reload request: True = full, False = delta, None = none (loader only)."""
+        path = self._path(".reload")
+        try:
+            with open(path, encoding="utf-8") as f:
+                kind = f.read().strip()
+            os.remove(path)
+        except OSError:
+            return None
+        return kind == "full"
+
+    def status(self) -> dict:
+        m = self.manifest() or {}
+        return {"dir": self.dir, "leader": self.is_leader, "generation": m.get("generation", 0),
+                "published_at": m.get("published_at"), "loader_pid": m.get("pid")}
@@ -0,0 +1,172 @@
+"""
+Double-buffered data snapshots for the Flask apps.
+
+A SnapshotStore owns the snapshot currently being served and one background
+thread that builds the next one.  Requests read `STORE.current` once and use
+that object for the whole request; a reload builds a complete new snapshot
+off the request path and swaps the reference in a single assignment.  If a
+build fails the previous snapshot keeps serving and the error is recorded.
+
+    def build(force, prev):        # -> SimpleNamespace, or prev if unchanged
+        ...
+    STORE = SnapshotStore(build, name="lt-check")
+    STORE.refresh(force=True)      # synchronous first load
+    STORE.start(interval=60)       # periodic refresh + on-demand jobs
+    job = STORE.trigger()          # returns immediately, poll STORE.job(id)
+    STORE.publish(snap)            # serve a snapshot built elsewhere
+
+A process forked from one with a running refresher (gunicorn --preload)
+gets its own refresher thread, on the same interval, right after the fork.
+
+Builders set `snap.version` from the data source (file fingerprint of the
+workbook, row-hash digest of the tables): cursors and ETags are built from
+it, so it must be the same in every worker and across restarts for the same
+data, and change with the data.  A snapshot without one (e.g. bench/ data
+published directly) gets a random version, never reused.
+"""
+import os
+import threading
+import traceback
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Callable
+
+MAX_JOBS = 50
+
+
+class SnapshotStore:
+
+    def __init__(self, build: Callable[[bool, SimpleNamespace | None], SimpleNamespace], name: str = "snapshot"):
+        self._build = build
+        self.name = name
+        self.current: SimpleNamespace | None = None
+        self.version: str | None = None
+        self.error: str | None = None
+        self.error_at: datetime | None = None
+        self._build_lock = threading.Lock()
+        self._cv = threading.Condition()
+        self._pending: dict | None = None
+        self._jobs: OrderedDict[str, dict] = OrderedDict()
+        self._thread: threading.Thread | None = None
+        self._interval: float | None = None
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self):
+        # threads do not survive fork and a lock may have been held by one: start over
+        had_thread = self._thread is not None
+        self._build_lock = threading.Lock()
+        self._cv = threading.Condition()
+        self._pending = None
+        self._thread = None
+        if had_thread:
+            self.start()
+
+    # ---- building ---------------------------------------------------------
+
+    def refresh(self, force: bool = False) -> bool:
+        """Build and publish synchronously.  Returns True if a new snapshot was swapped in."""
+        with self._build_lock:
+            prev = self.current
+            try:
+                snap = self._build(force, prev)
+            except Exception as e:
+                self.error = f"{type(e).__name__}: {e}"
+                self.error_at = datetime.now()
+                traceback.print_exc()
+                raise
+            self.error = None
+            self.error_at = None
+            if snap is None or snap is prev:
+                return False
+            self._swap(snap)
+            return True
+
+    def publish(self, snap: SimpleNamespace) -> SimpleNamespace:
+        """Serve a snapshot built outside the builder (e.g. bench/ with synthetic data)."""
+        with self._build_lock:
+            return self._swap(snap)
+
+    def _swap(self, snap: SimpleNamespace) -> SimpleNamespace:
+        # version from the source fingerprint; a process-local counter would repeat after a restart
+        snap.version = str(getattr(snap, "version", None) or uuid.uuid4().hex[:16])
+        snap.loaded_at = datetime.now()
+        self.version = snap.version
+        self.current = snap          # the swap: one reference assignment
+        return snap
+
+    # ---- background jobs --------------------------------------------------
+
+    def trigger(self, force: bool = False) -> dict:
+        """Queue a refresh on the background thread and return its job record right away."""
+        with self._cv:
+            if self._pending is not None:
+                self._pending["force"] = self._pending["force"] or force
+                return dict(self._pending)
+            job = {"id": uuid.uuid4().hex[:12], "state": "queued", "force": force,
+                   "queued_at": datetime.now().isoformat(timespec="seconds")}
+            self._jobs[job["id"]] = job
+            while len(self._jobs) > MAX_JOBS:
+                self._jobs.popitem(last=False)
+            self._pending = job
+            self._cv.notify()
+        if self._thread is None:
+            self.start()
+        return dict(job)
+
+    def job(self, job_id: str) -> dict | None:
+        with self._cv:
+            j = self._jobs.get(job_id)
+            return None if j is None else dict(j)
+
+    def start(self, interval: float | None = None):
+        """Start the refresher thread (idempotent).  interval=None -> on-demand only."""
+        with self._cv:
+            if interval is not None:
+                self._interval = interval
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name=f"{self.name}-refresher", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cv:
+                if self._pending is None:
+                    self._cv.wait(timeout=self._interval)
+                job, self._pending = self._pending, None
+            if job is None:
+                # periodic tick
+                try:
+                    self.refresh(force=False)
+                except Exception:
+                    pass
+                continue
+            self._run_job(job)
+
+    def _run_job(self, job: dict):
+        with self._cv:
+            job["state"] = "running"
+            job["started_at"] = datetime.now().isoformat(timespec="seconds")
+        try:
+            swapped = self.refresh(force=job["force"])
+            state, err = ("done" if swapped else "unchanged"), None
+        except Exception as e:
+            state, err = "failed", f"{type(e).__name__}: {e}"
+        with self._cv:
+            job["state"] = state
+            job["error"] = err
+            job["version"] = self.version
+            job["finished_at"] = datetime.now().isoformat(timespec="seconds")
+
+    def status(self) -> dict:
+        snap = self.current
+        return {
+            "version": self.version,
+            "loaded_at": None if snap is None else snap.loaded_at.isoformat(timespec="seconds"),
+            "error": self.error,
+            "error_at": None if self.error_at is None else self.error_at.isoformat(timespec="seconds"),
+            "interval": self._interval,
+        }
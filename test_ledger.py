@@ -0,0 +1,94 @@
+import pandas as pd
+import pytest
+
+import ledger
+import partition_exec
+from bench import datagen
+from preinstalled import expand_nav_preinstalled
+
+TODAY = pd.Timestamp("2025-10-01")
+
+
+@pytest.fixture
+def force_pool(monkeypatch):
+    monkeypatch.setattr(partition_exec, "PARALLEL_MIN_ROWS", 0)
+
+
+@pytest.mark.parametrize("shards", [3, 64])
+def test_run_parallel_equals_run(force_pool, shards):
+    data = datagen.generate(2000, seed=7)
+    so, nav_exp = data["so"], expand_nav_preinstalled(data["nav"])
+    expected = ledger.run(so, nav_exp, today=TODAY)
+    parts = partition_exec.run_partitioned(ledger.run, {"SO": so, "NAV_EXP": nav_exp},
+                                           {"SO": "Item", "NAV_EXP": "Item"}, workers=2, shards=shards, today=TODAY)
+    assert len(parts) > 1
+    got = ledger._merge_runs(parts)
+    for name in expected:
+        pd.testing.assert_frame_equal(got[name], expected[name])
+    par = ledger.run_parallel(so, nav_exp, today=TODAY, workers=2)
+    for name in expected:
+        pd.testing.assert_frame_equal(par[name], expected[name])
+
+
+# hand-computed book, today = 2025-10-01
+#   A  open 5   SO 10-05 -4 -> 1, SO 10-10 -6 -> -5, NAV 10-20 +10 -> 5, undated SO -1 -> 4
+#   B  open 0   NAV 10-03 +2 -> 2, SO 10-03 -2 -> 0          (IN before OUT on the same date)
+#   C  open 0   SO 10-04 -3 -> -3                            (never covered)
+#   D  open 1   NAV 09-20 +2 -> 3                            (OPEN first although the IN is older)
+SO = pd.DataFrame({
+    "Item": ["A", "A", "A", "B", "C", "D"],
+    "Ship Date": ["2025-10-05", "2025-10-10", None, "2025-10-03", "2025-10-04", None],
+    "Qty(-)": [4, 6, 1, 2, 3, 0],
+    "On Hand - WIP": [5, 5, 5, 0, 0, 1],
+    "QB Num": ["SO-1", "SO-2", "SO-3", "SO-4", "SO-5", "SO-6"],
+    "P. O. #": ["P1", "P2", "P3", "P4", "P5", "P6"],
+    "Name": ["x", "x", "x", "y", "z", "w"],
+})
+NAV_EXP = pd.DataFrame({
+    "Item": ["A", "B", "D"],
+    "Qty(+)": [10, 2, 2],
+    "Date": ["2025-10-20", "2025-10-03", "2025-09-20"],
+})
+NAT = pd.NaT
+
+
+def _ts(*dates):
+    return [pd.Timestamp(d) if d else NAT for d in dates]
+
+
+def test_ledger_order_and_projection():
+    led = ledger.run(SO, NAV_EXP, today=TODAY)["ledger"]
+    # display order: item, date (undated last), IN < OPEN < OUT
+    assert led["Item"].tolist() == ["A"] * 5 + ["B"] * 3 + ["C"] * 2 + ["D"] * 2
+    assert led["Kind"].tolist() == ["OPEN", "OUT", "OUT", "IN", "OUT",
+                                    "OPEN", "IN", "OUT", "OPEN", "OUT", "IN", "OPEN"]
+    assert led["Date"].tolist() == _ts("2025-10-01", "2025-10-05", "2025-10-10", "2025-10-20", None,
+                                       "2025-10-01", "2025-10-03", "2025-10-03", "2025-10-01", "2025-10-04",
+                                       "2025-09-20", "2025-10-01")
+    assert led["Projected_NAV"].tolist() == [5, 1, -5, 5, 4, 0, 2, 0, 0, -3, 3, 1]
+    out = led["Kind"] == "OUT"
+    assert led.loc[out, "NAV_before"].tolist() == [5, 1, 5, 2, 0]
+    assert led.loc[out, "NAV_after"].tolist() == [1, -5, 4, 0, -3]
+
+
+def test_so_readiness_catch_up():
+    res = ledger.run(SO, NAV_EXP, today=TODAY)
+    r = res["so_readiness"]
+    assert r["QB Num"].tolist() == ["SO-1", "SO-2", "SO-3", "SO-4", "SO-5"]
+    assert r["Covered_On_Date"].tolist() == [True, False, True, True, False]
+    # SO-2 short on 10-10, back to >= 0 with the NAV receipt on 10-20; SO-5 never
+    assert r["Covered_By_Date"].tolist() == _ts(None, "2025-10-20", None, None, None)
+    pd.testing.assert_frame_equal(ledger.compute_so_readiness(res["ledger"]), r)
+
+
+def test_item_summary_and_violations():
+    res = ledger.run(SO, NAV_EXP, today=TODAY)
+    s = res["item_summary"]
+    # not OK first, then by lowest projection
+    assert s["Item"].tolist() == ["A", "C", "B", "D"]
+    assert s["Min_Projected_NAV"].tolist() == [-5, -3, 0, 1]
+    assert s["OK"].tolist() == [False, False, True, True]
+    assert s["First_Shortage_Date"].tolist() == _ts("2025-10-10", "2025-10-04", None, None)
+    assert s["NAV_at_First_Shortage"].tolist()[:2] == [-5, -3]
+    v = res["violations"]
+    assert v["QB Num"].tolist() == ["SO-2", "SO-5"]
@@ -0,0 +1,40 @@
+import pandas as pd
+
+from pod_allocation import NOTE_UNMATCHED, UNMATCHED_NOTE_COL, allocate
+
+POD_COLS = ["Order Date", "QB Num", "Name", "Item", "Deliv Date", "Qty(+)"]
+NAV_COLS = ["QB Num", "Item", "Qty(+)", "Date"]
+
+
+def _pod(rows):
+    return pd.DataFrame(rows, columns=POD_COLS)
+
+
+def _nav(rows):
+    return pd.DataFrame(rows, columns=NAV_COLS)
+
+
+def test_empty_inputs():
+    res = allocate(_pod([]), _nav([]))
+    assert res["splitted"].empty and res["allocated"].empty and res["residuals"].empty
+    assert res["unmatched"].empty
+    assert res["diagnostics"]["pod_lines"] == 0
+
+
+def test_disjoint_keys_all_unmatched():
+    pod = _pod([["2025-09-01", "A", "Vendor", "x", "2025-10-01", 5]])
+    nav = _nav([["B", "y", 3, "2025-10-02"]])
+    res = allocate(pod, nav)
+    assert res["splitted"].empty
+    assert res["unmatched"]["Item"].tolist() == ["x"]
+    assert res["unmatched"][UNMATCHED_NOTE_COL].tolist() == [NOTE_UNMATCHED]
+    assert res["diagnostics"]["unmatched_lines"] == 1
+    assert res["diagnostics"]["nav_keys_without_pod"] == 1
+
+
+def test_fifo_split():
+    pod = _pod([["2025-09-01", "A", "V", "x", "2025-10-01", 6], ["2025-09-01", "A", "V", "x", "2025-10-01", 3]])
+    nav = _nav([["A", "x", 4, "2025-10-02"], ["A", "x", 5, "2025-10-05"]])
+    res = allocate(pod, nav)
+    assert res["allocated"]["Qty(+)"].tolist() == [4, 2, 3]
+    assert res["residuals"].empty and res["unmatched"].empty
@@ -0,0 +1,148 @@
+"""
+Per-(item, site) cumulative availability timelines.
+
+Built once from the LT "check" frame (Webpage.load_check() column names).
+For every (item, site) and every item across all sites we keep, in one set
+of flat arrays sorted by ship date:
+
+    ship_date, net_change, cum_available, running max of cum_available
+
+so "earliest date where cumulative available >= need_qty" is a
+searchsorted on the running max instead of a groupby + cumsum per call.
+Undated rows (NaT) are bucketed last and shown as today's date, same as
+the old per-call code.
+"""
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+TIMELINE_COLS = ["ship_date", "net_change", "cum_available"]
+
+
+class AvailabilityTimelines:
+
+    def __init__(self, df: pd.DataFrame, item_col="item", site_col="site", date_col="ship_date",
+                 delta_col="delta", on_hand_col="on_hand"):
+        cols = {"item": item_col, "site": site_col, "ship_date": date_col,
+                "delta": delta_col, "on_hand": on_hand_col}
+        base = pd.DataFrame({k: (df[v] if v in df.columns else pd.Series(np.nan, index=df.index))
+                             for k, v in cols.items()})
+        base["item"] = base["item"].astype("string")
+        base["site"] = base["site"].astype("string")
+        base["delta"] = pd.to_numeric(base["delta"], errors="coerce").fillna(0.0).astype(float)
+        base["on_hand"] = pd.to_numeric(base["on_hand"], errors="coerce").fillna(0.0)
+        base = base[base["item"].notna()]
+
+        self._offsets: dict[tuple, tuple[int, int]] = {}
+        self._start: dict[tuple, float] = {}
+        parts = []
+        pos = 0
+        for keys in (["item"], ["item", "site"]):
+            sub = base.dropna(subset=keys)
+            agg = (sub.groupby(keys + ["ship_date"], dropna=False, sort=True)["delta"]
+                      .sum()
+                      .rename("net_change")
+                      .reset_index())
+            # "latest nonzero snapshot" = last row (in sheet order) with on_hand > 0
+            start = (sub.loc[sub["on_hand"] > 0].groupby(keys, sort=False)["on_hand"].last()
+                        .rename("start").reset_index())
+            agg = agg.merge(start, on=keys, how="left")
+            agg["start"] = agg["start"].fillna(0.0)
+
+            grp = agg.groupby(keys, sort=False)
+            agg["cum_available"] = agg["start"] + grp["net_change"].cumsum()
+            agg["run_max"] = agg.groupby(keys, sort=False)["cum_available"].cummax()
+            start_map = {tuple(str(x) for x in r[:-1]): float(r[-1])
+                         for r in start.itertuples(index=False)}
+
+            for k, idx in grp.indices.items():
+                key = tuple(str(x) for x in (k if isinstance(k, tuple) else (k,)))
+                self._offsets[key] = (pos + int(idx[0]), pos + int(idx[-1]) + 1)
+            self._start.update(start_map)
+            pos += len(agg)
+            parts.append(agg[["ship_date", "net_change", "cum_available", "run_max"]])
+
+        flat = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=TIMELINE_COLS + ["run_max"])
+        self._dates = flat["ship_date"].to_numpy()
+        self._net = flat["net_change"].to_numpy(dtype=float)
+        self._cum = flat["cum_available"].to_numpy(dtype=float)
+        self._run_max = flat["run_max"].to_numpy(dtype=float)
+        self._date_dtype = flat["ship_date"].dtype
+        # segment start of every flat row (segments are contiguous, in key order of the layout)
+        seg_lo = np.zeros(len(flat), dtype=np.int64)
+        for lo, hi in self._offsets.values():
+            seg_lo[lo:hi] = lo
+        self._seg_lo = seg_lo
+
+    @staticmethod
+    def _key(item: str, site: str | None) -> tuple:
+        return (str(item), str(site)) if site else (str(item),)
+
+    def start_on_hand(self, item: str, site: str | None = None) -> float:
+        return self._start.get(self._key(item, site), 0.0)
+
+    def timeline(self, item: str, site: str | None = None) -> pd.DataFrame:
+        """ship_date / net_change / cum_available for one key (NaT shown as today)."""
+        lo, hi = self._offsets.get(self._key(item, site), (0, 0))
+        today = pd.to_datetime(datetime.today().date())
+        tl = pd.DataFrame({
+            "ship_date": pd.Series(self._dates[lo:hi], dtype=self._date_dtype),
+            "net_change": self._net[lo:hi],
+            "cum_available": self._cum[lo:hi],
+        })
+        tl["ship_date"] = tl["ship_date"].fillna(today)
+        return tl
+
+    def earliest(self, item: str, need_qty: float, site: str | None = None):
+        """Same result shape as the old Webpage.earliest_assign_date()."""
+        key = self._key(item, site)
+        lo, hi = self._offsets.get(key, (0, 0))
+        date = None
+        i = lo + int(np.searchsorted(self._run_max[lo:hi], need_qty, side="left"))
+        if i < hi:
+            d = self._dates[i]
+            date = datetime.today().date() if pd.isna(d) else pd.Timestamp(d).date()
+        return {
+            "date": (None if date is None else str(date)),
+            "start_on_hand": self._start.get(key, 0.0),
+            "timeline": self.timeline(item, site),
+        }
+
+    def earliest_many(self, items, needs, sites=None) -> np.ndarray:
+        """
+        Vectorized earliest(): for each (item, need, site) the first timeline
+        date where cumulative available >= need, as datetime64[ns]; NaT when
+        the need is never covered (undated buckets count as today).
+
+        All lookups are one searchsorted over the flat arrays: rows and
+        queries are sorted together by (segment, value) and a query's answer
+        is the number of rows in front of it.
+        """
+        n = len(needs)
+        sites = [None] * n if sites is None else sites
+        bounds = np.array([self._offsets.get(self._key(i, s), (-1, -1)) for i, s in zip(items, sites)],
+                          dtype=np.int64).reshape(n, 2)
+        lo, hi = bounds[:, 0], bounds[:, 1]
+        needs = np.asarray(needs, dtype=float)
+        known = lo >= 0
+
+        m = len(self._run_max)
+        seg = np.concatenate([self._seg_lo, lo[known]])
+        val = np.concatenate([self._run_max, needs[known]])
+        kind = np.concatenate([np.ones(m, dtype=np.int8), np.zeros(int(known.sum()), dtype=np.int8)])
+        order = np.lexsort((kind, val, seg))          # on ties the query goes first (side="left")
+        rows_before = np.cumsum(kind[order] == 1)
+        first = np.empty(len(order), dtype=np.int64)
+        first[order] = rows_before
+        idx = first[m:]                               # flat index of the first row >= need
+
+        out = np.full(n, np.datetime64("NaT"), dtype="datetime64[ns]")
+        ok = idx < hi[known]
+        dates = np.asarray(self._dates, dtype="datetime64[ns]")
+        today = np.datetime64(datetime.today().date(), "ns")
+        hit = dates[idx[ok]]
+        out_known = out[known]
+        out_known[ok] = np.where(np.isnat(hit), today, hit)
+        out[known] = out_known
+        return out